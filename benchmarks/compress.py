@@ -0,0 +1,69 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from comics import Archive
+from comics.compression import policies
+
+
+def create_pages(dirname: str, count: int, size: int):
+    rand = random.Random(0)
+    words = [bytes(rand.choices(range(97, 123), k=8)) for _ in range(512)]
+
+    for idx in range(1, count + 1):
+        data = b" ".join(rand.choices(words, k=size // 9))
+
+        with open(os.path.join(dirname, f'Page {idx:03}.xml'), "wb") as f:
+            f.write(data[:size])
+
+
+def measure(source: str, target: str, threads: int, repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Archive.compress(source, target, True, policies["max"], threads)
+        timings.append(time.perf_counter() - start)
+
+        os.remove(target)
+
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure compression time for a single archive."
+    )
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--size", type=int, default=512 * 1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dirname:
+        source = os.path.join(dirname, "pages")
+        target = os.path.join(dirname, "comic.cbz")
+
+        os.mkdir(source)
+        create_pages(source, args.pages, args.size)
+
+        baseline = None
+
+        print(f'{"threads":>8} {"seconds":>8} {"speedup":>8}')
+
+        for threads in args.threads:
+            elapsed = measure(source, target, threads, args.repeat)
+            baseline = baseline or elapsed
+
+            print(f'{threads:>8} {elapsed:>8.3f} {baseline / elapsed:>7.2f}x')
+
+
+if __name__ == "__main__":
+    main()
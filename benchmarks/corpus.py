@@ -0,0 +1,165 @@
+import argparse
+import os
+import random
+import struct
+import zlib
+
+from zipfile import ZipFile, ZIP_DEFLATED
+
+
+JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+
+JUNK = [
+    ("ComicInfo.xml", b"<ComicInfo><Title>%d</Title></ComicInfo>"),
+    ("Thumbs.db", b"\x00" * 64),
+    (".DS_Store", b"\x00\x00\x00\x01Bud1" + b"\x00" * 32),
+    ("scan-notes.txt", b"Scanned by %d"),
+]
+
+
+def rar_header(htype: int, flags: int, body: bytes) -> bytes:
+    data = struct.pack("<BHH", htype, flags, 7 + len(body)) + body
+    return struct.pack("<H", zlib.crc32(data) & 0xffff) + data
+
+
+def write_rar(path: str, items: dict[str, bytes]):
+    with open(path, "wb") as f:
+        f.write(b"Rar!\x1a\x07\x00" + rar_header(0x73, 0, bytes(6)))
+
+        for name, content in items.items():
+            flags, attr = 0x8000, 0x20
+
+            if name.endswith("/"):
+                flags, attr = flags | 0xe0, 0x10
+
+            name = name.rstrip("/").replace("/", "\\").encode()
+
+            body = struct.pack(
+                "<IIBIIBBHI",
+                len(content),
+                len(content),
+                2,
+                zlib.crc32(content),
+                0x50210000,
+                20,
+                0x30,
+                len(name),
+                attr
+            )
+
+            f.write(rar_header(0x74, flags, body + name) + content)
+
+        f.write(rar_header(0x7b, 0x4000, b""))
+
+
+def write_zip(path: str, items: dict[str, bytes]):
+    with ZipFile(path, "w", compression=ZIP_DEFLATED) as archive:
+        for name, content in items.items():
+            archive.writestr(name, content)
+
+
+supported_formats = {
+    "cbz": write_zip,
+    "cbr": write_rar
+}
+
+
+def create_page(rand: random.Random, size: int) -> bytes:
+    return JPEG_HEADER + rand.randbytes(max(size - len(JPEG_HEADER), 0))
+
+
+def create_items(
+    rand: random.Random,
+    idx: int,
+    pages: int,
+    page_size: int,
+    depth: int,
+    junk: int
+) -> dict[str, bytes]:
+    items, prefix = {}, ""
+
+    for level in range(1, depth + 1):
+        prefix = f'{prefix}Chapter {level}/'
+        items[prefix] = b""
+
+    for page in range(1, pages + 1):
+        items[f'{prefix}{idx:04}_{page:03}.jpg'] = create_page(rand, page_size)
+
+    for name, content in JUNK[:junk]:
+        if b"%d" in content:
+            content = content % idx
+
+        items[f'{prefix}{name}'] = content
+
+    return items
+
+
+def create_corpus(
+    dirname: str,
+    comics: int = 20,
+    pages: int = 24,
+    page_size: int = 256 * 1024,
+    depth: int = 1,
+    junk: int = 2,
+    formats: tuple[str] = ("cbz", "cbr"),
+    seed: int = 0
+) -> list[str]:
+    rand = random.Random(seed)
+    paths = []
+
+    os.makedirs(dirname, exist_ok=True)
+
+    for idx in range(comics):
+        ext = formats[idx % len(formats)]
+        path = os.path.join(dirname, f'Comic {idx:04}.{ext}')
+
+        items = create_items(rand, idx, pages, page_size, depth, junk)
+        supported_formats[ext](path, items)
+
+        paths.append(path)
+
+    return paths
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--comics", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--page-size", type=int, default=256 * 1024)
+    parser.add_argument("--depth", type=int, default=1)
+    parser.add_argument("--junk", type=int, default=2, choices=range(5))
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=list(supported_formats),
+        default=["cbz", "cbr"]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def corpus_options(args: argparse.Namespace) -> dict:
+    return {
+        "comics": args.comics,
+        "pages": args.pages,
+        "page_size": args.page_size,
+        "depth": args.depth,
+        "junk": args.junk,
+        "formats": tuple(args.formats),
+        "seed": args.seed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic corpus of comic archives."
+    )
+    parser.add_argument("dirname")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    paths = create_corpus(args.dirname, **corpus_options(args))
+
+    print(f'Created {len(paths)} archives in {args.dirname}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import Callable, NamedTuple
+from unittest.mock import patch
+
+from corpus import add_arguments, corpus_options, create_corpus
+
+from comics import Archive, Comic
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Case(NamedTuple):
+    prepare: Callable
+    run: Callable
+    unrar: bool = False
+
+
+def unrar_available() -> bool:
+    try:
+        from unrar import unrarlib  # noqa: F401
+    except (ImportError, LookupError):
+        return False
+
+    return True
+
+
+def find(library: str, ext: str) -> list[str]:
+    return sorted(glob.glob(os.path.join(library, f'*{ext}')))
+
+
+def output_dir(path: str) -> str:
+    return f'{path}.out'
+
+
+def extract(library: str) -> list[str]:
+    sources = []
+
+    for path in find(library, ".cbz"):
+        source = output_dir(path)
+        Archive(path).uncompress(source)
+        sources.append(source)
+
+    return sources
+
+
+def compress(sources: list[str]):
+    for source in sources:
+        Archive.compress(source, f'{source}.cbz', True)
+
+
+def uncompress(paths: list[str]):
+    for path in paths:
+        Archive(path).uncompress(output_dir(path))
+
+
+def uncompress_library(paths: list[str]):
+    with patch.dict(os.environ, {"COMIC_FMT_BACKEND": "extract=unrar-lib"}):
+        uncompress(paths)
+
+
+def search(paths: list[str]):
+    for path in paths:
+        Archive(path).search("_001")
+
+
+def convert(paths: list[str]):
+    for path in paths:
+        Comic(path).convert()
+
+
+def flatten(paths: list[str]):
+    for path in paths:
+        with Comic(path) as c:
+            c.flatten()
+
+
+def format_pages(paths: list[str]):
+    for path in paths:
+        with Comic(path) as c:
+            c.format_pages("Page ", r"\d+")
+
+
+def command(*args: str) -> Callable:
+    def prepare(library: str) -> list[str]:
+        index = os.path.join(os.path.dirname(library), "index.db")
+
+        return [
+            arg.format(library=library, index=index)
+            for arg in args
+        ]
+
+    return prepare
+
+
+def run_command(args: list[str]):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.join(ROOT, "lib"), ROOT, env.get("PYTHONPATH", "")]
+    )
+
+    subprocess.run(
+        [sys.executable, "-c", "from cli.entry import entry; entry()", *args],
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL
+    )
+
+
+cases = {
+    "archive.compress": Case(extract, compress),
+    "archive.uncompress": Case(lambda lib: find(lib, ".cbz"), uncompress),
+    "archive.uncompress_rar": Case(
+        lambda lib: find(lib, ".cbr"),
+        uncompress,
+        unrar=True
+    ),
+    "archive.uncompress_rar_library": Case(
+        lambda lib: find(lib, ".cbr"),
+        uncompress_library,
+        unrar=True
+    ),
+    "archive.search": Case(lambda lib: find(lib, ""), search),
+    "comic.convert": Case(
+        lambda lib: find(lib, ".cbr"),
+        convert,
+        unrar=True
+    ),
+    "comic.flatten": Case(lambda lib: find(lib, ".cbz"), flatten),
+    "comic.format_pages": Case(lambda lib: find(lib, ".cbz"), format_pages),
+    "cli.cbz": Case(command("cbz", "{library}"), run_command, unrar=True),
+    "cli.meta": Case(
+        command("meta", "-s", "Title=Benchmark", "{library}"),
+        run_command,
+        unrar=True
+    ),
+    "cli.pages": Case(
+        command("pages", "-f", "-p", "Page ", "{library}"),
+        run_command,
+        unrar=True
+    ),
+    "cli.help": Case(command("--help"), run_command),
+    "cli.dupes": Case(
+        command("dupes", "-i", "{index}", "{library}"),
+        run_command
+    ),
+    "cli.search": Case(
+        command("search", "-i", "{index}", "-q", "_001", "{library}"),
+        run_command
+    ),
+    "cli.uncompress": Case(
+        command("uncompress", "{library}"),
+        run_command,
+        unrar=True
+    ),
+    "cli.verify": Case(
+        command("verify", "{library}"),
+        run_command,
+        unrar=True
+    )
+}
+
+
+def measure(case: Case, corpus: str, scratch: str, repeat: int) -> list:
+    timings = []
+
+    for _ in range(repeat):
+        library = os.path.join(scratch, "library")
+
+        shutil.rmtree(scratch, ignore_errors=True)
+        shutil.copytree(corpus, library)
+
+        state = case.prepare(library)
+
+        start = time.perf_counter()
+        case.run(state)
+        timings.append(time.perf_counter() - start)
+
+    shutil.rmtree(scratch, ignore_errors=True)
+
+    return timings
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+
+    for name, result in results.items():
+        previous = baseline.get(name)
+
+        if previous is None:
+            continue
+
+        ratio = result["seconds"] / previous["seconds"]
+
+        if ratio > 1 + threshold:
+            regressions.append((name, previous["seconds"], ratio))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure common operations on a synthetic corpus."
+    )
+    add_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cases", nargs="+", choices=list(cases))
+    parser.add_argument("--output", metavar="FILE")
+    parser.add_argument("--baseline", metavar="FILE")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    options = corpus_options(args)
+    baseline = None
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        if baseline["corpus"] != json.loads(json.dumps(options)):
+            parser.error("baseline was measured on a different corpus")
+
+    selected = args.cases or list(cases)
+    has_unrar = unrar_available()
+    results = {}
+
+    print(f'{"case":<24} {"seconds":>8} {"median":>8}')
+
+    with tempfile.TemporaryDirectory() as dirname:
+        corpus = os.path.join(dirname, "corpus")
+        scratch = os.path.join(dirname, "scratch")
+
+        create_corpus(corpus, **options)
+
+        for name in selected:
+            case = cases[name]
+
+            if case.unrar and not has_unrar:
+                print(f'{name:<24} skipped (unrar library not found)')
+                continue
+
+            timings = measure(case, corpus, scratch, args.repeat)
+
+            results[name] = {
+                "seconds": min(timings),
+                "median": statistics.median(timings),
+                "runs": timings
+            }
+
+            print(f'{name:<24} {min(timings):>8.3f} '
+                  f'{statistics.median(timings):>8.3f}')
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": options,
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if baseline is None:
+        return
+
+    regressions = compare(results, baseline["results"], args.threshold)
+
+    for name, previous, ratio in regressions:
+        print(
+            f'regression: {name} took {ratio:.2f}x the baseline '
+            f'of {previous:.3f}s',
+            file=sys.stderr
+        )
+
+    if regressions:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+import json
+import os
+import sys
+import click
+
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterable, NamedTuple
+
+from comics import utils
+from comics.journal import Journal
+from comics.stats import FIELDS, Stats, collect, phase
+
+
+class Result(NamedTuple):
+    path: str
+    output: str
+    error: str
+    stats: dict = None
+
+
+def tasks(paths: Iterable[str], **kwargs) -> Iterable[tuple[str, dict]]:
+    for path in paths:
+        yield path, kwargs
+
+
+def stats_enabled() -> bool:
+    return bool(
+        os.environ.get("COMIC_FMT_STATS")
+        or os.environ.get("COMIC_FMT_STATS_JSON")
+    )
+
+
+def journal_enabled() -> bool:
+    return bool(
+        os.environ.get("COMIC_FMT_JOURNAL")
+        or os.environ.get("COMIC_FMT_RESUME")
+    )
+
+
+def cbz_target(path: str) -> str:
+    return utils.change_file_extension(path, ".cbz")
+
+
+def run_name() -> str:
+    ctx = click.get_current_context(silent=True)
+
+    if ctx is None:
+        return ""
+
+    params = {
+        name: value
+        for name, value in ctx.params.items()
+        if name not in ("jobs", "threads")
+    }
+
+    return f'{ctx.info_name} {json.dumps(params, sort_keys=True, default=str)}'
+
+
+@contextmanager
+def open_journal():
+    if not journal_enabled():
+        yield None
+        return
+
+    with Journal(run=run_name()) as journal:
+        for path in journal.recover():
+            print(f'recovered {path}', file=sys.stderr)
+
+        if not os.environ.get("COMIC_FMT_RESUME"):
+            journal.reset()
+
+        yield journal
+
+
+def resume(
+    tasks: Iterable,
+    journal: Journal = None,
+    target: Callable = None
+) -> Iterable[tuple[str, dict]]:
+    if journal is None:
+        yield from tasks
+        return
+
+    skipped = 0
+
+    for path, kwargs in tasks:
+        if journal.completed(path):
+            skipped += 1
+            continue
+
+        journal.start(path, target(path) if target else None)
+        yield path, kwargs
+
+    if skipped:
+        print(f'skipped {skipped} completed archives', file=sys.stderr)
+
+
+def record(
+    results: Iterable[Result],
+    journal: Journal = None
+) -> Iterable[Result]:
+    for result in results:
+        if journal is not None:
+            journal.finish(result.path, result.error)
+
+        yield result
+
+
+def run_task(
+    func: Callable,
+    path: str,
+    kwargs: dict,
+    stats: bool = False
+) -> Result:
+    with collect() if stats else nullcontext() as record:
+        try:
+            with phase("total"):
+                output, error = func(path, **kwargs), None
+        except Exception as e:
+            output, error = None, str(e)
+
+    if record is not None:
+        return Result(path, output, error, record.to_dict())
+
+    return Result(path, output, error)
+
+
+def run(
+    func: Callable,
+    tasks: Iterable,
+    jobs: int = 1,
+    stats: bool = False,
+    footprint: Callable = None
+) -> Iterable[Result]:
+    if jobs == 1:
+        for path, kwargs in tasks:
+            yield run_task(func, path, kwargs, stats)
+        return
+
+    if footprint is not None:
+        yield from run_scheduled(func, tasks, jobs, stats, footprint)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = jobs or os.cpu_count()
+    pending = deque()
+
+    with ProcessPoolExecutor(workers) as executor:
+        for path, kwargs in tasks:
+            pending.append(
+                executor.submit(run_task, func, path, kwargs, stats)
+            )
+
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_scheduled(
+    func: Callable,
+    tasks: Iterable,
+    jobs: int,
+    stats: bool,
+    footprint: Callable
+) -> Iterable[Result]:
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from comics.scheduler import Scheduler
+
+    scheduler = Scheduler()
+
+    for path, kwargs in tasks:
+        scheduler.add((path, kwargs), footprint(path))
+
+    workers = jobs or os.cpu_count()
+    running = {}
+
+    with ProcessPoolExecutor(workers) as executor:
+        while scheduler.pending or running:
+            while len(running) < workers:
+                job = scheduler.take()
+
+                if job is None:
+                    break
+
+                (path, kwargs), usage = job
+                future = executor.submit(run_task, func, path, kwargs, stats)
+                running[future] = usage
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                scheduler.release(running.pop(future))
+                yield future.result()
+
+
+def print_summary(errors: list[Result], total: int):
+    print(f'\n{len(errors)} of {total} archives failed', file=sys.stderr)
+
+    for result in errors:
+        print(f'|_ {result.path}: {result.error}', file=sys.stderr)
+
+
+def format_size(size: float) -> str:
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            break
+
+        size /= 1024
+
+    return f'{size:.1f} {unit}'
+
+
+def archive_time(stats: dict) -> float:
+    if "total" in stats:
+        return stats["total"]["wall"]
+
+    return sum(counters["wall"] for counters in stats.values())
+
+
+def print_stats(results: list[Result], limit: int = 5):
+    summary = Stats()
+
+    for result in results:
+        summary.merge(Stats(result.stats))
+
+    print(
+        f'\n{"phase":<12} {"calls":>7} {"wall":>9} {"cpu":>9} '
+        f'{"read":>11} {"written":>11} {"files":>7}',
+        file=sys.stderr
+    )
+
+    for name, counters in sorted(summary.phases.items()):
+        print(
+            f'{name:<12} {counters["calls"]:>7} '
+            f'{counters["wall"]:>8.3f}s {counters["cpu"]:>8.3f}s '
+            f'{format_size(counters["read"]):>11} '
+            f'{format_size(counters["written"]):>11} '
+            f'{counters["files"]:>7}',
+            file=sys.stderr
+        )
+
+    slowest = sorted(
+        results,
+        key=lambda result: archive_time(result.stats),
+        reverse=True
+    )
+
+    print("\nslowest archives", file=sys.stderr)
+
+    for result in slowest[:limit]:
+        print(
+            f'|_ {result.path}: {archive_time(result.stats):.3f}s',
+            file=sys.stderr
+        )
+
+
+def write_stats(f, result: Result):
+    record = {
+        "path": result.path,
+        "error": result.error,
+        "phases": {
+            name: {field: counters[field] for field in FIELDS}
+            for name, counters in result.stats.items()
+        }
+    }
+
+    f.write(json.dumps(record) + "\n")
+    f.flush()
+
+
+def collect_results(
+    results: Iterable,
+    message: str
+) -> Iterable[Result]:
+    for path, _, error, stats in results:
+        if error is not None:
+            yield Result(path, None, str(error), stats)
+        else:
+            yield Result(path, f'{message} {path}', None, stats)
+
+
+def report(results: Iterable[Result], separator: str = None):
+    total, errors, printed, measured = 0, [], False, []
+    stats_json = os.environ.get("COMIC_FMT_STATS_JSON")
+
+    with open(stats_json, "w") if stats_json else nullcontext() as f:
+        for result in results:
+            total += 1
+
+            if result.stats is not None:
+                measured.append(result)
+
+                if f is not None:
+                    write_stats(f, result)
+
+            if result.error is not None:
+                print(
+                    f'error: {result.path}: {result.error}',
+                    file=sys.stderr
+                )
+                errors.append(result)
+                continue
+
+            if not result.output:
+                continue
+
+            if printed and separator is not None:
+                print(separator)
+
+            print(result.output)
+            printed = True
+
+    if measured and os.environ.get("COMIC_FMT_STATS"):
+        print_stats(measured)
+
+    if errors:
+        print_summary(errors, total)
+        exit(1)
+
+
+def process(
+    func: Callable,
+    tasks: Iterable,
+    jobs: int = 1,
+    separator: str = None,
+    target: Callable = None,
+    footprint: Callable = None
+):
+    with open_journal() as journal:
+        tasks = resume(tasks, journal, target)
+        results = run(func, tasks, jobs, stats_enabled(), footprint)
+
+        report(record(results, journal), separator)
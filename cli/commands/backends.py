@@ -0,0 +1,32 @@
+import click
+
+from comics import archive  # noqa: F401
+from comics.backends import formats, is_available, operations, registry
+from cli.common import error_handler
+
+
+@click.command(
+    short_help="List archive backends.",
+    help=(
+        "List the backends for each format and operation, fastest first. "
+        "Backends whose library or tool is missing are marked as "
+        "unavailable. A backend can be preferred with the --backend option."
+    )
+)
+@error_handler
+def backends():
+    for fmt in dict.fromkeys(formats.values()):
+        for operation in operations:
+            if (fmt, operation) in registry:
+                print(format_backends(fmt, operation))
+
+
+def format_backends(fmt: str, operation: str) -> str:
+    entries = registry[(fmt, operation)]
+    output = f'{fmt}.{operation} ({len(entries)})'
+
+    for backend in entries:
+        status = "" if is_available(backend) else " (unavailable)"
+        output += f'\n|_ {backend.name}{status}'
+
+    return output
@@ -1,20 +1,65 @@
 import click
 
-from comics import Comic
-from cli.common import error_handler, process_path
+from comics import Archive, Comic, utils
+from comics.compression import Policy, get_policy
+from comics.pipeline import Job, Pipeline
+from cli import batch
+from cli.common import (
+    compression_option,
+    error_handler,
+    jobs_option,
+    level_option,
+    process_path,
+    threads_option,
+    walker_options
+)
 
 
 @click.command(
     no_args_is_help=True,
     help="Convert to CBZ format."
 )
+@compression_option
+@level_option
+@threads_option
+@jobs_option
 @click.argument("path")
+@walker_options
 @click.pass_context
 @error_handler
-def cbz(ctx, path):
-    paths = process_path(path)
+def cbz(ctx, path, compression, level, threads, jobs, walker):
+    paths = process_path(path, walker)
+    policy = get_policy(compression, level)
+
+    if jobs == 1:
+        pipeline = Pipeline(policy, threads, stats=batch.stats_enabled())
+
+        with batch.open_journal() as journal:
+            tasks = batch.resume(batch.tasks(paths), journal, batch.cbz_target)
+            results = batch.collect_results(
+                pipeline.run(plan, tasks),
+                "Converted"
+            )
+
+            batch.report(batch.record(results, journal))
+        return
+
+    tasks = batch.tasks(paths, policy=policy, threads=threads)
+
+    batch.process(convert, tasks, jobs, target=batch.cbz_target)
+
+
+def convert(path: str, policy: Policy, threads: int) -> str:
+    c = Comic(path)
+    c.convert(policy, threads)
+
+    return f'Converted {path}'
+
+
+def plan(path: str) -> Job:
+    archive = Archive(path)
+
+    if archive.ext == ".cbz":
+        return None
 
-    for path in paths:
-        c = Comic(path)
-        c.convert()
-        print(f'Converted {path}')
+    return Job(path, utils.change_file_extension(path, ".cbz"))
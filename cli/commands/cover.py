@@ -0,0 +1,74 @@
+import os
+import posixpath
+import click
+
+from comics import Archive, handler, planner, utils
+from comics.cache import Cache
+from cli import batch
+from cli.common import (
+    error_handler,
+    jobs_option,
+    process_path,
+    walker_options
+)
+
+
+@click.command(
+    no_args_is_help=True,
+    help=(
+        "Extract the cover of a file archive. Only the first page is "
+        "decompressed, and repeat requests are served from a cache."
+    )
+)
+@click.option(
+    "--output",
+    "-o",
+    metavar="DIR",
+    help="Directory for covers. Defaults to the directory of the archive."
+)
+@click.option(
+    "--regex",
+    "-r",
+    metavar="PATTERN",
+    default=r"\d+",
+    help="Regular expression for finding pages."
+)
+@click.option(
+    "--cache",
+    metavar="FILE",
+    envvar="COMIC_FMT_CACHE",
+    help="Path to cover cache."
+)
+@jobs_option
+@click.argument("path")
+@walker_options
+@click.pass_context
+@error_handler
+def cover(ctx, path, output, regex, cache, jobs, walker):
+    paths = process_path(path, walker)
+
+    if output:
+        os.makedirs(output, exist_ok=True)
+
+    tasks = batch.tasks(paths, output=output, regex=regex, cache=cache)
+
+    batch.process(extract_cover, tasks, jobs)
+
+
+def extract_cover(path: str, output: str, regex: str, cache: str) -> str:
+    archive = Archive(path)
+    page = planner.first_page(archive.namelist(), regex)
+
+    handler.page_not_found(page, path)
+
+    with Cache(cache) as store:
+        data = store.read(archive, page)
+
+    title = utils.remove_file_extension(archive.filename)
+    ext = utils.get_file_extension(posixpath.basename(page))
+    target = os.path.join(output or archive.dirname, f'{title}{ext}')
+
+    with open(target, "wb") as f:
+        f.write(data)
+
+    return f'{path} > {target}'
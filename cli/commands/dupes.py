@@ -0,0 +1,94 @@
+import click
+
+from comics import dupes as finder
+from comics.index import Index
+from cli import batch
+from cli.common import (
+    error_handler,
+    index_option,
+    jobs_option,
+    process_path,
+    update_index,
+    walker_options
+)
+
+
+@click.command(
+    no_args_is_help=True,
+    short_help="Find duplicate archives.",
+    help=(
+        "Find duplicate archives and pages. Pages are compared by the CRC "
+        "and size stored in the archive, so no page data is decompressed."
+    )
+)
+@click.option(
+    "--threshold",
+    "-t",
+    type=click.FloatRange(min=0, max=1),
+    default=0.8,
+    help="Fraction of shared pages for archives to be similar."
+)
+@click.option(
+    "--pages/--no-pages",
+    default=True,
+    help="Report duplicate pages within each archive."
+)
+@index_option
+@jobs_option
+@click.argument("path")
+@walker_options
+@click.pass_context
+@error_handler
+def dupes(ctx, path, threshold, pages, index, jobs, walker):
+    paths = list(process_path(path, walker))
+
+    with Index(index) as library:
+        errors = update_index(library, paths, jobs)
+
+        failed = {result.path for result in errors}
+        indexed = [path for path in paths if path not in failed]
+
+        listings = library.listings(indexed)
+
+    signatures = {
+        path: finder.signatures(members)
+        for path, members in listings.items()
+    }
+
+    groups = []
+
+    for group in finder.exact(signatures):
+        groups.append(format_group(f'{group[0]} (exact)', group[1:]))
+
+    similar = {}
+
+    for path, other, score in finder.similar(signatures, threshold):
+        similar.setdefault(path, []).append(f'{other} ({score:.0%})')
+
+    for path, others in similar.items():
+        groups.append(format_group(f'{path} (similar)', others))
+
+    for path, items in signatures.items():
+        duplicates = finder.duplicate_pages(items) if pages else []
+
+        if duplicates:
+            groups.append(format_group(
+                f'{path} (duplicate pages)',
+                [", ".join(names) for names in duplicates]
+            ))
+
+    if groups:
+        print("\n\n".join(groups))
+
+    if errors:
+        batch.print_summary(errors, len(paths))
+        exit(1)
+
+
+def format_group(header: str, items: list[str]) -> str:
+    lines = [header]
+
+    for item in items:
+        lines.append(f'|_ {item}')
+
+    return "\n".join(lines)
@@ -0,0 +1,84 @@
+import click
+
+from comics import Comic
+from comics.metadata import COMPACT_THRESHOLD
+from cli import batch
+from cli.common import (
+    error_handler,
+    jobs_option,
+    process_path,
+    walker_options
+)
+
+
+def parse_fields(ctx, param, values) -> dict[str, str]:
+    fields = {}
+
+    for value in values:
+        field, sep, text = value.partition("=")
+
+        if not sep or not field:
+            raise click.BadParameter(f'expected FIELD=VALUE, got "{value}"')
+
+        fields[field] = text
+
+    return fields
+
+
+@click.command(
+    no_args_is_help=True,
+    help=(
+        "Read or update ComicInfo.xml. A CBZ is updated in place by "
+        "appending the new metadata, so the pages are not rewritten."
+    )
+)
+@click.option(
+    "--set",
+    "-s",
+    "fields",
+    metavar="FIELD=VALUE",
+    multiple=True,
+    callback=parse_fields,
+    help="Set a field. An empty value removes the field."
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=0, max=1),
+    default=COMPACT_THRESHOLD,
+    help="Fraction of unused space before an archive is compacted."
+)
+@jobs_option
+@click.argument("path")
+@walker_options
+@click.pass_context
+@error_handler
+def meta(ctx, path, fields, threshold, jobs, walker):
+    paths = process_path(path, walker)
+
+    tasks = batch.tasks(paths, fields=fields, threshold=threshold)
+
+    batch.process(
+        update_metadata,
+        tasks,
+        jobs,
+        separator="",
+        target=batch.cbz_target
+    )
+
+
+def update_metadata(path: str, fields: dict, threshold: float) -> str:
+    c = Comic(path)
+
+    if fields:
+        c.update_metadata(fields, threshold)
+
+    return format_metadata(c.archive.path, c.read_metadata())
+
+
+def format_metadata(path: str, fields: dict[str, str]) -> str:
+    lines = [f'{path} ({len(fields)})']
+
+    for field, value in fields.items():
+        lines.append(f'|_ {field}: {value}')
+
+    return "\n".join(lines)
@@ -1,7 +1,21 @@
 import click
 
-from comics import Comic
-from cli.common import error_handler, process_path
+from functools import partial
+
+from comics import Archive, Comic, backends, planner, utils
+from comics.compression import Policy, get_policy
+from comics.pipeline import Job, Pipeline
+from comics.scheduler import estimate
+from cli import batch
+from cli.common import (
+    compression_option,
+    error_handler,
+    jobs_option,
+    level_option,
+    process_path,
+    threads_option,
+    walker_options
+)
 
 
 @click.command(
@@ -36,21 +50,186 @@ from cli.common import error_handler, process_path
     is_flag=True,
     help="Remove all other files."
 )
+@click.option(
+    "--dry-run",
+    "-n",
+    is_flag=True,
+    help="Print the planned changes without applying them."
+)
+@compression_option
+@level_option
+@threads_option
+@jobs_option
 @click.argument("path")
+@walker_options
 @click.pass_context
 @error_handler
-def pages(ctx, path, pagename, regex, flatten, remove):
-    paths = process_path(path)
+def pages(
+    ctx,
+    path,
+    pagename,
+    regex,
+    flatten,
+    remove,
+    dry_run,
+    compression,
+    level,
+    threads,
+    jobs,
+    walker
+):
+    paths = process_path(path, walker)
+
+    if dry_run:
+        tasks = batch.tasks(
+            paths,
+            pagename=pagename,
+            regex=regex,
+            flatten=flatten,
+            remove=remove
+        )
+
+        batch.process(plan_comic, tasks, jobs, separator="")
+        return
+
+    policy = get_policy(compression, level)
+
+    if jobs == 1:
+        tasks = batch.tasks(
+            paths,
+            pagename=pagename,
+            regex=regex,
+            flatten=flatten,
+            remove=remove,
+            policy=policy
+        )
+
+        pipeline = Pipeline(policy, threads, stats=batch.stats_enabled())
+
+        with batch.open_journal() as journal:
+            tasks = batch.resume(tasks, journal, batch.cbz_target)
+            results = batch.collect_results(
+                pipeline.run(plan_job, tasks),
+                "Formatted"
+            )
+
+            batch.report(batch.record(results, journal))
+        return
+
+    tasks = batch.tasks(
+        paths,
+        pagename=pagename,
+        regex=regex,
+        flatten=flatten,
+        remove=remove,
+        policy=policy,
+        threads=threads
+    )
+
+    batch.process(
+        format_comic,
+        tasks,
+        jobs,
+        target=batch.cbz_target,
+        footprint=partial(estimate, threads=threads)
+    )
+
+
+def format_comic(
+    path: str,
+    pagename: str,
+    regex: str,
+    flatten: bool,
+    remove: bool,
+    policy: Policy,
+    threads: int
+) -> str:
+    c = Comic(path)
+    c.edit()
+
+    if flatten:
+        c.flatten()
+
+    if pagename:
+        c.format_pages(pagename, regex, remove)
+
+    c.save(policy, threads)
+
+    return f'Formatted {path}'
+
+
+def plan_mapping(
+    names: list[str],
+    pagename: str,
+    regex: str,
+    flatten: bool,
+    remove: bool
+) -> dict[str, str]:
+    mapping = {name: name for name in names}
+
+    if flatten:
+        mapping = planner.flatten(names)
+
+    if pagename:
+        names = [name for name in mapping.values() if name is not None]
+        pages = planner.format_pages(names, pagename, regex, remove)
+        mapping = planner.compose(mapping, pages)
+
+    return mapping
+
+
+def plan_job(
+    path: str,
+    pagename: str,
+    regex: str,
+    flatten: bool,
+    remove: bool,
+    policy: Policy
+) -> Job:
+    archive = Archive(path)
+    names = archive.namelist()
+    mapping = plan_mapping(names, pagename, regex, flatten, remove)
+
+    if not planner.changes(mapping) and policy is None:
+        if backends.supports(archive.ext, "copy"):
+            c = Comic(path)
+            c.edit()
+            c.save()
+            return None
+
+    members = {
+        new_name: name
+        for name, new_name in mapping.items()
+        if new_name is not None
+    }
+
+    return Job(path, utils.change_file_extension(path, ".cbz"), members)
+
+
+def plan_comic(
+    path: str,
+    pagename: str,
+    regex: str,
+    flatten: bool,
+    remove: bool
+) -> str:
+    names = Comic(path).namelist()
+    mapping = plan_mapping(names, pagename, regex, flatten, remove)
+    changes = planner.changes(mapping)
+
+    if not changes:
+        return None
 
-    for path in paths:
-        c = Comic(path)
+    return format_plan(path, changes)
 
-        if flatten:
-            c.flatten()
 
-        if pagename:
-            c.format_pages(pagename, regex, remove)
+def format_plan(path: str, changes: dict[str, str]) -> str:
+    lines = [f'{path} ({len(changes)})']
 
-        c.save()
+    for name, new_name in changes.items():
+        if new_name is None:
+            lines.append(f'|_ {name} (removed)')
+        else:
+            lines.append(f'|_ {name} > {new_name}')
 
-        print(f'Formatted {path}')
+    return "\n".join(lines)
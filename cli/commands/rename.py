@@ -1,7 +1,13 @@
 import click
 
 from comics import Comic, utils
-from cli.common import error_handler, process_path
+from cli import batch
+from cli.common import (
+    error_handler,
+    jobs_option,
+    process_path,
+    walker_options
+)
 
 
 @click.command(
@@ -19,21 +25,26 @@ from cli.common import error_handler, process_path
     is_flag=True,
     help="Remove extra characters from title."
 )
+@jobs_option
 @click.argument("path")
+@walker_options
 @click.pass_context
 @error_handler
-def rename(ctx, path, order, cleanup):
-    paths = process_path(path)
+def rename(ctx, path, order, cleanup, jobs, walker):
+    paths = list(process_path(path, walker))
 
-    title = None
     padding = utils.zero_padded(len(paths))
 
-    for idx, path in enumerate(paths):
-        c = Comic(path)
+    def tasks():
+        for idx, path in enumerate(paths):
+            title = f'{order}{idx + 1:{padding}}' if order else None
+            yield path, {"title": title, "cleanup": cleanup}
+
+    batch.process(rename_comic, tasks(), jobs)
 
-        if order:
-            title = f'{order}{idx + 1:{padding}}'
 
-        c.rename(title=title, cleanup=cleanup)
+def rename_comic(path: str, title: str, cleanup: bool) -> str:
+    c = Comic(path)
+    c.rename(title=title, cleanup=cleanup)
 
-        print(f'Renamed {path} to {c.archive.filename}')
+    return f'Renamed {path} to {c.archive.filename}'
@@ -1,39 +1,64 @@
 import click
 
-from comics import Comic
-from cli.common import error_handler, process_path
+from comics.index import Index
+from cli import batch
+from cli.common import (
+    error_handler,
+    index_option,
+    jobs_option,
+    process_path,
+    update_index,
+    walker_options
+)
 
 
 @click.command(
     no_args_is_help=True,
-    help="Search file archive."
+    help=(
+        "Search file archive. Members are read from a library index, so "
+        "only new or modified archives are opened."
+    )
 )
 @click.option(
     "--query",
     "-q",
     help="Search query"
 )
+@index_option
+@jobs_option
 @click.argument("path")
+@walker_options
 @click.pass_context
 @error_handler
-def search(ctx, path, query):
-    paths = process_path(path)
+def search(ctx, path, query, index, jobs, walker):
+    if not query:
+        return
+
+    paths = list(process_path(path, walker))
 
-    for path in paths:
-        c = Comic(path)
-        results = c.search(query)
+    with Index(index) as library:
+        errors = update_index(library, paths, jobs)
 
-        if not results:
-            continue
+        failed = {result.path for result in errors}
+        indexed = [path for path in paths if path not in failed]
 
-        print_results(path, results)
+        matches = library.search(indexed, query)
 
-        if path is not paths[-1]:
-            print()
+    if matches:
+        print("\n\n".join(
+            format_results(path, results)
+            for path, results in matches.items()
+        ))
 
+    if errors:
+        batch.print_summary(errors, len(paths))
+        exit(1)
 
-def print_results(path, results):
-    print(f'{path} ({len(results)})')
+
+def format_results(path, results):
+    lines = [f'{path} ({len(results)})']
 
     for result in results:
-        print(f'|_ {result}')
+        lines.append(f'|_ {result}')
+
+    return "\n".join(lines)
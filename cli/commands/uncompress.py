@@ -1,20 +1,32 @@
 import click
 
 from comics import Comic
-from cli.common import error_handler, process_path
+from cli import batch
+from cli.common import (
+    error_handler,
+    jobs_option,
+    process_path,
+    walker_options
+)
 
 
 @click.command(
     no_args_is_help=True,
     help="Uncompress file archive."
 )
+@jobs_option
 @click.argument("path")
+@walker_options
 @click.pass_context
 @error_handler
-def uncompress(ctx, path):
-    paths = process_path(path)
+def uncompress(ctx, path, jobs, walker):
+    paths = process_path(path, walker)
+
+    batch.process(uncompress_comic, batch.tasks(paths), jobs)
+
+
+def uncompress_comic(path: str) -> str:
+    c = Comic(path)
+    c.uncompress()
 
-    for path in paths:
-        c = Comic(path)
-        c.uncompress()
-        print(f'Uncompressed {path}')
+    return f'Uncompressed {path}'
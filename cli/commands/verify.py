@@ -0,0 +1,62 @@
+import click
+
+from contextlib import nullcontext
+from typing import Iterable
+
+from comics import Archive, handler
+from cli import batch
+from cli.common import (
+    error_handler,
+    jobs_option,
+    process_path,
+    walker_options
+)
+
+
+@click.command(
+    no_args_is_help=True,
+    help=(
+        "Verify file archive. Every page is decompressed and checked "
+        "against its CRC without writing anything to disk."
+    )
+)
+@click.option(
+    "--output",
+    "-o",
+    metavar="FILE",
+    help="Write the corrupt archives and the reason to a file."
+)
+@jobs_option
+@click.argument("path")
+@walker_options
+@click.pass_context
+@error_handler
+def verify(ctx, path, output, jobs, walker):
+    paths = process_path(path, walker)
+
+    with batch.open_journal() as journal:
+        results = batch.run(
+            verify_comic,
+            batch.resume(batch.tasks(paths), journal),
+            jobs,
+            batch.stats_enabled()
+        )
+        results = batch.record(results, journal)
+
+        with open(output, "w") if output else nullcontext() as f:
+            batch.report(write_errors(results, f))
+
+
+def verify_comic(path: str) -> str:
+    handler.corrupt_member(Archive(path).verify())
+
+    return f'Verified {path}'
+
+
+def write_errors(results: Iterable, f) -> Iterable[batch.Result]:
+    for result in results:
+        if f is not None and result.error is not None:
+            f.write(f'{result.path}\t{result.error}\n')
+            f.flush()
+
+        yield result
@@ -0,0 +1,174 @@
+import sys
+import time
+import click
+
+from functools import partial
+
+from comics import Comic
+from comics.compression import Policy, get_policy
+from comics.scheduler import estimate
+from comics.watcher import SETTLE_TIME, Watcher
+from cli import batch
+from cli.common import (
+    compression_option,
+    error_handler,
+    jobs_option,
+    level_option,
+    threads_option,
+    walker_options
+)
+
+
+@click.command(
+    no_args_is_help=True,
+    short_help="Process new archives in a directory.",
+    help=(
+        "Watch a directory and process new or changed archives once they "
+        "are fully written. Archives are converted to CBZ, and their pages "
+        "can be flattened, formatted and renamed. Processed archives are "
+        "recorded and never processed again unless they change."
+    )
+)
+@click.option(
+    "--pagename",
+    "-p",
+    help="Name of page."
+)
+@click.option(
+    "--regex",
+    metavar="PATTERN",
+    default=r"\d+",
+    help="Regular expression for finding pages."
+)
+@click.option(
+    "--flatten",
+    "-f",
+    is_flag=True,
+    help="Move all pages to root directory."
+)
+@click.option(
+    "--remove",
+    is_flag=True,
+    help="Remove all other files."
+)
+@click.option(
+    "--cleanup",
+    is_flag=True,
+    help="Remove extra characters from the title."
+)
+@click.option(
+    "--settle",
+    metavar="SECONDS",
+    type=click.FloatRange(min=0),
+    default=SETTLE_TIME,
+    help="Time an archive must be unchanged before it is processed."
+)
+@click.option(
+    "--interval",
+    metavar="SECONDS",
+    type=click.FloatRange(min=0),
+    default=2.0,
+    help="Time between scans of the directory."
+)
+@click.option(
+    "--state",
+    metavar="FILE",
+    envvar="COMIC_FMT_WATCH_STATE",
+    help="Path to the record of processed archives."
+)
+@click.option(
+    "--once",
+    is_flag=True,
+    help="Exit once all archives in the directory are processed."
+)
+@compression_option
+@level_option
+@threads_option
+@jobs_option
+@click.argument("path", type=click.Path(exists=True, file_okay=False))
+@walker_options
+@click.pass_context
+@error_handler
+def watch(
+    ctx,
+    path,
+    pagename,
+    regex,
+    flatten,
+    remove,
+    cleanup,
+    settle,
+    interval,
+    state,
+    once,
+    compression,
+    level,
+    threads,
+    jobs,
+    walker
+):
+    options = {
+        "pagename": pagename,
+        "regex": regex,
+        "flatten": flatten,
+        "remove": remove,
+        "cleanup": cleanup,
+        "policy": get_policy(compression, level),
+        "threads": threads
+    }
+
+    with Watcher(path, walker, settle, state) as watcher:
+        try:
+            while True:
+                ready = watcher.poll()
+
+                if ready:
+                    process(watcher, ready, options, jobs)
+                elif once and not watcher.waiting:
+                    break
+
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def process(watcher: Watcher, paths: list[str], options: dict, jobs: int):
+    tasks = batch.tasks(paths, **options)
+    footprint = partial(estimate, threads=options["threads"])
+    results = batch.run(process_comic, tasks, jobs, footprint=footprint)
+
+    for path, output, error, _ in results:
+        if error is not None:
+            print(f'error: {path}: {error}', file=sys.stderr)
+            watcher.mark(path)
+            continue
+
+        print(f'{path} > {output}', flush=True)
+        watcher.mark(path, output)
+
+
+def process_comic(
+    path: str,
+    pagename: str,
+    regex: str,
+    flatten: bool,
+    remove: bool,
+    cleanup: bool,
+    policy: Policy,
+    threads: int
+) -> str:
+    c = Comic(path)
+
+    if flatten:
+        c.flatten()
+
+    if pagename:
+        c.format_pages(pagename, regex, remove)
+
+    c.save(policy, threads)
+    c.convert(policy, threads)
+
+    if cleanup:
+        c.rename(cleanup=True)
+
+    return c.archive.path
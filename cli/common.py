@@ -1,32 +1,141 @@
-import os
-import shutil
+import sys
+import click
 
 from functools import wraps
+from typing import Iterable
 
+from comics import Archive
+from comics.archive import Member
+from comics.compression import policies
+from comics.index import Index
+from comics.walker import Walker, supported_orders
+from cli import batch
 
-def list_directory(dirname: str) -> list[str]:
-    items = sorted(os.listdir(dirname))
-    return [os.path.join(dirname, item) for item in items]
 
+index_option = click.option(
+    "--index",
+    "-i",
+    metavar="FILE",
+    envvar="COMIC_FMT_INDEX",
+    help="Path to library index."
+)
 
-def remove_temp_directory():
-    if os.path.exists("_temp"):
-        shutil.rmtree("_temp")
+jobs_option = click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    help="Number of archives to process in parallel (0 for all CPUs)."
+)
 
+threads_option = click.option(
+    "--threads",
+    "-t",
+    type=click.IntRange(min=0),
+    default=1,
+    help="Number of threads used to compress each archive (0 for all CPUs)."
+)
 
-def process_path(path: str) -> list[str]:
-    paths = []
+compression_option = click.option(
+    "--compression",
+    "-c",
+    type=click.Choice(list(policies)),
+    help=(
+        "Compression policy. Images are stored and other files are deflated, "
+        "except for max which deflates everything."
+    )
+)
 
-    if not os.path.exists(path):
-        paths.append(path)
+level_option = click.option(
+    "--level",
+    "-l",
+    type=click.IntRange(min=0, max=9),
+    help="Deflate level for the compression policy."
+)
 
-    if os.path.isfile(path):
-        paths.append(path)
 
-    if os.path.isdir(path):
-        paths.extend(list_directory(path))
+walker_option_list = [
+    click.option(
+        "--recursive",
+        "-R",
+        is_flag=True,
+        help="Include file archives in subdirectories."
+    ),
+    click.option(
+        "--include",
+        metavar="GLOB",
+        multiple=True,
+        help="Only include file archives that match the pattern."
+    ),
+    click.option(
+        "--exclude",
+        metavar="GLOB",
+        multiple=True,
+        help="Exclude file archives that match the pattern."
+    ),
+    click.option(
+        "--follow-symlinks",
+        is_flag=True,
+        help="Follow symbolic links."
+    ),
+    click.option(
+        "--hidden",
+        is_flag=True,
+        help="Include hidden files and directories."
+    ),
+    click.option(
+        "--sort",
+        type=click.Choice(list(supported_orders)),
+        default="name",
+        help="Order in which file archives are processed."
+    )
+]
 
-    return paths
+
+def walker_options(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        kwargs["walker"] = Walker(
+            recursive=kwargs.pop("recursive"),
+            include=kwargs.pop("include"),
+            exclude=kwargs.pop("exclude"),
+            follow_symlinks=kwargs.pop("follow_symlinks"),
+            hidden=kwargs.pop("hidden"),
+            sort=kwargs.pop("sort")
+        )
+        return func(*args, **kwargs)
+
+    for option in reversed(walker_option_list):
+        wrapper = option(wrapper)
+
+    return wrapper
+
+
+def process_path(path: str, walker: Walker = None) -> Iterable[str]:
+    return (walker or Walker()).walk(path)
+
+
+def scan_archive(path: str) -> list[Member]:
+    return Archive(path).members()
+
+
+def update_index(
+    library: Index,
+    paths: list[str],
+    jobs: int = 1
+) -> list[batch.Result]:
+    errors = []
+    stale = library.stale(paths)
+
+    for result in batch.run(scan_archive, batch.tasks(stale), jobs):
+        if result.error is not None:
+            print(f'error: {result.path}: {result.error}', file=sys.stderr)
+            errors.append(result)
+            continue
+
+        library.store(result.path, result.output)
+
+    return errors
 
 
 def error_handler(func):
@@ -35,7 +144,6 @@ def error_handler(func):
         try:
             return func(*args, **kwargs)
         except Exception as e:
-            remove_temp_directory()
             exit(f'error: {str(e)}')
 
     return wrapper
@@ -1,26 +1,190 @@
+import os
 import click
+import importlib
+import sys
 
-from cli.commands.cbz import cbz
-from cli.commands.pages import pages
-from cli.commands.rename import rename
-from cli.commands.search import search
-from cli.commands.uncompress import uncompress
+
+commands = {
+    "backends": ("cli.commands.backends", "List archive backends."),
+    "cbz": ("cli.commands.cbz", "Convert to CBZ format."),
+    "cover": ("cli.commands.cover", "Extract the cover of a file archive."),
+    "dupes": ("cli.commands.dupes", "Find duplicate archives."),
+    "meta": ("cli.commands.meta", "Read or update ComicInfo.xml."),
+    "pages": ("cli.commands.pages", "Format page names."),
+    "rename": ("cli.commands.rename", "Rename file archive."),
+    "search": ("cli.commands.search", "Search file archive."),
+    "uncompress": ("cli.commands.uncompress", "Uncompress file archive."),
+    "verify": ("cli.commands.verify", "Verify file archive."),
+    "watch": ("cli.commands.watch", "Process new archives in a directory.")
+}
+
+
+class LazyGroup(click.Group):
+    def __init__(self, *args, lazy_commands: dict = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(self, ctx: click.Context, name: str) -> click.Command:
+        if name in self.lazy_commands and name not in self.commands:
+            module, _ = self.lazy_commands[name]
+            self.add_command(getattr(importlib.import_module(module), name))
+
+        return super().get_command(ctx, name)
+
+    def format_commands(
+        self,
+        ctx: click.Context,
+        formatter: click.HelpFormatter
+    ):
+        rows = []
+
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                rows.append((name, self.commands[name].get_short_help_str()))
+            else:
+                rows.append((name, self.lazy_commands[name][1]))
+
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
 
 
 @click.group(
+    cls=LazyGroup,
+    lazy_commands=commands,
     help=(
         "Manage file archives for comic books.\n\n"
         "If the PATH for a command is a directory, then the operation is "
         "automatically applied to all file archives within the directory."
     )
 )
+@click.option(
+    "--workspace",
+    "-w",
+    metavar="DIR",
+    envvar="COMIC_FMT_WORKSPACE",
+    help="Root directory for temporary files."
+)
+@click.option(
+    "--memory-limit",
+    "-m",
+    metavar="BYTES",
+    type=click.IntRange(min=0),
+    envvar="COMIC_FMT_MEMORY_LIMIT",
+    help="Memory available for edits before spilling to disk."
+)
+@click.option(
+    "--memory-budget",
+    metavar="BYTES",
+    type=click.IntRange(min=0),
+    envvar="COMIC_FMT_MEMORY_BUDGET",
+    help="Memory shared by parallel edits. Defaults to half of the RAM."
+)
+@click.option(
+    "--scratch-budget",
+    metavar="BYTES",
+    type=click.IntRange(min=0),
+    envvar="COMIC_FMT_SCRATCH_BUDGET",
+    help="Workspace disk shared by parallel edits. Defaults to free space."
+)
+@click.option(
+    "--stats",
+    is_flag=True,
+    envvar="COMIC_FMT_STATS",
+    help="Print the time and I/O of each phase once the run is complete."
+)
+@click.option(
+    "--stats-json",
+    metavar="FILE",
+    envvar="COMIC_FMT_STATS_JSON",
+    help="Write a JSON record of the phases of each archive to a file."
+)
+@click.option(
+    "--journal",
+    metavar="FILE",
+    envvar="COMIC_FMT_JOURNAL",
+    help="Record the state of each archive in a journal."
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    envvar="COMIC_FMT_RESUME",
+    help="Skip archives completed by a previous run with the same options."
+)
+@click.option(
+    "--backend",
+    "-b",
+    metavar="SPEC",
+    envvar="COMIC_FMT_BACKEND",
+    help="Prefer a backend, as NAME, OPERATION=NAME or FORMAT.OPERATION=NAME."
+)
+@click.option(
+    "--profile",
+    metavar="FILE",
+    help="Write cProfile output for the run to a file, or - for stderr."
+)
 @click.pass_context
-def entry(ctx):
+def entry(
+    ctx,
+    workspace,
+    memory_limit,
+    memory_budget,
+    scratch_budget,
+    stats,
+    stats_json,
+    journal,
+    resume,
+    backend,
+    profile
+):
     ctx.ensure_object(dict)
 
+    if workspace:
+        os.environ["COMIC_FMT_WORKSPACE"] = workspace
+
+    if memory_limit is not None:
+        os.environ["COMIC_FMT_MEMORY_LIMIT"] = str(memory_limit)
+
+    if memory_budget is not None:
+        os.environ["COMIC_FMT_MEMORY_BUDGET"] = str(memory_budget)
+
+    if scratch_budget is not None:
+        os.environ["COMIC_FMT_SCRATCH_BUDGET"] = str(scratch_budget)
+
+    if stats:
+        os.environ["COMIC_FMT_STATS"] = "1"
+
+    if stats_json:
+        os.environ["COMIC_FMT_STATS_JSON"] = stats_json
+
+    if journal:
+        os.environ["COMIC_FMT_JOURNAL"] = journal
+
+    if resume:
+        os.environ["COMIC_FMT_RESUME"] = "1"
+
+    if backend:
+        os.environ["COMIC_FMT_BACKEND"] = backend
+
+    if profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        ctx.call_on_close(lambda: dump_profile(profiler, profile))
+
+
+def dump_profile(profiler, path: str):
+    import pstats
+
+    profiler.disable()
+
+    if path != "-":
+        profiler.dump_stats(path)
+        return
 
-entry.add_command(cbz)
-entry.add_command(pages)
-entry.add_command(rename)
-entry.add_command(search)
-entry.add_command(uncompress)
+    stats = pstats.Stats(profiler, stream=sys.stderr)
+    stats.sort_stats("cumulative").print_stats(30)
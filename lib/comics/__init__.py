@@ -1,7 +1,16 @@
-from .archive import Archive
-from .comic import Comic
+import importlib
 
-__all__ = [
-    "Archive",
-    "Comic"
-]
+
+exports = {
+    "Archive": ".archive",
+    "Comic": ".comic"
+}
+
+__all__ = list(exports)
+
+
+def __getattr__(name: str):
+    if name not in exports:
+        raise AttributeError(f'module {__name__} has no attribute {name}')
+
+    return getattr(importlib.import_module(exports[name], __name__), name)
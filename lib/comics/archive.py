@@ -1,17 +1,349 @@
 import os
+import ctypes
+import shutil
+import struct
+import time
+import zlib
 
-from zipfile import ZipFile
-from unrar.rarfile import RarFile
+from contextlib import ExitStack
+from typing import NamedTuple
+from zipfile import BadZipFile, ZipFile, ZipInfo, ZIP_STORED
 
-from comics import handler, utils
+from comics import backends, handler, rar, utils
+from comics import tools  # noqa: F401
+from comics.compression import HEADER_SIZE, Policy
+from comics.stats import Phase, phase
+from comics.workspace import staged
+from comics.writer import Writer
 
 
-supported_extensions = {
-    ".zip": ZipFile,
-    ".cbz": ZipFile,
-    ".rar": RarFile,
-    ".cbr": RarFile
-}
+def rar_file(*args, **kwargs):
+    from unrar.rarfile import RarFile
+
+    return RarFile(*args, **kwargs)
+
+
+def has_unrar_library() -> bool:
+    from unrar import unrarlib  # noqa: F401
+
+    return True
+
+
+RHDF_DIRECTORY = 0x20
+
+
+class Member(NamedTuple):
+    name: str
+    size: int
+    crc: int
+
+
+def list_zip(path: str) -> list[Member]:
+    with ZipFile(path) as archive:
+        return [
+            Member(info.filename, info.file_size, info.CRC)
+            for info in archive.infolist()
+        ]
+
+
+def list_rar(path: str) -> list[Member]:
+    return [
+        Member(entry.name, entry.size, entry.crc)
+        for entry in rar.read_entries(path)
+    ]
+
+
+def rar_member_name(info) -> str:
+    if info.flag_bits & RHDF_DIRECTORY:
+        return f'{info.filename.rstrip("/")}/'
+
+    return info.filename
+
+
+def list_rar_library(path: str) -> list[Member]:
+    with rar_file(path) as archive:
+        return [
+            Member(rar_member_name(info), info.file_size, info.CRC)
+            for info in archive.infolist()
+        ]
+
+
+def read_zip(path: str, item: str) -> bytes:
+    with ZipFile(path) as archive:
+        return archive.read(item)
+
+
+def read_rar(path: str, item: str) -> bytes:
+    with rar_file(path) as archive:
+        return archive.read(item)
+
+
+def extract_zip(path: str, output_path: str, names: list[str] = None):
+    with ZipFile(path) as archive:
+        archive.extractall(output_path, members=names)
+
+
+def extract_rar(path: str, output_path: str, names: list[str] = None):
+    with rar_file(path) as archive:
+        archive.extractall(output_path, members=names)
+
+
+def verify_zip(path: str) -> str:
+    with ZipFile(path) as archive:
+        for info in archive.infolist():
+            try:
+                with archive.open(info) as f:
+                    while f.read(shutil.COPY_BUFSIZE):
+                        pass
+            except (BadZipFile, EOFError, zlib.error):
+                return info.filename
+
+    return None
+
+
+def verify_rar(path: str) -> str:
+    error = rar_file(path).testrar()
+
+    if error is not None:
+        return error.replace("\\", "/")
+
+    return None
+
+
+def select_members(names: list[str], members: dict[str, str] = None):
+    if members is None:
+        return {item: item for item in names}
+
+    return {member: item for item, member in members.items()}
+
+
+def stream_zip_member(
+    archive: ZipFile,
+    writer: Writer,
+    info: ZipInfo,
+    name: str
+):
+    entry = ZipInfo(name, date_time=info.date_time)
+    entry.file_size = info.file_size
+
+    with archive.open(info) as src, writer.open(entry) as dst:
+        shutil.copyfileobj(src, dst)
+
+
+def stream_zip(path: str, writer: Writer, members: dict[str, str] = None):
+    with ZipFile(path) as archive:
+        selected = select_members(archive.namelist(), members)
+        missing = set(selected).difference(archive.namelist())
+
+        handler.members_not_found(missing, path)
+
+        for info in archive.infolist():
+            if info.filename not in selected:
+                continue
+
+            name = selected[info.filename]
+
+            if info.is_dir():
+                writer.mkdir(name)
+                continue
+
+            stream_zip_member(archive, writer, info, name)
+
+
+def stream_rar(path: str, writer: Writer, members: dict[str, str] = None):
+    from unrar import constants, unrarlib
+
+    selected = None if members is None else select_members([], members)
+    found = set()
+
+    data = unrarlib.RAROpenArchiveDataEx(path, mode=constants.RAR_OM_EXTRACT)
+    handle = unrarlib.RAROpenArchiveEx(ctypes.byref(data))
+
+    entry, error = None, None
+
+    def process(op: int):
+        unrarlib.RARProcessFileW(handle, op, None, None)
+
+    def extract():
+        try:
+            process(constants.RAR_TEST)
+        finally:
+            if error is not None:
+                raise error
+
+    def callback(msg, user_data, addr, size):
+        nonlocal error
+
+        if msg != constants.UCM_PROCESSDATA:
+            return 1
+
+        try:
+            entry.write((ctypes.c_char * size).from_address(addr).raw)
+        except BaseException as e:
+            error = e
+            return -1
+
+        return 1
+
+    c_callback = unrarlib.UNRARCALLBACK(callback)
+    unrarlib.RARSetCallback(handle, c_callback, 0)
+
+    header = unrarlib.RARHeaderDataEx()
+
+    try:
+        while True:
+            try:
+                unrarlib.RARReadHeaderEx(handle, ctypes.byref(header))
+            except unrarlib.ArchiveEnd:
+                break
+
+            name = header.FileNameW.replace("\\", "/")
+
+            if header.Flags & RHDF_DIRECTORY:
+                name = f'{name.rstrip("/")}/'
+
+            if selected is not None:
+                if name not in selected:
+                    process(constants.RAR_SKIP)
+                    continue
+
+                found.add(name)
+                name = selected[name]
+
+            if header.Flags & RHDF_DIRECTORY:
+                writer.mkdir(name)
+                process(constants.RAR_SKIP)
+                continue
+
+            date_time = unrarlib.dostime_to_timetuple(header.FileTime)
+
+            info = ZipInfo(name, date_time=date_time)
+            info.file_size = header.UnpSize + (header.UnpSizeHigh << 32)
+
+            entry = writer.open(info)
+            extract()
+
+            entry.close()
+            entry = None
+    finally:
+        if entry is not None:
+            entry.close()
+
+        unrarlib.RARCloseArchive(handle)
+
+    if selected is not None:
+        handler.members_not_found(set(selected) - found, path)
+
+
+def strip_zip64(extra: bytes) -> bytes:
+    fields, idx = b"", 0
+
+    while idx + 4 <= len(extra):
+        header_id, size = struct.unpack("<HH", extra[idx:idx + 4])
+
+        if header_id != 0x0001:
+            fields += extra[idx:idx + 4 + size]
+
+        idx += 4 + size
+
+    return fields
+
+
+def copy_zip_member(source, writer: Writer, info: ZipInfo, name: str):
+    entry = ZipInfo(name, date_time=info.date_time)
+
+    entry.compress_type = info.compress_type
+    entry.comment = info.comment
+    entry.extra = strip_zip64(info.extra)
+    entry.create_system = info.create_system
+    entry.create_version = info.create_version
+    entry.extract_version = info.extract_version
+    entry.flag_bits = info.flag_bits & ~0x08
+    entry.internal_attr = info.internal_attr
+    entry.external_attr = info.external_attr
+    entry.CRC = info.CRC
+    entry.compress_size = info.compress_size
+    entry.file_size = info.file_size
+
+    source.seek(info.header_offset)
+    header = source.read(30)
+    name_size, extra_size = struct.unpack("<HH", header[26:30])
+    source.seek(name_size + extra_size, os.SEEK_CUR)
+
+    data = source.read(info.compress_size)
+
+    if len(data) < info.compress_size:
+        raise EOFError(f'unexpected end of data for "{info.filename}"')
+
+    writer.copy(entry, data)
+
+
+def member_size(source, info: ZipInfo) -> int:
+    source.seek(info.header_offset)
+    header = source.read(30)
+    name_size, extra_size = struct.unpack("<HH", header[26:30])
+
+    size = 30 + name_size + extra_size + info.compress_size
+
+    if info.flag_bits & 0x08:
+        size += 16
+
+    return size
+
+
+def keeps_compression(archive: ZipFile, info: ZipInfo, policy: Policy):
+    if policy is None or info.is_dir():
+        return True
+
+    with archive.open(info) as src:
+        compress_type, _ = policy.select(src.read(HEADER_SIZE))
+
+    return compress_type == info.compress_type
+
+
+def copy_zip(path: str, writer: Writer, members: dict[str, str] = None):
+    with ZipFile(path) as archive, open(path, "rb") as source:
+        if members is None:
+            members = select_members(archive.namelist())
+
+        missing = set(members.values()).difference(archive.namelist())
+
+        handler.members_not_found(missing, path)
+
+        for name, member in members.items():
+            info = archive.getinfo(member)
+
+            if keeps_compression(archive, info, writer.policy):
+                copy_zip_member(source, writer, info, name)
+            else:
+                stream_zip_member(archive, writer, info, name)
+
+
+registrations = [
+    ("zip", "list", "zipfile", list_zip, 1, None),
+    ("zip", "read", "zipfile", read_zip, 1, None),
+    ("zip", "extract", "zipfile", extract_zip, 1, None),
+    ("zip", "stream", "zipfile", stream_zip, 1, None),
+    ("zip", "copy", "zipfile", copy_zip, 1, None),
+    ("zip", "verify", "zipfile", verify_zip, 1, None),
+    ("zip", "write", "zipfile", ZipFile, 1, None),
+    ("rar", "list", "headers", list_rar, 10, None),
+    ("rar", "list", "unrar-lib", list_rar_library, 1, has_unrar_library),
+    ("rar", "read", "unrar-lib", read_rar, 1, has_unrar_library),
+    ("rar", "extract", "unrar-lib", extract_rar, 1, has_unrar_library),
+    ("rar", "stream", "unrar-lib", stream_rar, 1, has_unrar_library),
+    ("rar", "verify", "unrar-lib", verify_rar, 1, has_unrar_library)
+]
+
+for registration in registrations:
+    backends.register(*registration)
+
+
+def transfer(ext: str):
+    if backends.supports(ext, "copy"):
+        return backends.select(ext, "copy")
+
+    return backends.select(ext, "stream")
 
 
 class Archive:
@@ -19,40 +351,106 @@ class Archive:
         ext = utils.get_file_extension(path)
 
         handler.file_not_found(path)
-        handler.unsupported_extension(ext, supported_extensions)
+        handler.unsupported_extension(ext, backends.formats)
 
         self.path = path
         self.dirname, self.filename = os.path.split(path)
         self.ext = ext
 
     @staticmethod
-    def compress(source: str, target: str, exclude_dir: bool = False):
+    def compress(
+        source: str,
+        target: str,
+        exclude_dir: bool = False,
+        policy: Policy = None,
+        threads: int = 1,
+        origin: str = None,
+        reuse: dict[str, str] = None
+    ):
         '''Create new file archive.
 
         Add the contents of a directory to a new file archive. The format of
-        the archive is inferred from the file extension.
+        the archive is inferred from the file extension. If a compression
+        policy is specified, the compression of each item is selected based
+        on its content.
+
+        If multiple threads are specified, items are compressed in parallel
+        and added to the archive in the same order.
+
+        If an origin ZIP archive is specified, items in the reuse mapping are
+        known to be identical to a member of the origin. Their compressed
+        data is copied from the origin instead of being recompressed.
 
         Args:
             source (str): Path to source directory.
             target (str): Path to target file archive.
             exclude_dir (bool): Exclude top level directory.
+            policy (Policy): Compression policy.
+            threads (int): Number of compression threads.
+            origin (str): Path to origin ZIP archive.
+            reuse (dict): Mapping of relative paths to origin members.
         '''
 
         ext = utils.get_file_extension(target)
 
         handler.file_not_found(source)
-        handler.unsupported_extension(ext, supported_extensions)
 
-        tool = supported_extensions[ext]
+        tool = backends.select(ext, "write")
+        reuse = reuse or {}
+
+        with phase("traverse") as record:
+            items = list(utils.traverse(source))
+            record.files = len(items)
+
+        with phase("compress") as record:
+            with tool(target, mode='w') as archive, ExitStack() as stack:
+                writer = stack.enter_context(Writer(archive, policy, threads))
+
+                if reuse:
+                    origin_archive = stack.enter_context(ZipFile(origin))
+                    origin_file = stack.enter_context(open(origin, "rb"))
+
+                for dirname, item in items:
+                    path, arcname = os.path.join(dirname, item), None
+                    name = os.path.relpath(path, source).replace(os.sep, "/")
+
+                    if exclude_dir:
+                        arcname = os.path.relpath(path, source)
+
+                    record.files += 1
+
+                    if policy is None and threads == 1 and not reuse:
+                        archive.write(path, arcname=arcname)
+
+                        if os.path.isfile(path):
+                            record.measure(read=path)
+                        continue
+
+                    entry = ZipInfo.from_file(path, arcname)
 
-        with tool(target, mode='w') as archive:
-            for dirname, item in utils.traverse(source):
-                path, arcname = os.path.join(dirname, item), None
+                    if entry.is_dir():
+                        writer.write(entry, b"")
+                        continue
 
-                if exclude_dir:
-                    arcname = utils.remove_top_directory(path)
+                    if name in reuse:
+                        info = origin_archive.getinfo(reuse[name])
 
-                archive.write(path, arcname=arcname)
+                        if keeps_compression(origin_archive, info, policy):
+                            copy_zip_member(
+                                origin_file,
+                                writer,
+                                info,
+                                entry.filename
+                            )
+                            continue
+
+                    with open(path, "rb") as f:
+                        data = f.read()
+
+                    record.read += len(data)
+                    writer.write(entry, data)
+
+            record.measure(written=target)
 
     def uncompress(self, output_path: str = None):
         '''Uncompress file archive.
@@ -64,19 +462,266 @@ class Archive:
             output_path (str): Path for uncompressed data.
         '''
 
-        tool = supported_extensions[self.ext]
+        with phase("uncompress") as record:
+            backends.run(
+                self.ext,
+                "extract",
+                self.path,
+                output_path or self.dirname
+            )
+
+            record.measure(read=self.path)
+
+            if record.enabled:
+                members = backends.run(self.ext, "list", self.path)
+
+                record.files = len(members)
+                record.written = sum(member.size for member in members)
+
+    def extract_members(self, names: list[str], output_path: str = None):
+        '''Extract members of file archive.
+
+        Uncompress only the requested items. Other items are skipped without
+        being decompressed. If output_path is not specified, will default to
+        the same directory.
+
+        Args:
+            names (list): Names of items.
+            output_path (str): Path for uncompressed data.
+        '''
+
+        with phase("extract") as record:
+            backends.run(
+                self.ext,
+                "extract",
+                self.path,
+                output_path or self.dirname,
+                names
+            )
+
+            record.files = len(names)
+
+    def stream(
+        self,
+        target: str,
+        members: dict[str, str] = None,
+        policy: Policy = None,
+        threads: int = 1
+    ):
+        '''Stream file archive into a new ZIP archive.
+
+        Copy each item directly from the file archive into a new ZIP archive
+        without writing any intermediate data to disk. If members is
+        specified, only those items are copied under their new names.
+
+        Args:
+            target (str): Path to target file archive.
+            members (dict): Mapping of new item names to existing items.
+            policy (Policy): Compression policy.
+            threads (int): Number of compression threads.
+        '''
+
+        stream = backends.select(self.ext, "stream")
+
+        try:
+            with phase("stream") as record:
+                with ZipFile(target, mode='w') as output:
+                    with Writer(output, policy, threads) as writer:
+                        stream(self.path, writer, members)
+
+                self.__measure(record, output, target)
+        except Exception:
+            if os.path.exists(target):
+                os.remove(target)
+            raise
+
+    def copy(
+        self,
+        target: str,
+        members: dict[str, str] = None,
+        policy: Policy = None,
+        threads: int = 1
+    ):
+        '''Copy file archive without recompressing.
+
+        Copy the compressed data of each item directly into a new ZIP
+        archive. Only the file headers are rewritten, which allows items to
+        be renamed or removed without decompressing any data. If a
+        compression policy is specified, items that do not match the policy
+        are recompressed.
+
+        Args:
+            target (str): Path to target file archive.
+            members (dict): Mapping of new item names to existing items.
+            policy (Policy): Compression policy.
+            threads (int): Number of compression threads.
+        '''
+
+        copy = backends.select(self.ext, "copy")
+
+        try:
+            with phase("copy") as record:
+                with ZipFile(target, mode='w') as output:
+                    with Writer(output, policy, threads) as writer:
+                        copy(self.path, writer, members)
+
+                self.__measure(record, output, target)
+        except Exception:
+            if os.path.exists(target):
+                os.remove(target)
+            raise
+
+    def append(self, item: str, data: bytes, policy: Policy = None):
+        '''Append item to file archive.
+
+        Add or replace an item in place by appending it to a ZIP archive.
+        Only the new item and the central directory are written. A replaced
+        item is overwritten if it was the last item in the archive, and is
+        otherwise left as unused space until the archive is compacted.
+
+        If no compression policy is specified, a replaced item keeps its
+        compression and a new item is stored.
+
+        Args:
+            item (str): Name of item.
+            data (bytes): Uncompressed data of the item.
+            policy (Policy): Compression policy.
+        '''
 
-        with tool(self.path) as archive:
-            archive.extractall(output_path or self.dirname)
+        handler.unsupported_operation(self.ext, "write")
 
-    def search(self, query: str) -> list[str]:
+        compress_type, level = ZIP_STORED, None
+
+        with phase("append") as record:
+            with ZipFile(self.path, mode='a') as archive:
+                previous = archive.NameToInfo.pop(item, None)
+
+                if previous is not None:
+                    archive.filelist.remove(previous)
+                    compress_type = previous.compress_type
+
+                    if all(
+                        info.header_offset < previous.header_offset
+                        for info in archive.filelist
+                    ):
+                        archive.start_dir = previous.header_offset
+
+                if policy is not None:
+                    compress_type, level = policy.select(data[:HEADER_SIZE])
+
+                entry = ZipInfo(item, date_time=time.localtime()[:6])
+                entry.compress_type = compress_type
+                entry.external_attr = 0o644 << 16
+
+                archive.writestr(entry, data, compresslevel=level)
+
+            record.written = len(data)
+            record.files = 1
+
+    def wasted(self) -> int:
+        '''Measure unused space.
+
+        Returns:
+            The number of bytes in a ZIP archive before the central
+            directory that do not belong to any item.
+        '''
+
+        handler.unsupported_operation(self.ext, "write")
+
+        with ZipFile(self.path) as archive, open(self.path, "rb") as source:
+            used = sum(
+                member_size(source, info) for info in archive.infolist()
+            )
+
+            return max(archive.start_dir - used, 0)
+
+    def compact(self):
+        '''Compact file archive.
+
+        Copy the items into a new ZIP archive without recompressing, which
+        removes the unused space left behind by replaced items.
+        '''
+
+        with phase("compact"), staged(self.path) as temp_path:
+            self.copy(temp_path)
+
+    def namelist(self) -> list[str]:
+        '''List file archive.
+
+        Directories are marked with a trailing slash regardless of the
+        format of the archive.
+
+        Returns:
+            A list of all items within the archive.
+        '''
+
+        return [member.name for member in self.members()]
+
+    def members(self) -> list[Member]:
+        '''List members of file archive.
+
+        RAR archives are listed by reading their headers directly, so the
+        unrar library is only required to extract data.
+
+        Returns:
+            The name, uncompressed size and CRC of all items within the
+            archive.
+        '''
+
+        with phase("list") as record:
+            members = backends.run(self.ext, "list", self.path)
+            record.files = len(members)
+
+        return members
+
+    def read(self, item: str) -> bytes:
+        '''Read item from file archive.
+
+        Args:
+            item (str): Name of item.
+
+        Returns:
+            The uncompressed data of the item.
+        '''
+
+        with phase("read") as record:
+            data = backends.run(self.ext, "read", self.path, item)
+
+            record.read = len(data)
+            record.files = 1
+
+        return data
+
+    def verify(self) -> str:
+        '''Verify file archive.
+
+        Every item is decompressed in chunks and checked against its CRC
+        without being written to disk.
+
+        Returns:
+            The name of the first corrupt item, or None if the archive is
+            intact.
+        '''
+
+        with phase("verify") as record:
+            error = backends.run(self.ext, "verify", self.path)
+
+            record.measure(read=self.path)
+            record.files = 1
+
+        return error
+
+    def search(self, query: str, index=None) -> list[str]:
         '''Search the file archive.
 
         Recursively searches the file archive for any item that matches
-        the query.
+        the query. If an index is specified, the items are listed from the
+        index and the archive is only read if it changed since it was last
+        indexed.
 
         Args:
             query (str): Search query.
+            index (Index): Library index.
 
         Returns:
             A list of items within the archive that match the query.
@@ -85,7 +730,11 @@ class Archive:
         if not query:
             return []
 
-        tool = supported_extensions[self.ext]
+        if index is not None:
+            return index.search([self.path], query).get(self.path, [])
+
+        return [item for item in self.namelist() if query in item]
 
-        with tool(self.path) as archive:
-            return [item for item in archive.namelist() if query in item]
+    def __measure(self, record: Phase, output: ZipFile, target: str):
+        record.measure(read=self.path, written=target)
+        record.files = len(output.filelist)
@@ -0,0 +1,178 @@
+import os
+
+from typing import Callable, NamedTuple
+
+
+formats = {
+    ".zip": "zip",
+    ".cbz": "zip",
+    ".rar": "rar",
+    ".cbr": "rar"
+}
+
+operations = ["list", "read", "extract", "stream", "copy", "verify", "write"]
+
+
+class BackendError(Exception):
+    pass
+
+
+class Backend(NamedTuple):
+    name: str
+    func: Callable
+    speed: float = 1.0
+    probe: Callable = None
+
+
+registry = {}
+probes = {}
+
+
+def register(
+    fmt: str,
+    operation: str,
+    name: str,
+    func: Callable,
+    speed: float = 1.0,
+    probe: Callable = None
+):
+    '''Register backend.
+
+    Backends for the same format and operation are ranked by their relative
+    speed. A backend is only used if its probe succeeds, and the result of
+    the probe is cached for the lifetime of the process.
+
+    Args:
+        fmt (str): Archive format, such as zip or rar.
+        operation (str): Name of operation.
+        name (str): Name of backend.
+        func (Callable): Implementation of the operation.
+        speed (float): Relative speed of the backend.
+        probe (Callable): Check whether the backend can be used.
+    '''
+
+    if operation not in operations:
+        raise ValueError(f'unsupported operation {operation}')
+
+    backends = registry.setdefault((fmt, operation), [])
+    backends[:] = [backend for backend in backends if backend.name != name]
+    backends.append(Backend(name, func, speed, probe))
+    backends.sort(key=lambda backend: backend.speed, reverse=True)
+
+
+def supports(ext: str, operation: str) -> bool:
+    return (formats.get(ext), operation) in registry
+
+
+def is_available(backend: Backend) -> bool:
+    if backend.probe is None:
+        return True
+
+    if backend.name not in probes:
+        try:
+            probes[backend.name] = bool(backend.probe())
+        except Exception:
+            probes[backend.name] = False
+
+    return probes[backend.name]
+
+
+def overrides() -> dict[str, str]:
+    selected = {}
+    spec = os.environ.get("COMIC_FMT_BACKEND", "")
+
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, sep, name = item.rpartition("=")
+        selected[key if sep else ""] = name
+
+    return selected
+
+
+def candidates(ext: str, operation: str) -> list[Backend]:
+    '''Rank backends.
+
+    Backends are ordered by speed, and unavailable backends are skipped. A
+    backend can be preferred with COMIC_FMT_BACKEND, as a comma separated
+    list of names for all operations, operation=name or format.operation=name.
+
+    Args:
+        ext (str): File extension of archive.
+        operation (str): Name of operation.
+
+    Returns:
+        The available backends, fastest first.
+    '''
+
+    fmt = formats.get(ext)
+    backends = registry.get((fmt, operation))
+
+    if not backends:
+        raise AttributeError(f'unsupported operation {operation} for {ext}')
+
+    selected = overrides()
+
+    for key in (f'{fmt}.{operation}', operation, ""):
+        name = selected.get(key)
+
+        if name is None:
+            continue
+
+        preferred = [backend for backend in backends if backend.name == name]
+
+        if key and not preferred:
+            raise LookupError(f'unknown backend {name} for {fmt}.{operation}')
+
+        if preferred:
+            backends = preferred
+            break
+
+    available = [backend for backend in backends if is_available(backend)]
+
+    if not available:
+        names = ", ".join(backend.name for backend in backends)
+        message = f'no available backend for {fmt}.{operation} ({names})'
+
+        raise LookupError(message)
+
+    return available
+
+
+def select(ext: str, operation: str) -> Callable:
+    '''Select the fastest available backend.
+
+    Args:
+        ext (str): File extension of archive.
+        operation (str): Name of operation.
+
+    Returns:
+        The implementation of the operation.
+    '''
+
+    return candidates(ext, operation)[0].func
+
+
+def run(ext: str, operation: str, *args, **kwargs):
+    '''Run operation.
+
+    Run the operation with the fastest available backend. If an external
+    tool fails, the next backend is tried.
+
+    Args:
+        ext (str): File extension of archive.
+        operation (str): Name of operation.
+        args: Arguments for the operation.
+        kwargs: Keyword arguments for the operation.
+
+    Returns:
+        The result of the operation.
+    '''
+
+    error = None
+
+    for backend in candidates(ext, operation):
+        try:
+            return backend.func(*args, **kwargs)
+        except BackendError as e:
+            error = e
+
+    raise error
@@ -0,0 +1,216 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+from comics import utils
+from comics.archive import Archive
+from comics.index import signature
+
+
+CACHE_SIZE = 256 * 1024 * 1024
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT NOT NULL,
+    member TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    digest TEXT NOT NULL REFERENCES blobs (digest),
+    accessed INTEGER NOT NULL,
+    PRIMARY KEY (path, member)
+);
+
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+'''
+
+
+def default_path() -> str:
+    return utils.cache_path("cache.db")
+
+
+class Cache:
+    def __init__(self, path: str = None, max_size: int = None):
+        path = path or os.environ.get("COMIC_FMT_CACHE") or default_path()
+
+        if max_size is None:
+            max_size = int(
+                os.environ.get("COMIC_FMT_CACHE_SIZE", CACHE_SIZE)
+            )
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.max_size = max_size
+        self.connection = sqlite3.connect(path)
+
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_trace):
+        self.close()
+
+    def close(self):
+        '''Close cache.'''
+
+        self.connection.close()
+
+    def get(self, path: str, member: str) -> bytes:
+        '''Get cached member.
+
+        A cached member is only returned if the size and modification time
+        of the archive are unchanged since it was cached.
+
+        Args:
+            path (str): Path to file archive.
+            member (str): Name of item.
+
+        Returns:
+            The uncompressed data of the item, or None if it is not cached.
+        '''
+
+        key = os.path.abspath(path)
+        size, mtime = signature(path)
+
+        row = self.connection.execute(
+            "SELECT blobs.data FROM entries "
+            "JOIN blobs ON blobs.digest = entries.digest "
+            "WHERE entries.path = ? AND entries.member = ? "
+            "AND entries.size = ? AND entries.mtime = ?",
+            (key, member, size, mtime)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        with self.connection:
+            self.connection.execute(
+                "UPDATE entries SET accessed = ? "
+                "WHERE path = ? AND member = ?",
+                (time.time_ns(), key, member)
+            )
+
+        return row[0]
+
+    def put(self, path: str, member: str, data: bytes):
+        '''Cache member.
+
+        The data is stored once per content digest, so identical items from
+        different archives share the same storage. Once the cache exceeds
+        its maximum size, the least recently used items are evicted.
+
+        Args:
+            path (str): Path to file archive.
+            member (str): Name of item.
+            data (bytes): Uncompressed data of the item.
+        '''
+
+        key = os.path.abspath(path)
+        size, mtime = signature(path)
+        digest = hashlib.sha256(data).hexdigest()
+
+        previous = self.connection.execute(
+            "SELECT digest FROM entries WHERE path = ? AND member = ?",
+            (key, member)
+        ).fetchone()
+
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)",
+                (digest, len(data), data)
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (key, member, size, mtime, digest, time.time_ns())
+            )
+
+            if previous is not None and previous[0] != digest:
+                self.__remove_unused(previous[0])
+
+        self.evict()
+
+    def read(self, archive: Archive, member: str) -> bytes:
+        '''Read member through the cache.
+
+        Args:
+            archive (Archive): File archive.
+            member (str): Name of item.
+
+        Returns:
+            The uncompressed data of the item.
+        '''
+
+        data = self.get(archive.path, member)
+
+        if data is None:
+            data = archive.read(member)
+            self.put(archive.path, member, data)
+
+        return data
+
+    def size(self) -> int:
+        '''Measure cache.
+
+        Returns:
+            The total size of the cached data in bytes.
+        '''
+
+        row = self.connection.execute("SELECT SUM(size) FROM blobs")
+        return row.fetchone()[0] or 0
+
+    def evict(self):
+        '''Evict least recently used items.
+
+        Remove items until the cache is within its maximum size. Data is
+        removed once no item refers to it.
+        '''
+
+        total = self.size()
+
+        if total <= self.max_size:
+            return
+
+        rows = self.connection.execute(
+            "SELECT path, member, digest FROM entries ORDER BY accessed"
+        ).fetchall()
+
+        with self.connection:
+            for path, member, digest in rows:
+                if total <= self.max_size:
+                    break
+
+                self.connection.execute(
+                    "DELETE FROM entries WHERE path = ? AND member = ?",
+                    (path, member)
+                )
+                total -= self.__remove_unused(digest)
+
+    def __remove_unused(self, digest: str) -> int:
+        used = self.connection.execute(
+            "SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)
+        ).fetchone()
+
+        if used is not None:
+            return 0
+
+        row = self.connection.execute(
+            "SELECT size FROM blobs WHERE digest = ?", (digest,)
+        ).fetchone()
+
+        self.connection.execute(
+            "DELETE FROM blobs WHERE digest = ?", (digest,)
+        )
+
+        return row[0] if row else 0
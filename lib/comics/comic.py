@@ -1,57 +1,241 @@
 import os
 import re
-import shutil
 
 from comics import Archive
-from comics import utils
+from comics import backends, metadata, planner, utils
+from comics.compression import Policy
+from comics.fingerprint import Fingerprints
+from comics.stats import phase
+from comics.tree import Tree
+from comics.workspace import Workspace, staged
+
+
+MEMORY_LIMIT = 256 * 1024 * 1024
 
 
 class Comic:
-    def __init__(self, path: str):
+    def __init__(
+        self,
+        path: str,
+        workspace_root: str = None,
+        memory_limit: int = None
+    ):
         self.__edit_mode = False
+        self.__modified = False
+        self.__tree = None
+        self.__fingerprints = Fingerprints()
+
+        if memory_limit is None:
+            memory_limit = int(
+                os.environ.get("COMIC_FMT_MEMORY_LIMIT", MEMORY_LIMIT)
+            )
 
         self.archive = Archive(path)
         self.title = utils.remove_file_extension(self.archive.filename)
-        self.temp_dir = "_temp"
+        self.workspace = Workspace(workspace_root)
+        self.memory_limit = memory_limit
 
     def __enter__(self):
         self.edit()
         return self
 
     def __exit__(self, exc_type, ext_val, exc_trace):
+        if exc_type is not None:
+            self.discard()
+            return
+
         self.save()
 
+    @property
+    def temp_dir(self) -> str:
+        if self.__edit_mode:
+            self.__modified = True
+
+        return self.__work_dir()
+
+    @property
+    def modified(self) -> bool:
+        return self.__modified
+
+    def __work_dir(self) -> str:
+        self.spill()
+        return self.workspace.path
+
     def edit(self):
         '''Edit comic.
 
-        Uncompress the comic to a temporary directory. Updates are not
-        persisted until the comic is saved.
+        Load the items of the comic into an in-memory tree. Items are read
+        from the original archive on demand, so only new or modified data is
+        held in memory. Updates are not persisted until the comic is saved.
+
+        If the memory limit is zero, the comic is uncompressed to the
+        temporary directory instead.
+
+        The comic is marked as modified once an edit changes its items or
+        the temporary directory is accessed.
         '''
 
         self.__edit_mode = True
-        self.uncompress(self.temp_dir)
+        self.__modified = False
+
+        if self.memory_limit > 0:
+            self.__tree = Tree(self.archive)
+            return
+
+        try:
+            dirname = self.workspace.create()
+
+            self.uncompress(dirname)
+            self.__record(dirname, self.__scan(dirname))
+        except Exception:
+            self.discard()
+            raise
 
-    def save(self):
+    def spill(self):
+        '''Spill comic to disk.
+
+        Move the in-memory tree to the temporary directory. This happens
+        automatically when the memory limit is exceeded or the temporary
+        directory is accessed.
+        '''
+
+        if self.__tree is None:
+            return
+
+        tree, self.__tree = self.__tree, None
+
+        try:
+            dirname = self.workspace.create()
+
+            with phase("spill") as record:
+                tree.extract(dirname)
+                record.files = len(tree.names())
+
+            self.__record(dirname, tree.members())
+        except Exception:
+            self.discard()
+            raise
+
+    def discard(self):
+        '''Discard changes.
+
+        Exit edit mode and remove the temporary directory without updating
+        the comic.
+        '''
+
+        self.workspace.remove()
+        self.__fingerprints.clear()
+
+        self.__tree = None
+        self.__edit_mode = False
+        self.__modified = False
+
+    def __record(self, dirname: str, members):
+        if not backends.supports(self.archive.ext, "copy"):
+            return
+
+        if isinstance(members, list):
+            members = {name: name for name in members}
+
+        with phase("fingerprint") as record:
+            self.__fingerprints.record(dirname, members)
+            record.files = len(members)
+
+    def __scan(self, dirname: str) -> list[str]:
+        with phase("scan") as record:
+            names = planner.scan(dirname)
+            record.files = len(names)
+
+        return names
+
+    def __check_memory(self):
+        if self.__tree.size > self.memory_limit:
+            self.spill()
+
+    def __replace(self, new_path: str):
+        with phase("replace"):
+            if new_path != self.archive.path:
+                os.remove(self.archive.path)
+
+            self.discard()
+        self.archive = Archive(new_path)
+
+    def save(self, policy: Policy = None, threads: int = 1):
         '''Save comic.
 
         Compress the data in the temporary directory and overwrite the
-        existing comic.
+        existing comic. Unchanged items are copied from the original archive
+        without recompressing whenever the format allows it. Items in the
+        temporary directory are unchanged if their fingerprint or CRC
+        matches a member of the original archive.
+
+        If a compression policy is specified, each item is compressed based
+        on its content. Otherwise, copied items keep their compression and
+        all other items are stored. Items are compressed in parallel if
+        multiple threads are specified.
 
-        Note that this process will convert the comic to CBZ.
+        Note that this process will convert the comic to CBZ. If the comic
+        was not modified and no policy is specified, it is not recompressed.
+        A ZIP archive is only renamed and other formats are converted.
+
+        Args:
+            policy (Policy): Compression policy.
+            threads (int): Number of compression threads.
         '''
 
         if not self.__edit_mode:
             return
 
-        os.remove(self.archive.path)
+        if not self.__modified and policy is None:
+            self.__save_unmodified(threads)
+            return
 
         new_path = utils.change_file_extension(self.archive.path, ".cbz")
-        Archive.compress(self.temp_dir, new_path, exclude_dir=True)
 
-        shutil.rmtree(self.temp_dir)
+        try:
+            with staged(new_path) as temp_path:
+                if self.__tree is not None:
+                    self.__tree.save(temp_path, policy, threads)
+                else:
+                    self.__compress(temp_path, policy, threads)
+        except Exception:
+            self.discard()
+            raise
+
+        self.__replace(new_path)
+
+    def __compress(self, target: str, policy: Policy, threads: int):
+        dirname, reuse = self.__work_dir(), None
+
+        if self.__fingerprints.files:
+            members = self.archive.members()
+
+            with phase("fingerprint") as record:
+                reuse = self.__fingerprints.match(dirname, members)
+                record.files = len(reuse)
+
+        Archive.compress(
+            dirname,
+            target,
+            True,
+            policy,
+            threads,
+            self.archive.path,
+            reuse
+        )
+
+    def __save_unmodified(self, threads: int):
+        self.discard()
+
+        if not backends.supports(self.archive.ext, "copy"):
+            self.convert(threads=threads)
+            return
 
-        self.archive = Archive(new_path)
-        self.__edit_mode = False
+        new_path = utils.change_file_extension(self.archive.path, ".cbz")
+
+        if new_path != self.archive.path:
+            os.replace(self.archive.path, new_path)
+            self.archive = Archive(new_path)
 
     def rename(self, title: str = None, cleanup: bool = False):
         '''Rename comic.
@@ -81,19 +265,171 @@ class Comic:
         self.title = new_title
         self.archive = Archive(new_path)
 
-    def search(self, query: str) -> list[str]:
+    def namelist(self) -> list[str]:
+        '''List comic.
+
+        In edit mode, the current names of the items are listed, including
+        any changes that have not been saved.
+
+        Returns:
+            A list of all items within the comic.
+        '''
+
+        if self.__tree is not None:
+            return self.__tree.names()
+
+        if self.__edit_mode:
+            return self.__scan(self.__work_dir())
+
+        return self.archive.namelist()
+
+    def search(self, query: str, index=None) -> list[str]:
         '''Search comic.
 
-        A wrapper method that searches the underlying file archive.
+        A wrapper method that searches the underlying file archive. In edit
+        mode, the current names of the items are searched instead.
 
         Args:
             query (str): Search query.
+            index (Index): Library index.
 
         Returns:
             A list of items with the archive that match the query.
         '''
 
-        return self.archive.search(query)
+        if self.__tree is not None:
+            return self.__tree.search(query)
+
+        if self.__edit_mode:
+            if not query:
+                return []
+
+            return [item for item in self.namelist() if query in item]
+
+        return self.archive.search(query, index)
+
+    def read(self, item: str) -> bytes:
+        '''Read item.
+
+        Read an item from the comic. In edit mode, any changes that have not
+        been saved are included.
+
+        Args:
+            item (str): Name of item.
+
+        Returns:
+            The uncompressed data of the item.
+        '''
+
+        if self.__tree is not None:
+            return self.__tree.read(item)
+
+        if self.__edit_mode:
+            with open(os.path.join(self.__work_dir(), item), "rb") as f:
+                return f.read()
+
+        return self.archive.read(item)
+
+    def write(self, item: str, data: bytes):
+        '''Write item.
+
+        Add a new item to the comic or replace an existing one. The comic is
+        spilled to disk if the memory limit is exceeded.
+
+        Note that this method requires the comic to be in edit mode.
+
+        Args:
+            item (str): Name of item.
+            data (bytes): Uncompressed data of the item.
+        '''
+
+        if not self.__edit_mode:
+            self.edit()
+
+        self.__modified = True
+
+        if self.__tree is not None:
+            self.__tree.write(item, data)
+            self.__check_memory()
+            return
+
+        path = os.path.join(self.__work_dir(), item)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.__fingerprints.forget(path)
+
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def read_metadata(self) -> dict[str, str]:
+        '''Read metadata.
+
+        Only ComicInfo.xml is decompressed. In edit mode, any changes that
+        have not been saved are included.
+
+        Returns:
+            A mapping of ComicInfo fields to their values.
+        '''
+
+        name = metadata.find(self.namelist())
+
+        if name is None:
+            return {}
+
+        return metadata.parse(self.read(name))
+
+    def update_metadata(
+        self,
+        fields: dict[str, str],
+        threshold: float = metadata.COMPACT_THRESHOLD
+    ):
+        '''Update metadata.
+
+        Update the fields of ComicInfo.xml. Fields with an empty value are
+        removed. A CBZ is updated in place by appending the new metadata,
+        and is only compacted once the unused space exceeds the threshold.
+        Other formats are converted to CBZ.
+
+        In edit mode, the metadata is written with the other changes once
+        the comic is saved.
+
+        Args:
+            fields (dict): Mapping of ComicInfo fields to their new values.
+            threshold (float): Fraction of unused space before compacting.
+        '''
+
+        names = self.namelist()
+        name = metadata.find(names) or metadata.FILENAME
+
+        current = self.read(name) if name in names else None
+        existing = metadata.parse(current) if current else {}
+
+        changes = {
+            field: value
+            for field, value in fields.items()
+            if existing.get(field, "") != (value or "")
+        }
+
+        if not changes:
+            return
+
+        data = metadata.update(current, changes)
+
+        if self.__edit_mode:
+            self.write(name, data)
+            return
+
+        if not backends.supports(self.archive.ext, "copy"):
+            with self:
+                self.write(name, data)
+            return
+
+        self.archive.append(name, data)
+
+        size = os.path.getsize(self.archive.path)
+
+        if self.archive.wasted() > size * threshold:
+            self.archive.compact()
 
     def uncompress(self, output_path: str = None):
         '''Uncompress comic.
@@ -106,20 +442,36 @@ class Comic:
 
         self.archive.uncompress(output_path=output_path)
 
-    def convert(self):
+    def convert(self, policy: Policy = None, threads: int = 1):
         '''Convert to CBZ.
 
-        Uncompress the contents of the comic and recompress as CBZ.
+        Stream the contents of the comic directly into a new CBZ without
+        uncompressing to the temporary directory. The members of a ZIP
+        archive are copied without recompressing, unless they do not match
+        the compression policy.
 
         If the extension is already CBZ or the comic is in edit mode,
         no action is required.
+
+        Args:
+            policy (Policy): Compression policy.
+            threads (int): Number of compression threads.
         '''
 
         if self.archive.ext == ".cbz" or self.__edit_mode:
             return
 
-        self.edit()
-        self.save()
+        new_path = utils.change_file_extension(self.archive.path, ".cbz")
+
+        if backends.supports(self.archive.ext, "copy"):
+            transfer = self.archive.copy
+        else:
+            transfer = self.archive.stream
+
+        with staged(new_path) as temp_path:
+            transfer(temp_path, policy=policy, threads=threads)
+
+        self.__replace(new_path)
 
     def flatten(self):
         '''Flatten directories within comic.
@@ -133,14 +485,7 @@ class Comic:
         if not self.__edit_mode:
             self.edit()
 
-        for dirname, item in utils.traverse(self.temp_dir):
-            path = os.path.join(dirname, item)
-
-            if os.path.isfile(path) and dirname != self.temp_dir:
-                shutil.move(path, self.temp_dir)
-
-            if os.path.isdir(path):
-                shutil.rmtree(path)
+        self.__rename(planner.flatten(self.namelist()))
 
     def format_pages(
         self,
@@ -173,27 +518,33 @@ class Comic:
         if not self.__edit_mode:
             self.edit()
 
-        page_cnt = 1
+        mapping = planner.format_pages(
+            self.namelist(),
+            page_name,
+            page_regex,
+            remove
+        )
 
-        for dirname, item in utils.traverse(self.temp_dir):
-            path = os.path.join(dirname, item)
+        self.__rename(mapping)
 
-            if os.path.isdir(path):
-                page_cnt = 1
-                continue
+    def __rename(self, mapping: dict[str, str]):
+        changes = planner.changes(mapping)
 
-            if not re.search(page_regex, item):
-                if remove:
-                    os.remove(path)
-                continue
+        if not changes:
+            return
 
-            num_pages = len(os.listdir(dirname))
-            padding = utils.zero_padded(num_pages)
-            ext = utils.get_file_extension(path)
+        self.__modified = True
 
-            filename = f'{page_name}{page_cnt:{padding}}{ext}'
-            new_path = os.path.join(dirname, filename)
+        if self.__tree is not None:
+            self.__tree.rename(mapping)
+            return
 
-            os.rename(path, new_path)
+        try:
+            dirname = self.__work_dir()
 
-            page_cnt += 1
+            with phase("rename") as record:
+                planner.apply(dirname, mapping)
+                record.files = len(changes)
+        except Exception:
+            self.discard()
+            raise
@@ -0,0 +1,72 @@
+from zipfile import ZIP_DEFLATED, ZIP_STORED
+
+
+HEADER_SIZE = 16
+
+compressed_signatures = (
+    b"\xff\xd8\xff",
+    b"\x89PNG\r\n\x1a\n",
+    b"GIF87a",
+    b"GIF89a",
+    b"\xff\x0a",
+    b"\x00\x00\x00\x0cJXL ",
+    b"PK\x03\x04",
+    b"Rar!\x1a\x07",
+    b"7z\xbc\xaf\x27\x1c",
+    b"\x1f\x8b"
+)
+
+
+def is_compressed(header: bytes) -> bool:
+    if header.startswith(compressed_signatures):
+        return True
+
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return True
+
+    return header[4:8] == b"ftyp"
+
+
+class Policy:
+    def __init__(self, level: int = 6, detect: bool = True):
+        self.level = level
+        self.detect = detect
+
+    def select(self, header: bytes) -> tuple[int, int]:
+        '''Select compression for item.
+
+        Items that are already compressed, such as JPEG, PNG or WebP images,
+        are stored as-is when detection is enabled. All other items are
+        deflated at the configured level. A level of zero stores all items.
+
+        Args:
+            header (bytes): Leading bytes of the item.
+
+        Returns:
+            A tuple with the compression method and level.
+        '''
+
+        if self.level == 0 or (self.detect and is_compressed(header)):
+            return ZIP_STORED, None
+
+        return ZIP_DEFLATED, self.level
+
+
+policies = {
+    "store": Policy(level=0),
+    "fast": Policy(level=1),
+    "default": Policy(level=6),
+    "max": Policy(level=9, detect=False)
+}
+
+
+def get_policy(mode: str = None, level: int = None) -> Policy:
+    if mode is None and level is None:
+        return None
+
+    policy = policies[mode or "default"]
+
+    if level is None:
+        return policy
+
+    return Policy(level=level, detect=policy.detect)
@@ -0,0 +1,127 @@
+from typing import NamedTuple
+
+from comics.archive import Member
+
+
+COMMON_PAGES = 64
+
+
+class Similar(NamedTuple):
+    path: str
+    other: str
+    score: float
+
+
+def signatures(members: list[Member]) -> dict[tuple[int, int], list[str]]:
+    pages = {}
+
+    for name, size, crc in members:
+        if size == 0 or name.endswith("/"):
+            continue
+
+        pages.setdefault((crc, size), []).append(name)
+
+    return pages
+
+
+def exact(pages: dict[str, dict]) -> list[list[str]]:
+    '''Find exact duplicates.
+
+    Archives are exact duplicates if they contain the same pages, regardless
+    of the names of the archives or their members.
+
+    Args:
+        pages (dict): Mapping of archives to their page signatures.
+
+    Returns:
+        Groups of archives with identical pages, in the order of the
+        mapping.
+    '''
+
+    groups = {}
+
+    for path, items in pages.items():
+        if not items:
+            continue
+
+        key = tuple(sorted(
+            (page, len(names)) for page, names in items.items()
+        ))
+        groups.setdefault(key, []).append(path)
+
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def similar(
+    pages: dict[str, dict],
+    threshold: float = 0.8,
+    common: int = COMMON_PAGES
+) -> list[Similar]:
+    '''Find near duplicates.
+
+    Archives are similar if most of the pages of the smaller archive are
+    also in the larger one. Exact duplicates are only compared once. Pages
+    that are shared by more than a number of archives, such as blank pages
+    or credits, are ignored when searching for candidates.
+
+    Args:
+        pages (dict): Mapping of archives to their page signatures.
+        threshold (float): Fraction of shared pages.
+        common (int): Number of archives after which a page is ignored.
+
+    Returns:
+        Pairs of similar archives with the fraction of shared pages, in the
+        order of the mapping.
+    '''
+
+    duplicates = {path for group in exact(pages) for path in group[1:]}
+
+    candidates = {
+        path: set(items)
+        for path, items in pages.items()
+        if path not in duplicates
+    }
+
+    postings = {}
+
+    for path, items in candidates.items():
+        for page in items:
+            postings.setdefault(page, []).append(path)
+
+    order = {path: idx for idx, path in enumerate(candidates)}
+    results = []
+
+    for path, items in candidates.items():
+        shared = {}
+
+        for page in items:
+            others = postings[page]
+
+            if len(others) > common:
+                continue
+
+            for other in others:
+                if order[other] > order[path]:
+                    shared[other] = shared.get(other, 0) + 1
+
+        for other in sorted(shared, key=order.get):
+            size = min(len(items), len(candidates[other]))
+            score = shared[other] / size
+
+            if score >= threshold:
+                results.append(Similar(path, other, score))
+
+    return results
+
+
+def duplicate_pages(pages: dict) -> list[list[str]]:
+    '''Find duplicate pages.
+
+    Args:
+        pages (dict): Page signatures of a file archive.
+
+    Returns:
+        Groups of members with identical data.
+    '''
+
+    return [names for names in pages.values() if len(names) > 1]
@@ -0,0 +1,108 @@
+import os
+import shutil
+import zlib
+
+from comics import planner
+from comics.archive import Member
+
+
+def file_crc(path: str) -> int:
+    crc = 0
+
+    with open(path, "rb") as f:
+        while chunk := f.read(shutil.COPY_BUFSIZE):
+            crc = zlib.crc32(chunk, crc)
+
+    return crc
+
+
+def file_key(stat: os.stat_result) -> tuple[int, int]:
+    return stat.st_dev, stat.st_ino
+
+
+class Fingerprints:
+    def __init__(self):
+        self.files = {}
+
+    def record(self, dirname: str, members: dict[str, str]):
+        '''Record files.
+
+        Take a fingerprint of each file that was extracted from a member of
+        the original archive. Files are identified by their inode, so they
+        can still be matched after being renamed.
+
+        Args:
+            dirname (str): Path to directory.
+            members (dict): Mapping of relative paths to original members.
+        '''
+
+        for name, member in members.items():
+            if planner.is_directory(name):
+                continue
+
+            stat = os.stat(os.path.join(dirname, name))
+            fingerprint = (member, stat.st_size, stat.st_mtime_ns)
+
+            self.files[file_key(stat)] = fingerprint
+
+    def forget(self, path: str):
+        '''Forget file.
+
+        Args:
+            path (str): Path to file.
+        '''
+
+        if os.path.exists(path):
+            self.files.pop(file_key(os.stat(path)), None)
+
+    def clear(self):
+        '''Forget all files.'''
+
+        self.files = {}
+
+    def match(self, dirname: str, members: list[Member]) -> dict[str, str]:
+        '''Match files to original members.
+
+        A file matches if its fingerprint is unchanged. Otherwise, the CRC
+        of the file is compared with members of the same size.
+
+        Args:
+            dirname (str): Path to directory.
+            members (list): Members of the original archive.
+
+        Returns:
+            A mapping of relative paths to the original members with the
+            same content.
+        '''
+
+        contents = {
+            (member.size, member.crc): member.name
+            for member in members
+            if not planner.is_directory(member.name)
+        }
+        sizes = {size for size, _ in contents}
+
+        matches = {}
+
+        for name in planner.scan(dirname):
+            if planner.is_directory(name):
+                continue
+
+            path = os.path.join(dirname, name)
+            stat = os.stat(path)
+
+            member, size, mtime = self.files.get(file_key(stat), (None, 0, 0))
+
+            if member and (size, mtime) == (stat.st_size, stat.st_mtime_ns):
+                matches[name] = member
+                continue
+
+            if stat.st_size not in sizes:
+                continue
+
+            member = contents.get((stat.st_size, file_crc(path)))
+
+            if member:
+                matches[name] = member
+
+        return matches
@@ -1,5 +1,7 @@
 import os
 
+from comics import backends
+
 
 def file_not_found(path: str):
     if not os.path.exists(path):
@@ -9,3 +11,37 @@ def file_not_found(path: str):
 def unsupported_extension(ext: str, supported: dict):
     if ext not in supported:
         raise AttributeError(f'unsupported extension {ext}')
+
+
+def unsupported_operation(ext: str, operation: str):
+    if not backends.supports(ext, operation):
+        raise AttributeError(f'unsupported operation {operation} for {ext}')
+
+
+def duplicate_names(names: list[str]):
+    seen = set()
+
+    for name in names:
+        if name is None:
+            continue
+
+        if name in seen:
+            raise FileExistsError(f'duplicate name "{name}"')
+
+        seen.add(name)
+
+
+def page_not_found(page: str, path: str):
+    if page is None:
+        raise FileNotFoundError(f'no pages found in "{path}"')
+
+
+def members_not_found(names: set[str], path: str):
+    if names:
+        missing = ", ".join(f'"{name}"' for name in sorted(names))
+        raise FileNotFoundError(f'{missing} not found in "{path}"')
+
+
+def corrupt_member(member: str):
+    if member is not None:
+        raise ValueError(f'corrupt member "{member}"')
@@ -0,0 +1,226 @@
+import os
+import sqlite3
+
+from comics import utils
+from comics.archive import Archive, Member
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS archives (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    names TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS members (
+    archive INTEGER NOT NULL REFERENCES archives (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    crc INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS members_archive ON members (archive);
+'''
+
+
+def default_path() -> str:
+    return utils.cache_path("index.db")
+
+
+def signature(path: str) -> tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class Index:
+    def __init__(self, path: str = None):
+        path = path or os.environ.get("COMIC_FMT_INDEX") or default_path()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.connection = sqlite3.connect(path)
+
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_trace):
+        self.close()
+
+    def close(self):
+        '''Close index.'''
+
+        self.connection.close()
+
+    def stale(self, paths: list[str]) -> list[str]:
+        '''Find stale archives.
+
+        An archive is stale if it was never indexed or if its size or
+        modification time changed since it was last indexed. Missing files
+        are always considered stale.
+
+        Args:
+            paths (list): Paths to file archives.
+
+        Returns:
+            A list of archives that need to be indexed.
+        '''
+
+        indexed = {
+            path: (size, mtime)
+            for path, size, mtime in self.connection.execute(
+                "SELECT path, size, mtime FROM archives"
+            )
+        }
+
+        stale = []
+
+        for path in paths:
+            key = os.path.abspath(path)
+
+            if not os.path.isfile(path) or indexed.get(key) != signature(path):
+                stale.append(path)
+
+        return stale
+
+    def store(self, path: str, members: list[Member]):
+        '''Store archive.
+
+        Replace the indexed members of an archive. The names of all members
+        are also stored with the archive, which allows a whole library to be
+        searched with a single scan of the archives table.
+
+        Args:
+            path (str): Path to file archive.
+            members (list): Members of the archive.
+        '''
+
+        key = os.path.abspath(path)
+        size, mtime = signature(path)
+
+        names = "\n".join(member.name for member in members)
+
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM archives WHERE path = ?", (key,)
+            )
+            archive_id = self.connection.execute(
+                "INSERT INTO archives (path, size, mtime, names) "
+                "VALUES (?, ?, ?, ?)",
+                (key, size, mtime, names)
+            ).lastrowid
+            self.connection.executemany(
+                "INSERT INTO members VALUES (?, ?, ?, ?)",
+                [(archive_id, *member) for member in members]
+            )
+
+    def refresh(self, paths: list[str]):
+        '''Refresh index.
+
+        Read the members of every stale archive and store them.
+
+        Args:
+            paths (list): Paths to file archives.
+        '''
+
+        for path in self.stale(paths):
+            self.store(path, Archive(path).members())
+
+    def members(self, path: str) -> list[Member]:
+        '''List members.
+
+        Args:
+            path (str): Path to file archive.
+
+        Returns:
+            The indexed members of the archive.
+        '''
+
+        self.refresh([path])
+
+        rows = self.connection.execute(
+            "SELECT members.name, members.size, members.crc FROM members "
+            "JOIN archives ON archives.id = members.archive "
+            "WHERE archives.path = ? ORDER BY members.rowid",
+            (os.path.abspath(path),)
+        )
+
+        return [Member(*row) for row in rows]
+
+    def listings(self, paths: list[str]) -> dict[str, list[Member]]:
+        '''List members of many archives.
+
+        Read the indexed members of all archives with a single scan of the
+        members table. Stale archives are refreshed first.
+
+        Args:
+            paths (list): Paths to file archives.
+
+        Returns:
+            A mapping of archives to their members, in the same order as
+            the paths.
+        '''
+
+        self.refresh(paths)
+
+        keys = {os.path.abspath(path): path for path in paths}
+        listings = {}
+
+        rows = self.connection.execute(
+            "SELECT archives.path, members.name, members.size, members.crc "
+            "FROM members JOIN archives ON archives.id = members.archive "
+            "ORDER BY members.rowid"
+        )
+
+        for key, *member in rows:
+            if key in keys:
+                listings.setdefault(keys[key], []).append(Member(*member))
+
+        return {path: listings.get(path, []) for path in paths}
+
+    def search(self, paths: list[str], query: str) -> dict[str, list[str]]:
+        '''Search archives.
+
+        Search the indexed members of all archives for any item that matches
+        the query. Stale archives are refreshed first.
+
+        Args:
+            paths (list): Paths to file archives.
+            query (str): Search query.
+
+        Returns:
+            A mapping of archives to the items that match the query. Archives
+            without any matches are omitted.
+        '''
+
+        if not query:
+            return {}
+
+        self.refresh(paths)
+
+        keys = {os.path.abspath(path): path for path in paths}
+        matches = {}
+
+        rows = self.connection.execute(
+            "SELECT path, names FROM archives WHERE instr(names, ?) > 0",
+            (query,)
+        )
+
+        for key, names in rows:
+            if key not in keys:
+                continue
+
+            results = [name for name in names.split("\n") if query in name]
+
+            if results:
+                matches[keys[key]] = results
+
+        return {path: matches[path] for path in paths if path in matches}
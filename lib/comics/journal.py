@@ -0,0 +1,288 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from comics import utils
+from comics.index import signature
+from comics.workspace import staged_files
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    run TEXT NOT NULL,
+    path TEXT NOT NULL,
+    state TEXT NOT NULL,
+    size INTEGER,
+    mtime INTEGER,
+    target TEXT,
+    target_size INTEGER,
+    target_mtime INTEGER,
+    error TEXT,
+    updated INTEGER NOT NULL,
+    host TEXT,
+    pid INTEGER,
+    PRIMARY KEY (run, path)
+);
+
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+'''
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+OWNER_COLUMNS = {"host": "TEXT", "pid": "INTEGER"}
+
+
+def default_path() -> str:
+    return utils.cache_path("journal.db")
+
+
+def is_alive(host: str, pid: int) -> bool:
+    '''Check whether the process that owns a job is still running.
+
+    A job without an owner was recorded by an older version and is treated
+    as abandoned. Processes on other hosts cannot be checked and are always
+    treated as running.
+
+    Args:
+        host (str): Host name of the owner.
+        pid (int): Process ID of the owner.
+
+    Returns:
+        False if the owner has provably exited.
+    '''
+
+    if host is None or pid is None:
+        return False
+
+    if host != socket.gethostname():
+        return True
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+def fingerprint(path: str) -> tuple[int, int]:
+    try:
+        return signature(path)
+    except FileNotFoundError:
+        return None, None
+
+
+class Journal:
+    def __init__(self, path: str = None, run: str = ""):
+        path = path or os.environ.get("COMIC_FMT_JOURNAL") or default_path()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.run = run
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.__migrate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_trace):
+        self.close()
+
+    def close(self):
+        '''Close journal.'''
+
+        self.connection.close()
+
+    def recover(self) -> list[str]:
+        '''Recover interrupted archives.
+
+        Remove the staged files of archives that were in progress when a
+        previous run was interrupted. If the new archive was already renamed
+        over its target, the save is completed by removing the original
+        archive. All other interrupted archives are marked as pending.
+        Archives owned by a process that is still running are left alone.
+
+        Returns:
+            A list of archives whose save was completed.
+        '''
+
+        rows = self.connection.execute(
+            "SELECT run, path, target, target_size, target_mtime, "
+            "host, pid FROM jobs WHERE state = ?",
+            (RUNNING,)
+        ).fetchall()
+
+        completed = []
+
+        with self.connection:
+            for run, path, target, size, mtime, host, pid in rows:
+                if is_alive(host, pid):
+                    continue
+
+                for staged in staged_files(target):
+                    os.remove(staged)
+
+                current = fingerprint(target)
+                replaced = current[0] is not None and current != (size, mtime)
+
+                if target == path or not replaced:
+                    self.__update(run, path, PENDING)
+                    continue
+
+                if os.path.exists(path):
+                    os.remove(path)
+
+                self.__update(run, path, DONE)
+                self.__update(run, target, DONE, target=target)
+                completed.append(path)
+
+        return completed
+
+    def reset(self):
+        '''Forget the archives of the current run.'''
+
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM jobs WHERE run = ?", (self.run,)
+            )
+
+    def completed(self, path: str) -> bool:
+        '''Check archive.
+
+        An archive is complete if it was processed by the current run and
+        its size and modification time are unchanged since then.
+
+        Args:
+            path (str): Path to file archive.
+
+        Returns:
+            True if the archive does not need to be processed again.
+        '''
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT size, mtime FROM jobs "
+                "WHERE run = ? AND path = ? AND state = ?",
+                (self.run, os.path.abspath(path), DONE)
+            ).fetchone()
+
+        return row is not None and tuple(row) == fingerprint(path)
+
+    def start(self, path: str, target: str = None):
+        '''Start archive.
+
+        Record the archive as in progress together with the current state of
+        its target, so that an interrupted save can be recovered.
+
+        Args:
+            path (str): Path to file archive.
+            target (str): Path to the archive that replaces it, if any.
+        '''
+
+        path = os.path.abspath(path)
+        target = os.path.abspath(target or path)
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO jobs (run, path, state, size, mtime, "
+                "target, target_size, target_mtime, updated, host, pid) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.run,
+                    path,
+                    RUNNING,
+                    *fingerprint(path),
+                    target,
+                    *fingerprint(target),
+                    time.time_ns(),
+                    socket.gethostname(),
+                    os.getpid()
+                )
+            )
+
+    def finish(self, path: str, error: str = None):
+        '''Finish archive.
+
+        Record the archive as done or failed. The size and modification time
+        of the result are recorded, so that an archive is processed again if
+        it changes. If the archive was replaced by its target, the target is
+        recorded as done as well.
+
+        Args:
+            path (str): Path to file archive.
+            error (str): Reason the archive failed, if any.
+        '''
+
+        path = os.path.abspath(path)
+
+        with self.lock, self.connection:
+            if error is not None:
+                self.__update(self.run, path, FAILED, error)
+                return
+
+            self.__update(self.run, path, DONE)
+
+            row = self.connection.execute(
+                "SELECT target FROM jobs WHERE run = ? AND path = ?",
+                (self.run, path)
+            ).fetchone()
+
+            target = row[0] if row else path
+
+            if target != path and not os.path.exists(path):
+                self.__update(self.run, target, DONE, target=target)
+
+    def __migrate(self):
+        columns = {
+            row[1]
+            for row in self.connection.execute("PRAGMA table_info(jobs)")
+        }
+
+        with self.connection:
+            for name, kind in OWNER_COLUMNS.items():
+                if name not in columns:
+                    self.connection.execute(
+                        f'ALTER TABLE jobs ADD COLUMN {name} {kind}'
+                    )
+
+    def __update(
+        self,
+        run: str,
+        path: str,
+        state: str,
+        error: str = None,
+        target: str = None
+    ):
+        self.connection.execute(
+            "INSERT OR IGNORE INTO jobs (run, path, state, updated) "
+            "VALUES (?, ?, ?, ?)",
+            (run, path, state, 0)
+        )
+        self.connection.execute(
+            "UPDATE jobs SET state = ?, size = ?, mtime = ?, error = ?, "
+            "target = COALESCE(target, ?), updated = ? "
+            "WHERE run = ? AND path = ?",
+            (
+                state,
+                *fingerprint(path),
+                error,
+                target,
+                time.time_ns(),
+                run,
+                path
+            )
+        )
@@ -0,0 +1,153 @@
+import posixpath
+
+from xml.etree import ElementTree
+
+
+FILENAME = "ComicInfo.xml"
+
+COMPACT_THRESHOLD = 0.25
+
+FIELDS = [
+    "Title",
+    "Series",
+    "Number",
+    "Count",
+    "Volume",
+    "AlternateSeries",
+    "AlternateNumber",
+    "AlternateCount",
+    "Summary",
+    "Notes",
+    "Year",
+    "Month",
+    "Day",
+    "Writer",
+    "Penciller",
+    "Inker",
+    "Colorist",
+    "Letterer",
+    "CoverArtist",
+    "Editor",
+    "Translator",
+    "Publisher",
+    "Imprint",
+    "Genre",
+    "Tags",
+    "Web",
+    "PageCount",
+    "LanguageISO",
+    "Format",
+    "BlackAndWhite",
+    "Manga",
+    "Characters",
+    "Teams",
+    "Locations",
+    "ScanInformation",
+    "StoryArc",
+    "StoryArcNumber",
+    "SeriesGroup",
+    "AgeRating",
+    "Pages",
+    "CommunityRating",
+    "MainCharacterOrTeam",
+    "Review",
+    "GTIN"
+]
+
+
+def find(names: list[str]) -> str:
+    '''Find metadata item.
+
+    The metadata is usually stored in the root directory of the archive,
+    but the name is matched regardless of case or directory.
+
+    Args:
+        names (list): Names of the items within the archive.
+
+    Returns:
+        The name of the metadata item, or None if there is no metadata.
+    '''
+
+    matches = [
+        name for name in names
+        if posixpath.basename(name).lower() == FILENAME.lower()
+    ]
+
+    if not matches:
+        return None
+
+    return min(matches, key=lambda name: name.count("/"))
+
+
+def parse(data: bytes) -> dict[str, str]:
+    '''Parse metadata.
+
+    Only simple fields are returned. Nested elements such as the list of
+    pages are left untouched.
+
+    Args:
+        data (bytes): Contents of ComicInfo.xml.
+
+    Returns:
+        A mapping of field names to their values, in document order.
+    '''
+
+    root = ElementTree.fromstring(data)
+
+    return {
+        element.tag: (element.text or "").strip()
+        for element in root
+        if len(element) == 0
+    }
+
+
+def update(data: bytes, fields: dict[str, str]) -> bytes:
+    '''Update metadata.
+
+    Existing fields are replaced in place and new fields are inserted in
+    the order of the ComicInfo schema. Fields with an empty value are
+    removed. All other elements are preserved.
+
+    Args:
+        data (bytes): Contents of ComicInfo.xml, or None to create it.
+        fields (dict): Mapping of field names to their new values.
+
+    Returns:
+        The updated contents of ComicInfo.xml.
+    '''
+
+    if data:
+        root = ElementTree.fromstring(data)
+    else:
+        root = ElementTree.Element("ComicInfo")
+
+    for name, value in fields.items():
+        element = root.find(name)
+
+        if not value:
+            if element is not None:
+                root.remove(element)
+            continue
+
+        if element is None:
+            element = ElementTree.Element(name)
+            root.insert(position(root, name), element)
+
+        element.text = value
+
+    ElementTree.indent(root)
+
+    return ElementTree.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def position(root: ElementTree.Element, name: str) -> int:
+    if name not in FIELDS:
+        return len(root)
+
+    order = FIELDS.index(name)
+
+    for idx, element in enumerate(root):
+        if element.tag in FIELDS and FIELDS.index(element.tag) > order:
+            return idx
+
+    return len(root)
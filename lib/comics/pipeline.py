@@ -0,0 +1,369 @@
+import os
+import threading
+
+from collections import deque
+from contextlib import ExitStack, nullcontext
+from typing import Callable, Iterable, NamedTuple
+from zipfile import ZipFile, ZipInfo
+
+from comics import utils
+from comics.archive import transfer
+from comics.compression import Policy
+from comics.stats import Stats, collect, phase
+from comics.workspace import staged
+from comics.writer import Writer
+
+
+BUFFER_SIZE = 64 * 1024 * 1024
+
+
+class Aborted(Exception):
+    pass
+
+
+class Job(NamedTuple):
+    source: str
+    target: str
+    members: dict[str, str] = None
+
+
+class Result(NamedTuple):
+    path: str
+    job: Job
+    error: Exception
+    stats: dict = None
+
+
+class Buffer:
+    def __init__(self, size: int):
+        self.size = size
+        self.used = 0
+        self.items = deque()
+        self.cancelled = False
+        self.condition = threading.Condition()
+
+    def put(self, item, size: int = 0):
+        with self.condition:
+            while self.__full(size) and not self.cancelled:
+                self.condition.wait()
+
+            if self.cancelled:
+                raise Aborted("pipeline was cancelled")
+
+            self.items.append((item, size))
+            self.used += size
+            self.condition.notify_all()
+
+    def get(self):
+        with self.condition:
+            while not self.items:
+                self.condition.wait()
+
+            item, size = self.items.popleft()
+            self.used -= size
+            self.condition.notify_all()
+
+            return item
+
+    def cancel(self):
+        with self.condition:
+            self.cancelled = True
+            self.items.clear()
+            self.used = 0
+            self.condition.notify_all()
+
+    def __full(self, size: int) -> bool:
+        return bool(self.items) and self.used + size > self.size
+
+
+class Channel:
+    def __init__(
+        self,
+        buffer: Buffer,
+        policy: Policy = None,
+        stats: Stats = None
+    ):
+        self.buffer = buffer
+        self.policy = policy
+        self.stats = stats
+        self.aborted = threading.Event()
+
+    def collect(self):
+        if self.stats is None:
+            return nullcontext()
+
+        return collect(self.stats)
+
+    def open(self, entry: ZipInfo):
+        self.put("open", entry)
+        return ChannelEntry(self)
+
+    def write(self, entry: ZipInfo, data: bytes):
+        self.put("write", entry, data)
+
+    def mkdir(self, name: str):
+        self.put("mkdir", name)
+
+    def copy(self, entry: ZipInfo, data: bytes):
+        self.put("copy", entry, data)
+
+    def put(self, op: str, *args):
+        if self.aborted.is_set():
+            raise Aborted("job was aborted")
+
+        size = sum(len(arg) for arg in args if isinstance(arg, bytes))
+        self.buffer.put((op, self, args), size)
+
+
+class ChannelEntry:
+    def __init__(self, channel: Channel):
+        self.channel = channel
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_trace):
+        self.close()
+
+    def write(self, data: bytes):
+        self.channel.put("chunk", data)
+
+    def close(self):
+        if self.closed:
+            return
+
+        self.closed = True
+        self.channel.put("close")
+
+
+class Output:
+    def __init__(self, job: Job, policy: Policy = None, threads: int = 1):
+        self.job = job
+        self.stack = ExitStack()
+        self.entry = None
+        self.error = None
+
+        try:
+            path = self.stack.enter_context(staged(job.target))
+            self.output = self.stack.enter_context(ZipFile(path, mode="w"))
+
+            self.writer = self.stack.enter_context(
+                Writer(self.output, policy, threads)
+            )
+        except Exception as e:
+            self.abort(e)
+
+    def apply(self, op: str, args: tuple):
+        if self.error is not None:
+            return
+
+        try:
+            with phase("write"):
+                self.__apply(op, args)
+        except Exception as e:
+            self.abort(e)
+
+    def __apply(self, op: str, args: tuple):
+        if op == "open":
+            self.entry = self.writer.open(*args)
+        elif op == "chunk":
+            self.entry.write(*args)
+        elif op == "close":
+            entry, self.entry = self.entry, None
+            entry.close()
+        else:
+            getattr(self.writer, op)(*args)
+
+    def commit(self):
+        if self.error is not None:
+            return
+
+        try:
+            with phase("write") as record:
+                self.stack.close()
+
+                record.measure(written=self.job.target)
+                record.files = len(self.output.filelist)
+        except Exception as e:
+            self.error = e
+            return
+
+        if self.job.source != self.job.target:
+            with phase("replace"):
+                os.remove(self.job.source)
+
+    def abort(self, error: Exception):
+        if self.error is None:
+            self.error = error
+
+        if self.entry is not None:
+            entry, self.entry = self.entry, None
+
+            try:
+                entry.close()
+            except Exception:
+                pass
+
+        try:
+            self.stack.__exit__(type(error), error, error.__traceback__)
+        except Exception:
+            pass
+
+
+class Pipeline:
+    def __init__(
+        self,
+        policy: Policy = None,
+        threads: int = 1,
+        buffer_size: int = None,
+        stats: bool = False
+    ):
+        if buffer_size is None:
+            buffer_size = int(
+                os.environ.get("COMIC_FMT_BUFFER_SIZE", BUFFER_SIZE)
+            )
+
+        self.policy = policy
+        self.threads = threads
+        self.buffer_size = buffer_size
+        self.stats = stats
+
+    def run(self, plan: Callable, tasks: Iterable) -> Iterable[Result]:
+        '''Run pipeline.
+
+        Write a new ZIP archive for each task while the next archives are
+        being read. A reader thread plans each task and streams the members
+        of its source archive, while the members of the previous archive are
+        still being compressed and written. Members are passed between the
+        stages in chunks, and the reader waits once the chunks in flight
+        exceed the buffer size.
+
+        Each archive is staged beside its target, which replaces the source
+        once it has been written. Results are yielded in the same order as
+        the tasks. If stats are enabled, each result includes the phases of
+        its archive. The time spent streaming includes any time the reader
+        waited for the buffer.
+
+        Args:
+            plan (Callable): Function that returns the job for a path, or
+                None if no action is required.
+            tasks (Iterable): Pairs of paths and keyword arguments for plan.
+
+        Returns:
+            An iterable of results.
+        '''
+
+        buffer = Buffer(self.buffer_size)
+
+        reader = threading.Thread(
+            target=self.__read,
+            args=(plan, tasks, buffer),
+            daemon=True
+        )
+        reader.start()
+
+        output = None
+
+        try:
+            while (item := buffer.get()) is not None:
+                op, channel, args = item
+
+                if op == "skip":
+                    yield Result(*args, None, None, self.__stats(channel))
+                    continue
+
+                if op == "error":
+                    raise args[0]
+
+                if op == "end":
+                    with channel.collect():
+                        result = self.__finish(output, *args)
+
+                    output = None
+                    yield result._replace(stats=self.__stats(channel))
+                    continue
+
+                with channel.collect():
+                    if op == "begin":
+                        output = Output(*args, self.policy, self.threads)
+                    else:
+                        output.apply(op, args)
+
+                if output.error is not None:
+                    channel.aborted.set()
+        finally:
+            buffer.cancel()
+
+            if output is not None:
+                output.abort(Aborted("pipeline was cancelled"))
+
+            reader.join()
+
+    def __read(self, plan: Callable, tasks: Iterable, buffer: Buffer):
+        try:
+            for path, kwargs in tasks:
+                self.__transfer(plan, path, kwargs, buffer)
+
+            buffer.put(None)
+        except Aborted:
+            pass
+        except Exception as e:
+            try:
+                buffer.put(("error", None, (e,)))
+            except Aborted:
+                pass
+
+    def __transfer(
+        self,
+        plan: Callable,
+        path: str,
+        kwargs: dict,
+        buffer: Buffer
+    ):
+        channel = Channel(buffer, self.policy, Stats() if self.stats else None)
+
+        try:
+            with channel.collect():
+                job = plan(path, **kwargs)
+
+                if job is None:
+                    buffer.put(("skip", channel, (path,)))
+                    return
+
+                buffer.put(("begin", channel, (job,)))
+
+                ext = utils.get_file_extension(job.source)
+                copy = transfer(ext)
+
+                with phase("stream") as record:
+                    copy(job.source, channel, job.members)
+                    record.measure(read=job.source)
+
+            buffer.put(("end", channel, (path, job, None)))
+        except Exception as e:
+            buffer.put(("end", channel, (path, None, e)))
+
+    @staticmethod
+    def __stats(channel: Channel) -> dict:
+        if channel.stats is None:
+            return None
+
+        return channel.stats.to_dict()
+
+    def __finish(
+        self,
+        output: Output,
+        path: str,
+        job: Job,
+        error: Exception
+    ) -> Result:
+        if output is None:
+            return Result(path, job, error)
+
+        if error is not None:
+            output.abort(error)
+        else:
+            output.commit()
+
+        return Result(path, output.job, output.error)
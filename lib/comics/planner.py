@@ -0,0 +1,185 @@
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+
+from comics import handler, utils
+
+
+image_extensions = {
+    ".avif",
+    ".bmp",
+    ".gif",
+    ".jpeg",
+    ".jpg",
+    ".jxl",
+    ".png",
+    ".webp"
+}
+
+
+def is_directory(name: str) -> bool:
+    return name.endswith("/")
+
+
+def group_by_directory(names: list[str]) -> dict[str, list[str]]:
+    groups = {}
+
+    for name in names:
+        dirname = posixpath.dirname(name.rstrip("/"))
+        groups.setdefault(dirname, []).append(name)
+
+    return groups
+
+
+def count_children(names: list[str]) -> dict[str, int]:
+    children = {}
+
+    for name in names:
+        parts = name.rstrip("/").split("/")
+
+        for idx, part in enumerate(parts):
+            dirname = "/".join(parts[:idx])
+            children.setdefault(dirname, set()).add(part)
+
+    return {dirname: len(items) for dirname, items in children.items()}
+
+
+def flatten(names: list[str]) -> dict[str, str]:
+    mapping = {}
+
+    for name in names:
+        if is_directory(name):
+            mapping[name] = None
+        else:
+            mapping[name] = posixpath.basename(name)
+
+    handler.duplicate_names(mapping.values())
+
+    return mapping
+
+
+def format_pages(
+    names: list[str],
+    page_name: str,
+    page_regex: str,
+    remove: bool = False
+) -> dict[str, str]:
+    mapping = {}
+    children = count_children(names)
+
+    for dirname, items in group_by_directory(names).items():
+        padding = utils.zero_padded(children[dirname])
+        page_cnt = 1
+
+        for name in sorted(items):
+            item = posixpath.basename(name)
+
+            if is_directory(name):
+                mapping[name] = name
+                continue
+
+            if not re.search(page_regex, item):
+                mapping[name] = None if remove else name
+                continue
+
+            ext = utils.get_file_extension(item)
+            filename = f'{page_name}{page_cnt:{padding}}{ext}'
+
+            mapping[name] = posixpath.join(dirname, filename)
+
+            page_cnt += 1
+
+    handler.duplicate_names(mapping.values())
+
+    return mapping
+
+
+def first_page(names: list[str], page_regex: str = r"\d+") -> str:
+    groups = group_by_directory(names)
+
+    for dirname in sorted(groups):
+        for name in sorted(groups[dirname]):
+            item = posixpath.basename(name)
+            ext = utils.get_file_extension(item).lower()
+
+            if is_directory(name) or ext not in image_extensions:
+                continue
+
+            if re.search(page_regex, item):
+                return name
+
+    return None
+
+
+def compose(first: dict[str, str], second: dict[str, str]) -> dict[str, str]:
+    mapping = {}
+
+    for name, new_name in first.items():
+        if new_name is not None:
+            new_name = second.get(new_name, new_name)
+
+        mapping[name] = new_name
+
+    return mapping
+
+
+def changes(mapping: dict[str, str]) -> dict[str, str]:
+    return {name: new for name, new in mapping.items() if new != name}
+
+
+def scan(dirname: str, prefix: str = "") -> list[str]:
+    names = []
+
+    with os.scandir(dirname) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+
+    for entry in entries:
+        name = f'{prefix}{entry.name}'
+
+        if entry.is_dir(follow_symlinks=False):
+            names.append(f'{name}/')
+            names.extend(scan(entry.path, f'{name}/'))
+        else:
+            names.append(name)
+
+    return names
+
+
+def apply(dirname: str, mapping: dict[str, str]):
+    moves, removed = {}, []
+
+    for name, new_name in changes(mapping).items():
+        if new_name is None:
+            removed.append(name)
+        elif not is_directory(name):
+            moves[name] = new_name
+
+    if not moves and not removed:
+        return
+
+    staging = tempfile.mkdtemp(dir=dirname)
+
+    try:
+        staged = {}
+
+        for idx, name in enumerate(moves):
+            staged[name] = os.path.join(staging, str(idx))
+            os.replace(os.path.join(dirname, name), staged[name])
+
+        for name in removed:
+            path = os.path.join(dirname, name)
+
+            if is_directory(name):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+
+        for name, new_name in moves.items():
+            path = os.path.join(dirname, new_name)
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(staged[name], path)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
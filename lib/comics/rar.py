@@ -0,0 +1,338 @@
+import struct
+
+from typing import NamedTuple
+
+
+RAR4_SIGNATURE = b"Rar!\x1a\x07\x00"
+RAR5_SIGNATURE = b"Rar!\x1a\x07\x01\x00"
+
+RAR4_MAIN = 0x73
+RAR4_FILE = 0x74
+RAR4_END = 0x7b
+
+RAR4_LONG_BLOCK = 0x8000
+RAR4_SOLID_ARCHIVE = 0x0008
+RAR4_ENCRYPTED_HEADERS = 0x0080
+RAR4_ENCRYPTED = 0x0004
+RAR4_SOLID = 0x0010
+RAR4_DIRECTORY = 0x00e0
+RAR4_LARGE = 0x0100
+RAR4_UNICODE = 0x0200
+
+RAR5_MAIN = 1
+RAR5_FILE = 2
+RAR5_ENCRYPTION = 4
+RAR5_END = 5
+
+RAR5_EXTRA = 0x0001
+RAR5_DATA = 0x0002
+RAR5_SOLID_ARCHIVE = 0x0004
+RAR5_DIRECTORY = 0x0001
+RAR5_MTIME = 0x0002
+RAR5_CRC = 0x0004
+RAR5_SOLID = 0x0040
+RAR5_ENCRYPTION_RECORD = 0x01
+
+MAPPED_STRING_MARK = "\ufffe"
+MAP_AREA_START = 0xe000
+
+
+class RarEntry(NamedTuple):
+    name: str
+    size: int
+    crc: int
+    is_dir: bool
+    solid: bool
+    encrypted: bool
+
+
+def read_vint(data: bytes, pos: int) -> tuple[int, int]:
+    value, shift = 0, 0
+
+    while True:
+        if pos >= len(data):
+            raise EOFError("truncated RAR header")
+
+        byte = data[pos]
+        value |= (byte & 0x7f) << shift
+        pos += 1
+        shift += 7
+
+        if not byte & 0x80:
+            return value, pos
+
+
+def read_file_vint(f) -> int:
+    value, shift = 0, 0
+
+    while True:
+        byte = f.read(1)
+
+        if not byte:
+            raise EOFError("truncated RAR header")
+
+        value |= (byte[0] & 0x7f) << shift
+        shift += 7
+
+        if not byte[0] & 0x80:
+            return value
+
+
+def decode_name(name: bytes) -> str:
+    '''Decode a name without the Unicode flag.
+
+    The name is decoded the same way as unrar does in a UTF-8 locale, so
+    that it matches the names used for extraction. Bytes that are not valid
+    UTF-8 are mapped to the private use area, and the name is marked with a
+    non-character before the first of them.
+
+    Args:
+        name (bytes): Name as stored in the header.
+
+    Returns:
+        The decoded name.
+    '''
+
+    chars, pos, marked = [], 0, False
+
+    while True:
+        try:
+            chars.append(name[pos:].decode("utf-8"))
+            break
+        except UnicodeDecodeError as e:
+            start, end = pos + e.start, pos + e.end
+
+        chars.append(name[pos:start].decode("utf-8"))
+
+        if not marked:
+            chars.append(MAPPED_STRING_MARK)
+            marked = True
+
+        chars.extend(chr(MAP_AREA_START + byte) for byte in name[start:end])
+        pos = end
+
+    return "".join(chars)
+
+
+def decode_unicode_name(std: bytes, enc: bytes) -> str:
+    if not enc:
+        return decode_name(std)
+
+    high, pos, enc_pos = enc[0], 0, 1
+    flags, flag_bits = 0, 0
+    chars = []
+
+    while enc_pos < len(enc):
+        if flag_bits == 0:
+            flags, flag_bits = enc[enc_pos], 8
+            enc_pos += 1
+
+        flag_bits -= 2
+        mode = (flags >> flag_bits) & 3
+
+        if mode == 0:
+            chars.append(enc[enc_pos])
+            enc_pos += 1
+        elif mode == 1:
+            chars.append(enc[enc_pos] | high << 8)
+            enc_pos += 1
+        elif mode == 2:
+            chars.append(enc[enc_pos] | enc[enc_pos + 1] << 8)
+            enc_pos += 2
+        else:
+            length = enc[enc_pos]
+            enc_pos += 1
+
+            if length & 0x80:
+                correction = enc[enc_pos]
+                enc_pos += 1
+
+                for idx in range(pos, pos + (length & 0x7f) + 2):
+                    chars.append((std[idx] + correction) & 0xff | high << 8)
+            else:
+                chars.extend(std[pos:pos + length + 2])
+
+        pos = len(chars)
+
+    return "".join(map(chr, chars))
+
+
+def read_rar4(f) -> list[RarEntry]:
+    entries, solid = [], False
+
+    while True:
+        block = f.read(7)
+
+        if len(block) < 7:
+            break
+
+        _, htype, flags, size = struct.unpack("<HBHH", block)
+
+        if size < 7:
+            raise ValueError("invalid RAR header")
+
+        header = f.read(size - 7)
+        add_size = 0
+
+        if flags & RAR4_LONG_BLOCK and htype != RAR4_FILE:
+            add_size = struct.unpack("<I", header[:4])[0]
+
+        if htype == RAR4_END:
+            break
+
+        if htype == RAR4_MAIN:
+            if flags & RAR4_ENCRYPTED_HEADERS:
+                raise PermissionError("RAR headers are encrypted")
+
+            solid = bool(flags & RAR4_SOLID_ARCHIVE)
+
+        if htype == RAR4_FILE:
+            pack_size, unp_size, _, crc, _, _, _, name_size, _ = struct.unpack(
+                "<IIBIIBBHI", header[:25]
+            )
+            pos = 25
+
+            if flags & RAR4_LARGE:
+                high_pack, high_unp = struct.unpack("<II", header[25:33])
+                pack_size += high_pack << 32
+                unp_size += high_unp << 32
+                pos = 33
+
+            name = header[pos:pos + name_size]
+
+            if flags & RAR4_UNICODE and b"\x00" in name:
+                std, enc = name.split(b"\x00", 1)
+
+                try:
+                    name = decode_unicode_name(std, enc)
+                except IndexError:
+                    name = decode_name(std)
+            else:
+                name = decode_name(name)
+
+            name = name.replace("\\", "/")
+            is_dir = flags & RAR4_DIRECTORY == RAR4_DIRECTORY
+
+            if is_dir:
+                name = f'{name.rstrip("/")}/'
+
+            entries.append(RarEntry(
+                name,
+                unp_size,
+                crc,
+                is_dir,
+                solid or bool(flags & RAR4_SOLID),
+                bool(flags & RAR4_ENCRYPTED)
+            ))
+
+            add_size = pack_size
+
+        f.seek(add_size, 1)
+
+    return entries
+
+
+def read_rar5(f) -> list[RarEntry]:
+    entries, solid = [], False
+
+    while True:
+        if len(f.read(4)) < 4:
+            break
+
+        size = read_file_vint(f)
+        header = f.read(size)
+
+        if len(header) < size:
+            raise EOFError("truncated RAR header")
+
+        htype, pos = read_vint(header, 0)
+        flags, pos = read_vint(header, pos)
+        extra_size, data_size = 0, 0
+
+        if flags & RAR5_EXTRA:
+            extra_size, pos = read_vint(header, pos)
+
+        if flags & RAR5_DATA:
+            data_size, pos = read_vint(header, pos)
+
+        if htype == RAR5_END:
+            break
+
+        if htype == RAR5_ENCRYPTION:
+            raise PermissionError("RAR headers are encrypted")
+
+        if htype == RAR5_MAIN:
+            archive_flags, _ = read_vint(header, pos)
+            solid = bool(archive_flags & RAR5_SOLID_ARCHIVE)
+
+        if htype == RAR5_FILE:
+            entries.append(read_rar5_file(header, pos, extra_size, solid))
+
+        f.seek(data_size, 1)
+
+    return entries
+
+
+def read_rar5_file(
+    header: bytes,
+    pos: int,
+    extra_size: int,
+    solid: bool
+) -> RarEntry:
+    file_flags, pos = read_vint(header, pos)
+    size, pos = read_vint(header, pos)
+    _, pos = read_vint(header, pos)
+
+    if file_flags & RAR5_MTIME:
+        pos += 4
+
+    crc = 0
+
+    if file_flags & RAR5_CRC:
+        crc = struct.unpack("<I", header[pos:pos + 4])[0]
+        pos += 4
+
+    compression, pos = read_vint(header, pos)
+    _, pos = read_vint(header, pos)
+    name_size, pos = read_vint(header, pos)
+
+    name = header[pos:pos + name_size].decode("utf-8", "replace")
+    is_dir = bool(file_flags & RAR5_DIRECTORY)
+
+    if is_dir:
+        name = f'{name.rstrip("/")}/'
+
+    encrypted = False
+    pos = len(header) - extra_size
+
+    while pos < len(header):
+        record_size, record = read_vint(header, pos)
+        record_type, _ = read_vint(header, record)
+
+        if record_type == RAR5_ENCRYPTION_RECORD:
+            encrypted = True
+
+        pos = record + record_size
+
+    return RarEntry(
+        name,
+        size,
+        crc,
+        is_dir,
+        solid or bool(compression & RAR5_SOLID),
+        encrypted
+    )
+
+
+def read_entries(path: str) -> list[RarEntry]:
+    with open(path, "rb") as f:
+        signature = f.read(8)
+
+        if signature == RAR5_SIGNATURE:
+            return read_rar5(f)
+
+        if signature[:7] == RAR4_SIGNATURE:
+            f.seek(7)
+            return read_rar4(f)
+
+    raise ValueError(f'"{path}" is not a RAR archive')
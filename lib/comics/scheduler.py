@@ -0,0 +1,176 @@
+import bisect
+import os
+import shutil
+import tempfile
+
+from typing import NamedTuple
+
+from comics import Archive
+from comics.comic import MEMORY_LIMIT
+
+
+class Footprint(NamedTuple):
+    memory: int = 0
+    disk: int = 0
+    size: int = 0
+
+
+def memory_limit() -> int:
+    return int(os.environ.get("COMIC_FMT_MEMORY_LIMIT", MEMORY_LIMIT))
+
+
+def estimate(path: str, limit: int = None, threads: int = 1) -> Footprint:
+    '''Estimate the footprint of editing an archive.
+
+    The member sizes are read from the central directory or the RAR headers
+    without decompressing anything. An edit keeps the original members in
+    the archive and streams them when the comic is saved, so only the
+    largest member is held in memory, or a few of them per compression
+    thread. The archive is only uncompressed to the workspace in full if
+    the memory limit is zero. Archives that cannot be listed are estimated
+    as empty, so the error is reported by the job itself.
+
+    Args:
+        path (str): Path to file archive.
+        limit (int): Memory limit of an edit.
+        threads (int): Number of compression threads.
+
+    Returns:
+        The estimated memory and scratch disk usage, and the uncompressed
+        size of the archive.
+    '''
+
+    limit = memory_limit() if limit is None else limit
+    threads = threads or os.cpu_count()
+
+    try:
+        sizes = [member.size for member in Archive(path).members()]
+    except Exception:
+        return Footprint()
+
+    size, largest = sum(sizes), max(sizes, default=0)
+    memory = largest if threads == 1 else largest * threads * 2
+
+    if limit == 0:
+        return Footprint(memory, size, size)
+
+    return Footprint(memory, 0, size)
+
+
+def default_memory_budget() -> int:
+    try:
+        pages = os.sysconf("SC_PHYS_PAGES")
+        page_size = os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+    return pages * page_size // 2
+
+
+def default_scratch_budget() -> int:
+    root = os.environ.get("COMIC_FMT_WORKSPACE") or tempfile.gettempdir()
+
+    while not os.path.isdir(root):
+        root = os.path.dirname(os.path.abspath(root))
+
+    return shutil.disk_usage(root).free
+
+
+def within(used: int, budget: int) -> bool:
+    return budget <= 0 or used <= budget
+
+
+class Scheduler:
+    def __init__(self, memory: int = None, disk: int = None):
+        if memory is None:
+            memory = int(
+                os.environ.get("COMIC_FMT_MEMORY_BUDGET")
+                or default_memory_budget()
+            )
+
+        if disk is None:
+            disk = int(
+                os.environ.get("COMIC_FMT_SCRATCH_BUDGET")
+                or default_scratch_budget()
+            )
+
+        self.memory = memory
+        self.disk = disk
+        self.used = Footprint()
+        self.running = 0
+        self.queue = []
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.queue)
+
+    def add(self, item, footprint: Footprint):
+        '''Queue job.
+
+        Jobs are started in order of their uncompressed size, largest
+        first, so that the longest jobs are not left for the end of the run
+        while the other workers are idle.
+
+        Args:
+            item: Job to run.
+            footprint (Footprint): Estimated resource usage of the job.
+        '''
+
+        bisect.insort(
+            self.queue,
+            (item, footprint),
+            key=lambda job: -job[1].size
+        )
+
+    def fits(self, footprint: Footprint) -> bool:
+        if self.running == 0:
+            return True
+
+        return (
+            within(self.used.memory + footprint.memory, self.memory)
+            and within(self.used.disk + footprint.disk, self.disk)
+        )
+
+    def take(self) -> tuple:
+        '''Start job.
+
+        Take the largest queued job that fits within the remaining memory
+        and scratch disk budgets. A job that exceeds a budget on its own is
+        only started once no other job is running.
+
+        Returns:
+            The job and its footprint, or None if no job fits.
+        '''
+
+        for idx, (item, footprint) in enumerate(self.queue):
+            if not self.fits(footprint):
+                continue
+
+            del self.queue[idx]
+
+            self.running += 1
+            self.used = Footprint(
+                self.used.memory + footprint.memory,
+                self.used.disk + footprint.disk,
+                self.used.size + footprint.size
+            )
+
+            return item, footprint
+
+        return None
+
+    def release(self, footprint: Footprint):
+        '''Finish job.
+
+        Return the resources of a finished job to the budgets.
+
+        Args:
+            footprint (Footprint): Estimated resource usage of the job.
+        '''
+
+        self.running -= 1
+        self.used = Footprint(
+            self.used.memory - footprint.memory,
+            self.used.disk - footprint.disk,
+            self.used.size - footprint.size
+        )
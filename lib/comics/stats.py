@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+current = ContextVar("stats", default=None)
+
+FIELDS = ["calls", "wall", "cpu", "read", "written", "files"]
+
+
+class Phase:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.read = 0
+        self.written = 0
+        self.files = 0
+
+    def measure(self, read: str = None, written: str = None):
+        '''Measure file sizes.
+
+        Add the size of the files to the bytes read and written. Files are
+        only measured while stats are being collected.
+
+        Args:
+            read (str): Path to file that was read.
+            written (str): Path to file that was written.
+        '''
+
+        if not self.enabled:
+            return
+
+        if read is not None:
+            self.read += os.path.getsize(read)
+
+        if written is not None:
+            self.written += os.path.getsize(written)
+
+
+class Stats:
+    def __init__(self, phases: dict[str, dict] = None):
+        self.phases = {
+            name: dict(counters)
+            for name, counters in (phases or {}).items()
+        }
+        self.lock = threading.Lock()
+
+    def add(self, name: str, **counters):
+        '''Add counters to a phase.
+
+        Args:
+            name (str): Name of phase.
+            counters: Values added to the calls, wall, cpu, read, written and
+                files counters of the phase.
+        '''
+
+        with self.lock:
+            phase = self.phases.setdefault(name, dict.fromkeys(FIELDS, 0))
+
+            for field, value in counters.items():
+                phase[field] += value
+
+    def merge(self, other: "Stats"):
+        '''Merge stats.
+
+        Args:
+            other (Stats): Stats added to these stats.
+        '''
+
+        for name, counters in other.phases.items():
+            self.add(name, **counters)
+
+    def to_dict(self) -> dict[str, dict]:
+        '''Convert stats to a dictionary.
+
+        Returns:
+            A mapping of phase names to their counters.
+        '''
+
+        with self.lock:
+            return {
+                name: dict(counters)
+                for name, counters in self.phases.items()
+            }
+
+
+@contextmanager
+def collect(stats: Stats = None):
+    '''Collect stats.
+
+    Record the phases that run in the current thread until the context
+    exits.
+
+    Args:
+        stats (Stats): Stats to record to. A new instance is created if not
+            specified.
+    '''
+
+    stats = stats or Stats()
+    token = current.set(stats)
+
+    try:
+        yield stats
+    finally:
+        current.reset(token)
+
+
+@contextmanager
+def phase(name: str):
+    '''Time a phase.
+
+    Record the wall time and process CPU time of a phase in the stats that
+    are being collected, if any. The caller can add the number of bytes
+    read and written and the number of files to the yielded phase.
+
+    Args:
+        name (str): Name of phase.
+    '''
+
+    stats = current.get()
+    record = Phase(stats is not None)
+
+    if stats is None:
+        yield record
+        return
+
+    wall, cpu = time.perf_counter(), time.process_time()
+
+    try:
+        yield record
+    finally:
+        stats.add(
+            name,
+            calls=1,
+            wall=time.perf_counter() - wall,
+            cpu=time.process_time() - cpu,
+            read=record.read,
+            written=record.written,
+            files=record.files
+        )
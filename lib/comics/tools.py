@@ -0,0 +1,128 @@
+import os
+import shutil
+import subprocess
+
+from comics import backends
+from comics.backends import BackendError
+
+
+def executable(*names: str) -> str:
+    for name in names:
+        path = shutil.which(name)
+
+        if path is not None:
+            return path
+
+    return None
+
+
+def run_tool(args: list[str], stdin: bytes = None) -> bytes:
+    process = subprocess.run(
+        args,
+        input=stdin,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+    if process.returncode != 0:
+        message = process.stderr.decode(errors="replace").strip()
+        raise BackendError(f'{os.path.basename(args[0])} failed: {message}')
+
+    return process.stdout
+
+
+def member_names(names: list[str]) -> list[str]:
+    return [name.rstrip("/") for name in names]
+
+
+def output_dir(output_path: str) -> str:
+    output_path = output_path or "."
+    os.makedirs(output_path, exist_ok=True)
+
+    return output_path
+
+
+def unrar_extract(path: str, output_path: str, names: list[str] = None):
+    if names is not None and not names:
+        return
+
+    args = [executable("unrar"), "x", "-o+", "-y", "-idq"]
+    stdin = None
+
+    if names is not None:
+        args.append("-n@")
+        stdin = "\n".join(member_names(names)).encode()
+
+    args += ["--", path, os.path.join(output_dir(output_path), "")]
+
+    run_tool(args, stdin)
+
+
+def unrar_read(path: str, item: str) -> bytes:
+    return run_tool([executable("unrar"), "p", "-inul", "--", path, item])
+
+
+def bsdtar_extract(path: str, output_path: str, names: list[str] = None):
+    if names is not None and not names:
+        return
+
+    args = [executable("bsdtar"), "-xf", path, "-C", output_dir(output_path)]
+
+    run_tool(args + ["--"] + member_names(names or []))
+
+
+def bsdtar_read(path: str, item: str) -> bytes:
+    return run_tool([executable("bsdtar"), "-xOf", path, "--", item])
+
+
+def sevenzip_extract(path: str, output_path: str, names: list[str] = None):
+    if names is not None and not names:
+        return
+
+    args = [
+        executable("7z", "7zz", "7za"),
+        "x",
+        "-y",
+        "-bso0",
+        "-bsp0",
+        f'-o{output_dir(output_path)}',
+        "--",
+        path
+    ]
+
+    run_tool(args + member_names(names or []))
+
+
+def sevenzip_read(path: str, item: str) -> bytes:
+    args = [executable("7z", "7zz", "7za"), "e", "-so", "--", path, item]
+
+    return run_tool(args)
+
+
+def has_unrar() -> bool:
+    return executable("unrar") is not None
+
+
+def has_bsdtar() -> bool:
+    return executable("bsdtar") is not None
+
+
+def has_sevenzip() -> bool:
+    return executable("7z", "7zz", "7za") is not None
+
+
+registrations = [
+    ("rar", "extract", "unrar", unrar_extract, 4, has_unrar),
+    ("rar", "extract", "bsdtar", bsdtar_extract, 0.5, has_bsdtar),
+    ("rar", "extract", "7z", sevenzip_extract, 2, has_sevenzip),
+    ("rar", "read", "unrar", unrar_read, 0.5, has_unrar),
+    ("rar", "read", "bsdtar", bsdtar_read, 0.5, has_bsdtar),
+    ("rar", "read", "7z", sevenzip_read, 0.5, has_sevenzip),
+    ("zip", "extract", "bsdtar", bsdtar_extract, 0.5, has_bsdtar),
+    ("zip", "extract", "7z", sevenzip_extract, 0.5, has_sevenzip),
+    ("zip", "read", "bsdtar", bsdtar_read, 0.5, has_bsdtar),
+    ("zip", "read", "7z", sevenzip_read, 0.5, has_sevenzip)
+]
+
+for registration in registrations:
+    backends.register(*registration)
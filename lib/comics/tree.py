@@ -0,0 +1,200 @@
+import os
+import shutil
+import tempfile
+import time
+
+from zipfile import ZipFile, ZipInfo
+
+from comics import Archive
+from comics.archive import transfer
+from comics.compression import Policy
+from comics.stats import phase
+from comics.writer import Writer
+
+
+class Tree:
+    def __init__(self, archive: Archive):
+        self.archive = archive
+        self.items = {item: item for item in archive.namelist()}
+        self.size = 0
+
+    def names(self) -> list[str]:
+        '''List items.
+
+        Directories are listed even if the archive has no entry for them,
+        and items are ordered the same way as when the comic is edited on
+        disk.
+
+        Returns:
+            A list of the current names of all items within the tree.
+        '''
+
+        names = set(self.items)
+
+        for name in self.items:
+            parts = name.rstrip("/").split("/")[:-1]
+
+            for idx in range(1, len(parts) + 1):
+                names.add(f'{"/".join(parts[:idx])}/')
+
+        return sorted(names, key=lambda name: name.rstrip("/").split("/"))
+
+    def members(self) -> dict[str, str]:
+        '''List unchanged items.
+
+        Returns:
+            A mapping of current item names to the members of the original
+            archive that hold their data.
+        '''
+
+        return self.__partition()[0]
+
+    def rename(self, mapping: dict[str, str]):
+        '''Rename items.
+
+        Items that are mapped to None are removed from the tree. Items that
+        are missing from the mapping are left unchanged.
+
+        Args:
+            mapping (dict): Mapping of current item names to new names.
+        '''
+
+        items = {}
+
+        for name, item in self.items.items():
+            new_name = mapping.get(name, name)
+
+            if new_name is None:
+                self.size -= self.__sizeof(item)
+                continue
+
+            items[new_name] = item
+
+        self.items = items
+
+    def read(self, name: str) -> bytes:
+        '''Read item.
+
+        Args:
+            name (str): Name of item.
+
+        Returns:
+            The uncompressed data of the item.
+        '''
+
+        item = self.items[name]
+
+        if isinstance(item, bytes):
+            return item
+
+        return self.archive.read(item)
+
+    def write(self, name: str, data: bytes):
+        '''Write item.
+
+        Add a new item or replace an existing one. The data is held in memory
+        until the tree is saved or extracted.
+
+        Args:
+            name (str): Name of item.
+            data (bytes): Uncompressed data of the item.
+        '''
+
+        self.size -= self.__sizeof(self.items.get(name))
+        self.size += len(data)
+
+        self.items[name] = data
+
+    def search(self, query: str) -> list[str]:
+        '''Search items.
+
+        Args:
+            query (str): Search query.
+
+        Returns:
+            A list of items within the tree that match the query.
+        '''
+
+        if not query:
+            return []
+
+        return [name for name in self.names() if query in name]
+
+    def save(self, target: str, policy: Policy = None, threads: int = 1):
+        '''Save tree.
+
+        Write all items to a new ZIP archive. Unchanged items are copied from
+        the original archive without recompressing whenever the format allows
+        it, otherwise they are streamed.
+
+        Args:
+            target (str): Path to target file archive.
+            policy (Policy): Compression policy.
+            threads (int): Number of compression threads.
+        '''
+
+        members, data = self.__partition()
+
+        with phase("save") as record:
+            with ZipFile(target, mode='w') as output:
+                with Writer(output, policy, threads) as writer:
+                    transfer(self.archive.ext)(
+                        self.archive.path, writer, members
+                    )
+
+                    for name, item in data.items():
+                        entry = ZipInfo(name, date_time=time.localtime()[:6])
+                        writer.write(entry, item)
+
+            record.measure(read=self.archive.path, written=target)
+            record.files = len(output.filelist)
+
+    def extract(self, dirname: str):
+        '''Extract tree.
+
+        Write all items to a directory using their current names.
+
+        Args:
+            dirname (str): Path to output directory.
+        '''
+
+        members, data = self.__partition()
+
+        source = tempfile.mkdtemp(dir=dirname)
+
+        try:
+            self.archive.uncompress(source)
+
+            for name, member in members.items():
+                path = os.path.join(dirname, name)
+
+                if name.endswith("/"):
+                    os.makedirs(path, exist_ok=True)
+                    continue
+
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(os.path.join(source, member), path)
+        finally:
+            shutil.rmtree(source, ignore_errors=True)
+
+        for name, item in data.items():
+            path = os.path.join(dirname, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            with open(path, "wb") as f:
+                f.write(item)
+
+    def __partition(self) -> tuple[dict[str, str], dict[str, bytes]]:
+        members, data = {}, {}
+
+        for name, item in self.items.items():
+            if isinstance(item, bytes):
+                data[name] = item
+            else:
+                members[name] = item
+
+        return members, data
+
+    @staticmethod
+    def __sizeof(item) -> int:
+        return len(item) if isinstance(item, bytes) else 0
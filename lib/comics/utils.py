@@ -29,6 +29,11 @@ def remove_top_directory(path: str) -> str:
     return path.split(os.path.sep, 1)[-1]
 
 
+def cache_path(filename: str) -> str:
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache, "comic-fmt", filename)
+
+
 def traverse(dirname: str):
     for item in sorted(os.listdir(dirname)):
         path = os.path.join(dirname, item)
@@ -0,0 +1,125 @@
+import os
+
+from fnmatch import fnmatch
+from typing import Iterable
+
+from comics import utils
+from comics.backends import formats
+
+
+supported_orders = {
+    "name": None,
+    "size": False,
+    "size-desc": True
+}
+
+
+def matches_patterns(name: str, relpath: str, patterns: Iterable[str]):
+    return any(
+        fnmatch(name, pattern) or fnmatch(relpath, pattern)
+        for pattern in patterns
+    )
+
+
+class Walker:
+    def __init__(
+        self,
+        recursive: bool = False,
+        extensions: Iterable[str] = None,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        follow_symlinks: bool = False,
+        hidden: bool = False,
+        sort: str = "name"
+    ):
+        if sort not in supported_orders:
+            raise ValueError(f'unsupported sort order {sort}')
+
+        self.recursive = recursive
+        self.extensions = set(extensions or formats)
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.follow_symlinks = follow_symlinks
+        self.hidden = hidden
+        self.sort = sort
+
+    def walk(self, path: str) -> Iterable[str]:
+        '''Walk path.
+
+        Lazily yield the file archives within a directory. Entries are
+        yielded in name order as each directory is scanned, so processing
+        can start before the whole tree has been read. Sorting by size
+        requires the tree to be scanned up front.
+
+        A path that is not a directory is yielded as-is, so that missing or
+        unsupported files are reported by the caller.
+
+        Args:
+            path (str): Path to file archive or directory.
+
+        Returns:
+            An iterable of paths to file archives.
+        '''
+
+        if not os.path.isdir(path):
+            yield path
+            return
+
+        entries = self.__scan(path, path, set())
+        reverse = supported_orders[self.sort]
+
+        if reverse is not None:
+            entries = sorted(
+                entries,
+                key=lambda entry: entry.stat().st_size,
+                reverse=reverse
+            )
+
+        for entry in entries:
+            yield entry.path
+
+    def __scan(
+        self,
+        dirname: str,
+        root: str,
+        visited: set
+    ) -> Iterable[os.DirEntry]:
+        stat = os.stat(dirname)
+        visited.add((stat.st_dev, stat.st_ino))
+
+        with os.scandir(dirname) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+
+        for entry in entries:
+            if entry.name.startswith(".") and not self.hidden:
+                continue
+
+            if entry.is_symlink() and not self.follow_symlinks:
+                continue
+
+            if entry.is_dir():
+                if not self.recursive:
+                    continue
+
+                stat = entry.stat()
+
+                if (stat.st_dev, stat.st_ino) not in visited:
+                    yield from self.__scan(entry.path, root, visited)
+                continue
+
+            if not entry.is_file() or not self.__matches(entry, root):
+                continue
+
+            yield entry
+
+    def __matches(self, entry: os.DirEntry, root: str) -> bool:
+        if utils.get_file_extension(entry.name) not in self.extensions:
+            return False
+
+        relpath = os.path.relpath(entry.path, root)
+
+        if self.include:
+            if not matches_patterns(entry.name, relpath, self.include):
+                return False
+
+        return not matches_patterns(entry.name, relpath, self.exclude)
@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import time
+
+from comics import utils
+from comics.index import signature
+from comics.walker import Walker
+
+
+SETTLE_TIME = 5.0
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS processed (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL
+);
+'''
+
+
+def default_path() -> str:
+    return utils.cache_path("watch.db")
+
+
+class Watcher:
+    def __init__(
+        self,
+        path: str,
+        walker: Walker = None,
+        settle: float = SETTLE_TIME,
+        state: str = None
+    ):
+        state = state or os.environ.get("COMIC_FMT_WATCH_STATE")
+        state = state or default_path()
+
+        if state != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(state)), exist_ok=True)
+
+        self.path = path
+        self.walker = walker or Walker()
+        self.settle = settle
+        self.pending = {}
+        self.connection = sqlite3.connect(state)
+
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+        self.processed = {
+            path: (size, mtime)
+            for path, size, mtime in self.connection.execute(
+                "SELECT path, size, mtime FROM processed"
+            )
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_trace):
+        self.close()
+
+    def close(self):
+        '''Close watcher.'''
+
+        self.connection.close()
+
+    @property
+    def waiting(self) -> bool:
+        return bool(self.pending)
+
+    def poll(self, now: float = None) -> list[str]:
+        '''Find new archives.
+
+        Scan the watched directory for archives that are new or changed
+        since they were processed. An archive is only returned once its
+        size and modification time are unchanged for the settle time, so
+        files that are still being written are left alone.
+
+        Args:
+            now (float): Monotonic time of the scan.
+
+        Returns:
+            A list of archives that are ready to be processed.
+        '''
+
+        now = time.monotonic() if now is None else now
+        pending, ready = {}, []
+
+        for path in self.walker.walk(self.path):
+            try:
+                current = signature(path)
+            except FileNotFoundError:
+                continue
+
+            if self.processed.get(os.path.abspath(path)) == current:
+                continue
+
+            previous, since = self.pending.get(path, (None, now))
+
+            if previous != current:
+                since = now
+
+            pending[path] = current, since
+
+            if now - since >= self.settle:
+                ready.append(path)
+
+        self.pending = pending
+
+        return ready
+
+    def mark(self, *paths: str):
+        '''Mark archives as processed.
+
+        Processed archives are skipped until their size or modification
+        time changes. Missing files are ignored.
+
+        Args:
+            paths (str): Paths to file archives.
+        '''
+
+        with self.connection:
+            for path in paths:
+                self.pending.pop(path, None)
+
+                if not os.path.isfile(path):
+                    continue
+
+                key, current = os.path.abspath(path), signature(path)
+
+                self.processed[key] = current
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO processed VALUES (?, ?, ?)",
+                    (key, *current)
+                )
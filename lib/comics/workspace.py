@@ -0,0 +1,137 @@
+import os
+import re
+import shutil
+import tempfile
+
+from contextlib import contextmanager
+
+from comics import utils
+
+
+def current_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+
+    return umask
+
+
+UMASK = current_umask()
+
+
+@contextmanager
+def staged(target: str):
+    '''Stage file beside target.
+
+    Yield a temporary path in the same directory as the target. Once the
+    caller has finished writing, the file is renamed over the target. If an
+    error occurs, the temporary file is removed and the target is untouched.
+
+    The file keeps the permissions of the target, or the default
+    permissions for a new file if the target does not exist yet.
+
+    Args:
+        target (str): Path to target file.
+    '''
+
+    dirname, filename = os.path.split(target)
+
+    fd, path = tempfile.mkstemp(
+        prefix=f'.{utils.remove_file_extension(filename)}.',
+        suffix=utils.get_file_extension(filename),
+        dir=dirname or "."
+    )
+    os.close(fd)
+
+    try:
+        yield path
+
+        if os.path.exists(target):
+            shutil.copymode(target, path)
+        else:
+            os.chmod(path, 0o666 & ~UMASK)
+
+        os.replace(path, target)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+def staged_files(target: str) -> list[str]:
+    '''Find staged files.
+
+    Find the temporary files that were staged beside the target but never
+    renamed over it, such as those left behind by an interrupted process.
+
+    Args:
+        target (str): Path to target file.
+
+    Returns:
+        A list of paths to staged files.
+    '''
+
+    dirname, filename = os.path.split(target)
+
+    pattern = re.compile(
+        rf'\.{re.escape(utils.remove_file_extension(filename))}'
+        rf'\.[a-z0-9_]{{8}}{re.escape(utils.get_file_extension(filename))}$'
+    )
+
+    if not os.path.isdir(dirname or "."):
+        return []
+
+    return [
+        os.path.join(dirname, name)
+        for name in sorted(os.listdir(dirname or "."))
+        if pattern.match(name)
+    ]
+
+
+class Workspace:
+    def __init__(self, root: str = None):
+        self.root = root or os.environ.get("COMIC_FMT_WORKSPACE")
+        self.__directory = None
+
+    @property
+    def path(self) -> str:
+        if self.__directory is None:
+            return None
+
+        return self.__directory.name
+
+    def create(self) -> str:
+        '''Create workspace.
+
+        Create a unique directory within the root directory. If the root is
+        not specified, the system temporary directory is used. The directory
+        is removed automatically if the workspace is garbage collected or the
+        interpreter exits.
+
+        Returns:
+            Path to workspace directory.
+        '''
+
+        if self.__directory is not None:
+            return self.path
+
+        if self.root:
+            os.makedirs(self.root, exist_ok=True)
+
+        self.__directory = tempfile.TemporaryDirectory(
+            prefix="comic-fmt-",
+            dir=self.root
+        )
+
+        return self.path
+
+    def remove(self):
+        '''Remove workspace.
+
+        Delete the workspace directory and all of its contents.
+        '''
+
+        if self.__directory is None:
+            return
+
+        self.__directory.cleanup()
+        self.__directory = None
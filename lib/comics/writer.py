@@ -0,0 +1,228 @@
+import os
+import time
+import zlib
+
+from collections import deque
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
+
+from comics.compression import HEADER_SIZE, Policy
+
+
+def apply_policy(entry: ZipInfo, header: bytes, policy: Policy = None):
+    if not entry.external_attr and not entry.is_dir():
+        entry.external_attr = 0o600 << 16
+
+    if entry.is_dir():
+        entry.compress_type = ZIP_STORED
+    elif policy is not None:
+        entry.compress_type, entry._compresslevel = policy.select(header)
+
+
+def compress(entry: ZipInfo, data: bytes) -> tuple[ZipInfo, bytes]:
+    entry.file_size = len(data)
+    entry.CRC = zlib.crc32(data)
+
+    if entry.compress_type == ZIP_DEFLATED:
+        level = entry._compresslevel
+
+        if level is None:
+            level = zlib.Z_DEFAULT_COMPRESSION
+
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        data = compressor.compress(data) + compressor.flush()
+    elif entry.compress_type != ZIP_STORED:
+        raise NotImplementedError("unsupported compression method")
+
+    entry.compress_size = len(data)
+
+    return entry, data
+
+
+def append(output: ZipFile, entry: ZipInfo, data: bytes):
+    output.fp.seek(output.start_dir)
+
+    entry.header_offset = output.fp.tell()
+
+    output.fp.write(entry.FileHeader())
+    output.fp.write(data)
+
+    output.start_dir = output.fp.tell()
+    output.filelist.append(entry)
+    output.NameToInfo[entry.filename] = entry
+    output._didModify = True
+
+
+class Entry:
+    def __init__(self, writer, entry: ZipInfo):
+        self.writer = writer
+        self.entry = entry
+        self.chunks = []
+        self.file = None
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_trace):
+        self.close()
+
+    def write(self, data: bytes):
+        if self.writer.threads > 1:
+            self.chunks.append(data)
+            return
+
+        if self.file is None:
+            self.__open(data)
+
+        self.file.write(data)
+
+    def close(self):
+        if self.closed:
+            return
+
+        self.closed = True
+
+        if self.writer.threads > 1:
+            self.writer.write(self.entry, b"".join(self.chunks))
+            self.chunks = []
+            return
+
+        if self.file is None:
+            self.__open(b"")
+
+        self.file.close()
+
+    def __open(self, header: bytes):
+        apply_policy(self.entry, header[:HEADER_SIZE], self.writer.policy)
+        self.file = self.writer.output.open(self.entry, "w")
+
+
+class Writer:
+    def __init__(
+        self,
+        output: ZipFile,
+        policy: Policy = None,
+        threads: int = 1
+    ):
+        self.output = output
+        self.policy = policy
+        self.threads = threads or os.cpu_count()
+
+        self.__pending = deque()
+        self.__executor = None
+
+        if self.threads > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self.__executor = ThreadPoolExecutor(self.threads)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_trace):
+        if exc_type is None:
+            self.flush()
+
+        self.close()
+
+    def open(self, entry: ZipInfo) -> Entry:
+        '''Open entry for writing.
+
+        The compression of the entry is selected from the first chunk of
+        data that is written. If multiple threads are used, the data is
+        compressed once the entry is closed.
+
+        Args:
+            entry (ZipInfo): Entry to write.
+
+        Returns:
+            A file-like object for the entry.
+        '''
+
+        return Entry(self, entry)
+
+    def write(self, entry: ZipInfo, data: bytes):
+        '''Write entry.
+
+        Compress the data and add the entry to the archive. If multiple
+        threads are used, entries are compressed in parallel and added in
+        the same order as they were written.
+
+        Args:
+            entry (ZipInfo): Entry to write.
+            data (bytes): Uncompressed data of the entry.
+        '''
+
+        apply_policy(entry, data[:HEADER_SIZE], self.policy)
+
+        if self.__executor is None:
+            self.output.writestr(entry, data)
+            return
+
+        self.__enqueue(self.__executor.submit(compress, entry, data))
+
+    def mkdir(self, name: str):
+        '''Write directory.
+
+        Args:
+            name (str): Name of directory.
+        '''
+
+        entry = ZipInfo(name, date_time=time.localtime()[:6])
+        entry.external_attr = 0o40775 << 16 | 0x10
+
+        self.write(entry, b"")
+
+    def copy(self, entry: ZipInfo, data: bytes):
+        '''Copy entry.
+
+        Add an entry with data that has already been compressed. The CRC and
+        sizes of the entry must already be set.
+
+        Args:
+            entry (ZipInfo): Entry to write.
+            data (bytes): Compressed data of the entry.
+        '''
+
+        if self.__executor is None:
+            append(self.output, entry, data)
+            return
+
+        from concurrent.futures import Future
+
+        future = Future()
+        future.set_result((entry, data))
+
+        self.__enqueue(future)
+
+    def flush(self):
+        '''Flush entries.
+
+        Wait for all pending entries to be compressed and add them to the
+        archive.
+        '''
+
+        while self.__pending:
+            append(self.output, *self.__pending.popleft().result())
+
+    def close(self):
+        '''Close writer.
+
+        Shut down the thread pool. Pending entries are discarded.
+        '''
+
+        if self.__executor is None:
+            return
+
+        for future in self.__pending:
+            future.cancel()
+
+        self.__pending.clear()
+        self.__executor.shutdown()
+        self.__executor = None
+
+    def __enqueue(self, future):
+        self.__pending.append(future)
+
+        while len(self.__pending) > self.threads * 2:
+            append(self.output, *self.__pending.popleft().result())
@@ -1,9 +1,16 @@
+import os
 import pytest
 
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+from pyfakefs.fake_filesystem_unittest import Pause
+
 from comics import Archive
+from comics.archive import list_rar_library, stream_rar
+from comics.backends import Backend
+from comics.compression import Policy
 
 
 def mock_context_manager():
@@ -30,30 +37,22 @@ def setup_file_system(fs):
 
 @pytest.fixture
 def zip_archive():
-    target = "comics.archive.supported_extensions"
+    target = "comics.backends.registry"
 
     zip_file, zip_archive = mock_context_manager()
 
-    zip_archive.namelist.return_value = [
-        "test_1.jpg", "test_2.jpg", "test_3.jpg"
-    ]
-
-    with patch.dict(target, {".zip": zip_file}):
+    with patch.dict(target, {("zip", "write"): [Backend("mock", zip_file)]}):
         yield zip_archive
 
 
 @pytest.fixture
-def rar_archive():
-    target = "comics.archive.supported_extensions"
+def rar_extract():
+    target = "comics.backends.registry"
 
-    rar_file, rar_archive = mock_context_manager()
-
-    rar_archive.namelist.return_value = [
-        "test_1.jpg", "test_2.jpg", "test_3.jpg"
-    ]
+    extract = MagicMock()
 
-    with patch.dict(target, {".rar": rar_file}):
-        yield rar_archive
+    with patch.dict(target, {("rar", "extract"): [Backend("mock", extract)]}):
+        yield extract
 
 
 def test_file():
@@ -84,11 +83,10 @@ def test_unsupported_extension():
         Archive("test_dir/test_1.jpg")
 
 
-def test_compress(zip_archive, rar_archive):
+def test_compress(zip_archive):
     Archive.compress("test_dir", "new.zip")
 
     zip_archive.write.assert_called()
-    rar_archive.write.assert_not_called()
 
     expected_items = ["test_1.jpg", "test_2.jpg", "test_3.jpg"]
 
@@ -99,16 +97,21 @@ def test_compress(zip_archive, rar_archive):
         )
 
 
-def test_uncompress(zip_archive, rar_archive):
+def test_uncompress(rar_extract):
     a = Archive("test.rar")
 
     a.uncompress()
 
-    zip_archive.extractall.assert_not_called()
-    rar_archive.extractall.assert_called()
+    rar_extract.assert_called_once_with("test.rar", "")
 
 
-def test_search(rar_archive):
+def test_search(make_rar):
+    make_rar("test.rar", {
+        "test_1.jpg": b"page 1",
+        "test_2.jpg": b"page 2",
+        "test_3.jpg": b"page 3"
+    })
+
     a = Archive("test.rar")
 
     results = a.search("test")
@@ -120,3 +123,340 @@ def test_search(rar_archive):
 
     results = a.search("missing")
     assert len(results) == 0
+
+
+def test_stream_zip():
+    with ZipFile("test_dir/test.zip", mode="w") as archive:
+        archive.writestr("dir_1/test_1.jpg", b"page 1")
+        archive.writestr("test_2.jpg", b"page 2")
+
+    a = Archive("test_dir/test.zip")
+    a.stream("new.cbz")
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.namelist() == ["dir_1/test_1.jpg", "test_2.jpg"]
+        assert archive.read("dir_1/test_1.jpg") == b"page 1"
+        assert archive.read("test_2.jpg") == b"page 2"
+
+
+def test_stream_rar(real_rar):
+    path = real_rar("test.cbr", {
+        "dir_1/test_1.jpg": b"page 1",
+        "test_2.jpg": b"page 2"
+    })
+
+    a = Archive(path)
+    a.stream("new.cbz")
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.namelist() == ["dir_1/test_1.jpg", "test_2.jpg"]
+        assert archive.read("dir_1/test_1.jpg") == b"page 1"
+        assert archive.read("test_2.jpg") == b"page 2"
+
+
+def test_stream_error():
+    a = Archive("test_dir/test.zip")
+
+    with pytest.raises(Exception):
+        a.stream("new.cbz")
+
+    assert not os.path.exists("new.cbz")
+
+
+def test_copy():
+    with ZipFile("test_dir/test.zip", "w", compression=ZIP_DEFLATED) as z:
+        z.writestr("dir_1/test_1.jpg", b"page 1" * 100)
+        z.writestr("test_2.jpg", b"page 2" * 100)
+        z.writestr("test.xml", b"info")
+
+    a = Archive("test_dir/test.zip")
+    a.copy("new.cbz", {
+        "Page 1.jpg": "dir_1/test_1.jpg",
+        "Page 2.jpg": "test_2.jpg"
+    })
+
+    with ZipFile("test_dir/test.zip") as source, ZipFile("new.cbz") as target:
+        assert target.namelist() == ["Page 1.jpg", "Page 2.jpg"]
+        assert target.testzip() is None
+
+        old, new = source.getinfo("test_2.jpg"), target.getinfo("Page 2.jpg")
+
+        assert new.compress_type == ZIP_DEFLATED
+        assert new.compress_size == old.compress_size
+        assert new.CRC == old.CRC
+
+        assert target.read("Page 1.jpg") == b"page 1" * 100
+        assert target.read("Page 2.jpg") == b"page 2" * 100
+
+
+def test_copy_unsupported():
+    a = Archive("test.rar")
+
+    with pytest.raises(AttributeError):
+        a.copy("new.cbz", {})
+
+
+def test_stream_members(real_rar):
+    path = real_rar("test.cbr", {
+        "dir_1/": b"",
+        "dir_1/test_1.jpg": b"page 1",
+        "test_2.jpg": b"page 2",
+        "test.xml": b"info"
+    })
+
+    a = Archive(path)
+
+    assert a.namelist() == [
+        "dir_1/", "dir_1/test_1.jpg", "test_2.jpg", "test.xml"
+    ]
+
+    a.stream("new.cbz", {
+        "Page 1.jpg": "dir_1/test_1.jpg",
+        "Page 2.jpg": "test_2.jpg"
+    })
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.namelist() == ["Page 1.jpg", "Page 2.jpg"]
+        assert archive.read("Page 1.jpg") == b"page 1"
+
+
+def test_read(real_rar):
+    path = real_rar("test.cbr", {"test_1.jpg": b"page 1"})
+
+    assert Archive(path).read("test_1.jpg") == b"page 1"
+
+
+def test_extract_members():
+    with ZipFile("test_dir/test.zip", "w") as z:
+        z.writestr("dir_1/test_1.jpg", b"page 1")
+        z.writestr("test_2.jpg", b"page 2")
+
+    a = Archive("test_dir/test.zip")
+    a.extract_members(["dir_1/test_1.jpg"], "output")
+
+    assert os.listdir("output") == ["dir_1"]
+    assert os.listdir("output/dir_1") == ["test_1.jpg"]
+
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(100)
+
+
+def test_compress_policy(fs):
+    fs.create_file("pages/test_1.jpg", contents=JPEG)
+    fs.create_file("pages/test.xml", contents="info " * 100)
+
+    Archive.compress("pages", "new.cbz", exclude_dir=True, policy=Policy())
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.getinfo("test_1.jpg").compress_type == ZIP_STORED
+        assert archive.getinfo("test.xml").compress_type == ZIP_DEFLATED
+
+
+def test_stream_policy(real_rar):
+    path = real_rar("test.cbr", {"test_1.jpg": JPEG, "test.xml": b"info"})
+
+    a = Archive(path)
+    a.stream("new.cbz", policy=Policy(level=9))
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.getinfo("test_1.jpg").compress_type == ZIP_STORED
+        assert archive.getinfo("test.xml").compress_type == ZIP_DEFLATED
+        assert archive.read("test_1.jpg") == JPEG
+
+
+def test_copy_policy():
+    with ZipFile("test_dir/test.zip", "w", compression=ZIP_DEFLATED) as z:
+        z.writestr("test_1.jpg", JPEG)
+        z.writestr("test.xml", b"info " * 100)
+
+    a = Archive("test_dir/test.zip")
+    a.copy("new.cbz", policy=Policy())
+
+    with ZipFile("test_dir/test.zip") as source, ZipFile("new.cbz") as target:
+        assert target.getinfo("test_1.jpg").compress_type == ZIP_STORED
+        assert target.read("test_1.jpg") == JPEG
+
+        old, new = source.getinfo("test.xml"), target.getinfo("test.xml")
+
+        assert new.compress_type == ZIP_DEFLATED
+        assert new.header_offset != old.header_offset
+        assert new.compress_size == old.compress_size
+
+
+def test_compress_threads(fs):
+    for idx in range(10):
+        fs.create_file(f'pages/{idx}/test.xml', contents="info " * idx)
+
+    Archive.compress("pages", "old.cbz", exclude_dir=True)
+    Archive.compress("pages", "new.cbz", exclude_dir=True, threads=4)
+
+    with ZipFile("old.cbz") as old, ZipFile("new.cbz") as new:
+        assert new.testzip() is None
+        assert new.namelist() == old.namelist()
+        assert new.read("9/test.xml") == b"info " * 9
+
+
+def test_stream_threads(real_rar):
+    path = real_rar("test.cbr", {"dir/": b"", "dir/test.xml": b"info"})
+
+    a = Archive(path)
+    a.stream("new.cbz", policy=Policy(), threads=4)
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.namelist() == ["dir/", "dir/test.xml"]
+        assert archive.getinfo("dir/test.xml").compress_type == ZIP_DEFLATED
+        assert archive.read("dir/test.xml") == b"info"
+
+
+def test_verify_zip():
+    with ZipFile("test_dir/test.zip", "w", compression=ZIP_DEFLATED) as z:
+        z.writestr("dir_1/test_1.jpg", b"page 1" * 100)
+        z.writestr("test_2.jpg", b"page 2" * 100)
+
+    assert Archive("test_dir/test.zip").verify() is None
+
+    with open("test_dir/test.zip", "r+b") as f:
+        f.seek(50)
+        f.write(b"\xff" * 4)
+
+    assert Archive("test_dir/test.zip").verify() == "dir_1/test_1.jpg"
+
+
+def test_verify_rar(fs, real_rar):
+    path = real_rar("test.cbr", {
+        "dir_1/test_1.jpg": b"page 1",
+        "test_2.jpg": b"page 2"
+    })
+
+    assert Archive(path).verify() is None
+
+    with Pause(fs), open(path, "r+b") as f:
+        data = f.read()
+
+        f.seek(0)
+        f.write(data.replace(b"page 2", b"page 3"))
+
+    assert Archive(path).verify() == "test_2.jpg"
+
+
+def test_append():
+    with ZipFile("test_dir/test.zip", "w", compression=ZIP_DEFLATED) as z:
+        z.writestr("test_1.jpg", b"page 1" * 100)
+        z.writestr("info.xml", b"info" * 100)
+
+    a = Archive("test_dir/test.zip")
+    a.append("info.xml", b"new info")
+
+    size = os.path.getsize("test_dir/test.zip")
+    a.append("info.xml", b"new info")
+
+    assert os.path.getsize("test_dir/test.zip") == size
+    assert a.wasted() == 0
+
+    with ZipFile("test_dir/test.zip") as z:
+        assert z.namelist() == ["test_1.jpg", "info.xml"]
+        assert z.read("info.xml") == b"new info"
+        assert z.getinfo("info.xml").compress_type == ZIP_DEFLATED
+        assert z.testzip() is None
+
+
+def test_append_wasted():
+    with ZipFile("test_dir/test.zip", "w") as z:
+        z.writestr("info.xml", b"info" * 100)
+        z.writestr("test_1.jpg", b"page 1" * 100)
+
+    a = Archive("test_dir/test.zip")
+    a.append("info.xml", b"new info")
+    a.append("test_2.jpg", b"page 2", Policy(level=0))
+
+    assert a.wasted() > 400
+
+    a.compact()
+
+    assert a.wasted() == 0
+
+    with ZipFile("test_dir/test.zip") as z:
+        assert z.namelist() == ["test_1.jpg", "info.xml", "test_2.jpg"]
+        assert z.read("info.xml") == b"new info"
+        assert z.getinfo("info.xml").compress_type == ZIP_STORED
+
+
+def test_append_unsupported():
+    with pytest.raises(AttributeError):
+        Archive("test.rar").append("info.xml", b"info")
+
+
+@pytest.mark.parametrize("error", [OSError, KeyboardInterrupt])
+def test_stream_rar_writer_error(real_rar, error):
+    path = real_rar("test.cbr", {
+        "test_1.jpg": bytes(16 * 1024 * 1024),
+        "test_2.jpg": b"page 2"
+    })
+
+    written = []
+
+    def write(data: bytes):
+        if written:
+            raise error("write failed")
+
+        written.append(data)
+
+    writer = MagicMock()
+    writer.open.return_value.write.side_effect = write
+
+    with pytest.raises(error):
+        stream_rar(path, writer)
+
+    assert len(written) == 1
+    assert writer.open.call_count == 1
+
+
+def test_stream_rar_names(real_rar):
+    path = real_rar("test.cbr", {
+        b"dir/p\x82ge 1.jpg": b"page 1",
+        "dir/été 2.jpg": b"page 2"
+    })
+
+    names = Archive(path).namelist()
+
+    assert names == [member.name for member in list_rar_library(path)]
+
+    a = Archive(path)
+    a.stream("new.cbz", {"Page 1.jpg": names[0], "Page 2.jpg": names[1]})
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.read("Page 1.jpg") == b"page 1"
+        assert archive.read("Page 2.jpg") == b"page 2"
+
+
+def test_stream_missing_members(real_rar):
+    path = real_rar("test.cbr", {"test_1.jpg": b"page 1"})
+
+    with ZipFile("test_dir/test.zip", mode="w") as archive:
+        archive.writestr("test_1.jpg", b"page 1")
+
+    members = {"Page 1.jpg": "test_1.jpg", "Page 2.jpg": "test_2.jpg"}
+
+    for a in [Archive(path), Archive("test_dir/test.zip")]:
+        with pytest.raises(FileNotFoundError):
+            a.stream("new.cbz", members)
+
+        assert not os.path.exists("new.cbz")
+
+    with pytest.raises(FileNotFoundError):
+        Archive("test_dir/test.zip").copy("new.cbz", members)
+
+
+def test_list_rar_library(real_rar):
+    path = real_rar("test.cbr", {
+        "dir_1/": b"",
+        "dir_1/test_1.jpg": b"page 1",
+        "test_2.jpg": b"page 2"
+    })
+
+    members = list_rar_library(path)
+
+    assert members == Archive(path).members()
+    assert [member.name for member in members] == [
+        "dir_1/", "dir_1/test_1.jpg", "test_2.jpg"
+    ]
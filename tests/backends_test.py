@@ -0,0 +1,106 @@
+import pytest
+
+from unittest.mock import MagicMock, patch
+
+from comics import backends
+from comics.backends import BackendError
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.delenv("COMIC_FMT_BACKEND", raising=False)
+
+    with patch.dict(backends.registry, clear=True):
+        with patch.dict(backends.probes, clear=True):
+            yield backends.registry
+
+
+def names(ext: str, operation: str) -> list[str]:
+    return [backend.name for backend in backends.candidates(ext, operation)]
+
+
+def test_register(registry):
+    backends.register("rar", "extract", "slow", MagicMock(), 1)
+    backends.register("rar", "extract", "fast", MagicMock(), 4)
+    backends.register("rar", "extract", "medium", MagicMock(), 2)
+    backends.register("rar", "extract", "slow", MagicMock(), 3)
+
+    assert names(".cbr", "extract") == ["fast", "slow", "medium"]
+    assert backends.supports(".rar", "extract")
+    assert not backends.supports(".cbz", "extract")
+
+    with pytest.raises(ValueError):
+        backends.register("rar", "delete", "tool", MagicMock())
+
+
+def test_candidates_probe():
+    probe = MagicMock(return_value=False)
+
+    backends.register("rar", "extract", "tool", MagicMock(), 4, probe)
+    backends.register("rar", "extract", "library", MagicMock(), 1)
+
+    assert names(".cbr", "extract") == ["library"]
+    assert names(".rar", "extract") == ["library"]
+
+    probe.assert_called_once()
+
+    with pytest.raises(AttributeError):
+        backends.candidates(".cbr", "write")
+
+
+def test_candidates_override(monkeypatch):
+    backends.register("zip", "read", "library", MagicMock(), 4)
+    backends.register("zip", "read", "tool", MagicMock(), 1)
+    backends.register("zip", "list", "library", MagicMock())
+
+    monkeypatch.setenv("COMIC_FMT_BACKEND", "tool")
+    assert names(".cbz", "read") == ["tool"]
+    assert names(".cbz", "list") == ["library"]
+
+    monkeypatch.setenv("COMIC_FMT_BACKEND", "read=tool")
+    assert names(".cbz", "read") == ["tool"]
+
+    monkeypatch.setenv("COMIC_FMT_BACKEND", "tool, zip.read=library")
+    assert names(".cbz", "read") == ["library"]
+
+    monkeypatch.setenv("COMIC_FMT_BACKEND", "zip.read=missing")
+
+    with pytest.raises(LookupError):
+        backends.candidates(".cbz", "read")
+
+
+def test_candidates_unavailable(monkeypatch):
+    backends.register("rar", "read", "tool", MagicMock(), 1, lambda: False)
+
+    with pytest.raises(LookupError):
+        backends.candidates(".cbr", "read")
+
+
+def test_select():
+    tool = MagicMock()
+
+    backends.register("zip", "write", "tool", tool)
+
+    assert backends.select(".cbz", "write") is tool
+
+
+def test_run():
+    tool = MagicMock(side_effect=BackendError("tool failed"))
+    library = MagicMock(return_value=b"page 1")
+
+    backends.register("rar", "read", "tool", tool, 4)
+    backends.register("rar", "read", "library", library, 1)
+
+    assert backends.run(".cbr", "read", "test.cbr", "test_1.jpg") == b"page 1"
+
+    tool.assert_called_once_with("test.cbr", "test_1.jpg")
+    library.assert_called_once_with("test.cbr", "test_1.jpg")
+
+
+def test_run_error():
+    tool = MagicMock(side_effect=BackendError("tool failed"))
+
+    backends.register("rar", "read", "tool", tool)
+
+    with pytest.raises(BackendError):
+        backends.run(".cbr", "read", "test.cbr", "test_1.jpg")
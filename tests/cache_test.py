@@ -0,0 +1,62 @@
+import os
+import pytest
+
+from unittest.mock import patch
+
+from comics import Archive
+from comics.cache import Cache
+
+
+@pytest.fixture
+def cache(fs, make_zip):
+    make_zip("test_1.cbz", {"Page 1.jpg": b"page 1", "Page 2.jpg": b"2"})
+    make_zip("test_2.cbz", {"Page 1.jpg": b"page 1"})
+
+    with Cache(":memory:", max_size=1024) as cache:
+        yield cache
+
+
+def test_read(cache):
+    archive = Archive("test_1.cbz")
+
+    assert cache.get("test_1.cbz", "Page 1.jpg") is None
+    assert cache.read(archive, "Page 1.jpg") == b"page 1"
+
+    with patch.object(Archive, "read") as read:
+        assert cache.read(archive, "Page 1.jpg") == b"page 1"
+        read.assert_not_called()
+
+
+def test_modified(cache):
+    cache.put("test_1.cbz", "Page 1.jpg", b"page 1")
+
+    os.utime("test_1.cbz", ns=(0, 0))
+
+    assert cache.get("test_1.cbz", "Page 1.jpg") is None
+
+
+def test_content_addressed(cache):
+    cache.put("test_1.cbz", "Page 1.jpg", b"page 1")
+    cache.put("test_2.cbz", "Page 1.jpg", b"page 1")
+
+    assert cache.size() == 6
+
+
+def test_replace(cache):
+    cache.put("test_1.cbz", "Page 1.jpg", b"page 1")
+    cache.put("test_1.cbz", "Page 1.jpg", b"new page 1")
+
+    assert cache.size() == 10
+    assert cache.get("test_1.cbz", "Page 1.jpg") == b"new page 1"
+
+
+def test_evict(cache):
+    cache.put("test_1.cbz", "Page 1.jpg", bytes(400))
+    cache.put("test_1.cbz", "Page 2.jpg", bytes(300) + b"2")
+    cache.get("test_1.cbz", "Page 1.jpg")
+    cache.put("test_2.cbz", "Page 1.jpg", bytes(500) + b"3")
+
+    assert cache.size() <= 1024
+    assert cache.get("test_1.cbz", "Page 1.jpg") == bytes(400)
+    assert cache.get("test_1.cbz", "Page 2.jpg") is None
+    assert cache.get("test_2.cbz", "Page 1.jpg") is not None
@@ -1,10 +1,12 @@
 import os
 import pytest
 
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
 from comics import Comic
+from comics.compression import policies
 
 
 def create_file(path):
@@ -21,7 +23,7 @@ def mock_uncompress(items=None):
     items = items or []
 
     def func(output_path):
-        os.mkdir(output_path)
+        os.makedirs(output_path, exist_ok=True)
 
         for item in items:
             create_file(os.path.join(output_path, item))
@@ -29,6 +31,11 @@ def mock_uncompress(items=None):
     return func
 
 
+def mock_stream(target, **kwargs):
+    with open(target, 'w'):
+        pass
+
+
 @pytest.fixture(autouse=True)
 def setup_file_system(fs):
     fs.create_file("test.cbr")
@@ -41,23 +48,77 @@ def test_edit():
     c.archive = MagicMock()
     c.edit()
 
+    assert c._Comic__edit_mode is True
+    c.archive.namelist.assert_called()
+    c.archive.uncompress.assert_not_called()
+
+
+def test_edit_disk():
+    c = Comic("test.cbz", memory_limit=0)
+
+    c.archive = MagicMock()
+    c.edit()
+
     assert c._Comic__edit_mode is True
     c.archive.uncompress.assert_called()
 
 
 def test_save():
-    c = Comic("test.cbz")
+    c = Comic("test.cbz", memory_limit=0)
 
     c.archive.uncompress = mock_uncompress()
     c.edit()
 
+    temp_dir = c.temp_dir
+
     assert c._Comic__edit_mode is True
-    assert os.path.exists("_temp")
+    assert os.path.exists(temp_dir)
 
     c.save()
 
     assert c._Comic__edit_mode is False
-    assert not os.path.exists("_temp")
+    assert c.temp_dir is None
+    assert not os.path.exists(temp_dir)
+
+
+def test_workspace_root():
+    c = Comic("test.cbz", workspace_root="scratch", memory_limit=0)
+
+    c.archive.uncompress = mock_uncompress()
+    c.edit()
+
+    assert os.path.dirname(c.temp_dir) == "scratch"
+    assert Comic("test.cbr", memory_limit=0).temp_dir is None
+
+
+def test_context_manager_error():
+    c = Comic("test.cbz", memory_limit=0)
+    c.archive.uncompress = mock_uncompress(["test_1.jpg"])
+
+    with pytest.raises(RuntimeError):
+        with c:
+            temp_dir = c.temp_dir
+            raise RuntimeError()
+
+    assert c._Comic__edit_mode is False
+    assert not os.path.exists(temp_dir)
+    assert os.path.exists("test.cbz")
+
+
+def test_save_error():
+    c = Comic("test.cbr", memory_limit=0)
+
+    c.archive.uncompress = mock_uncompress(["test_1.jpg"])
+    c.write("test_2.jpg", b"page 2")
+
+    with patch("comics.Archive.compress", side_effect=OSError()):
+        with pytest.raises(OSError):
+            c.save()
+
+    assert c.temp_dir is None
+    assert os.path.exists("test.cbr")
+    assert os.path.getsize("test.cbz") == 0
+    assert sorted(os.listdir(".")) == ["test.cbr", "test.cbz", "tmp"]
 
 
 def test_rename():
@@ -79,7 +140,7 @@ def test_search():
     c.archive = MagicMock()
     c.search("test")
 
-    c.archive.search.assert_called_with("test")
+    c.archive.search.assert_called_with("test", None)
 
 
 def test_uncompress():
@@ -94,12 +155,16 @@ def test_uncompress():
 def test_convert_cbr():
     c = Comic("test.cbr")
 
-    c.archive.uncompress = mock_uncompress()
+    archive = c.archive
+    archive.stream = mock_stream
+    archive.uncompress = MagicMock()
+
     c.convert()
 
+    archive.uncompress.assert_not_called()
+
     assert os.path.exists("test.cbz")
 
-    assert not os.path.exists("_temp")
     assert not os.path.exists("test.cbr")
 
 
@@ -109,12 +174,31 @@ def test_convert_cbz():
     c.archive.uncompress = mock_uncompress
     c.convert()
 
-    assert not os.path.exists("_temp")
+    assert c.temp_dir is None
     assert os.path.exists("test.cbz")
 
 
+def test_convert_zip():
+    with ZipFile("test.zip", "w", compression=ZIP_DEFLATED) as archive:
+        archive.writestr("test_1.jpg", b"page 1" * 1000)
+
+    with ZipFile("test.zip") as archive:
+        old = archive.getinfo("test_1.jpg")
+
+    Comic("test.zip").convert()
+
+    assert not os.path.exists("test.zip")
+
+    with ZipFile("test.cbz") as archive:
+        new = archive.getinfo("test_1.jpg")
+
+        assert new.compress_type == ZIP_DEFLATED
+        assert new.compress_size == old.compress_size
+        assert archive.read("test_1.jpg") == b"page 1" * 1000
+
+
 def test_flatten():
-    c = Comic("test.cbr")
+    c = Comic("test.cbr", memory_limit=0)
 
     items = ["test_1.jpg", "dir_1/test_2.jpg", "dir_2/test_3.jpg"]
 
@@ -123,22 +207,24 @@ def test_flatten():
 
     assert c._Comic__edit_mode is True
 
+    temp_dir = c.temp_dir
+
     with patch("shutil.rmtree"):
         c.save()
 
     assert os.path.exists("test.cbz")
     assert not os.path.exists("test.cbr")
 
-    assert not os.path.exists("_temp/dir_1")
-    assert not os.path.exists("_temp/dir_2")
+    assert not os.path.exists(f'{temp_dir}/dir_1')
+    assert not os.path.exists(f'{temp_dir}/dir_2')
 
-    assert os.path.exists("_temp/test_1.jpg")
-    assert os.path.exists("_temp/test_2.jpg")
-    assert os.path.exists("_temp/test_3.jpg")
+    assert os.path.exists(f'{temp_dir}/test_1.jpg')
+    assert os.path.exists(f'{temp_dir}/test_2.jpg')
+    assert os.path.exists(f'{temp_dir}/test_3.jpg')
 
 
 def test_format_pages():
-    c = Comic("test.cbr")
+    c = Comic("test.cbr", memory_limit=0)
 
     items = ["test_1.jpg", "test_2.jpg", "test_3.jpg"]
 
@@ -147,60 +233,371 @@ def test_format_pages():
 
     assert c._Comic__edit_mode is True
 
+    temp_dir = c.temp_dir
+
     with patch("shutil.rmtree"):
         c.save()
 
     assert os.path.exists("test.cbz")
     assert not os.path.exists("test.cbr")
 
-    assert os.path.exists("_temp/Page 1.jpg")
-    assert os.path.exists("_temp/Page 2.jpg")
-    assert os.path.exists("_temp/Page 3.jpg")
+    assert os.path.exists(f'{temp_dir}/Page 1.jpg')
+    assert os.path.exists(f'{temp_dir}/Page 2.jpg')
+    assert os.path.exists(f'{temp_dir}/Page 3.jpg')
 
 
-def test_format_pages_recursive():
-    c = Comic("test.cbz")
-
-    items = [
+def test_format_pages_recursive(make_zip):
+    make_zip("test.cbz", [
         "dir_1/test_2.jpg",
         "dir_1/test_4.jpg",
         "dir_2/test_6.jpg",
         "dir_2/test_8.jpg"
-    ]
+    ])
 
-    c.archive.uncompress = mock_uncompress(items)
-    c.format_pages(page_name="Page ", page_regex=r"\d+")
-
-    with patch("shutil.rmtree"):
-        c.save()
+    c = Comic("test.cbz")
 
-    assert os.path.exists("_temp/dir_1/Page 1.jpg")
-    assert os.path.exists("_temp/dir_1/Page 2.jpg")
+    c.format_pages(page_name="Page ", page_regex=r"\d+")
+    c.save()
 
-    assert os.path.exists("_temp/dir_2/Page 1.jpg")
-    assert os.path.exists("_temp/dir_2/Page 2.jpg")
+    assert c.temp_dir is None
 
+    with ZipFile("test.cbz") as archive:
+        assert archive.namelist() == [
+            "dir_1/Page 1.jpg",
+            "dir_1/Page 2.jpg",
+            "dir_2/Page 1.jpg",
+            "dir_2/Page 2.jpg"
+        ]
 
-def test_format_pages_remove():
-    c = Comic("test.cbz")
 
-    items = [
+def test_format_pages_remove(make_zip):
+    make_zip("test.cbz", [
         "test.xml",
         "test_1.jpg",
         "test_2.jpg",
         "test_3.jpg",
         "credits.jpg"
+    ])
+
+    c = Comic("test.cbz")
+
+    c.format_pages(page_name="Page ", page_regex=r"\d+", remove=True)
+    c.save()
+
+    with ZipFile("test.cbz") as archive:
+        assert archive.namelist() == [
+            "Page 1.jpg",
+            "Page 2.jpg",
+            "Page 3.jpg"
+        ]
+
+
+def test_flatten_zip(make_zip):
+    make_zip("test.zip", ["dir_1/", "dir_1/test_1.jpg", "test_2.jpg"])
+
+    c = Comic("test.zip")
+
+    c.flatten()
+    c.format_pages(page_name="Page ", page_regex=r"\d+")
+    c.save()
+
+    assert not os.path.exists("test.zip")
+    assert not os.path.exists("test.cbz.tmp")
+
+    with ZipFile("test.cbz") as archive:
+        assert archive.namelist() == ["Page 1.jpg", "Page 2.jpg"]
+        assert archive.read("Page 1.jpg") == b"dir_1/test_1.jpg"
+        assert archive.read("Page 2.jpg") == b"test_2.jpg"
+
+
+def test_flatten_rar(real_rar):
+    path = real_rar("test.cbr", {
+        "dir_1/": b"",
+        "dir_1/test_1.jpg": b"page 1",
+        "test_2.jpg": b"page 2"
+    })
+
+    c = Comic(path)
+
+    c.flatten()
+    c.format_pages(page_name="Page ", page_regex=r"\d+")
+    c.save()
+
+    assert c.archive.ext == ".cbz"
+    assert not os.path.exists(path)
+
+    with ZipFile(c.archive.path) as archive:
+        assert archive.namelist() == ["Page 1.jpg", "Page 2.jpg"]
+        assert archive.read("Page 1.jpg") == b"page 1"
+
+
+@pytest.mark.parametrize("memory_limit", [0, None])
+def test_search_edit(memory_limit, make_zip):
+    make_zip("test.cbz", ["test_1.jpg", "test_2.jpg"])
+
+    c = Comic("test.cbz", memory_limit=memory_limit)
+
+    c.format_pages(page_name="Page ", page_regex=r"\d+")
+
+    assert c.search("Page") == ["Page 1.jpg", "Page 2.jpg"]
+    assert c.search("test") == []
+
+
+def test_search_spill(make_zip):
+    make_zip("test.cbz", ["dir_1/test_1.jpg", "dir_1/test_2.jpg"])
+
+    c = Comic("test.cbz")
+
+    c.edit()
+    c.spill()
+    c.flatten()
+
+    assert c.search("test") == ["test_1.jpg", "test_2.jpg"]
+    assert c.search("dir_1") == []
+
+
+def test_namelist_edit(make_zip):
+    make_zip("test.cbz", ["dir_1/test_1.jpg", "test_2.jpg", "dir_1/a.jpg"])
+
+    names = []
+
+    for memory_limit in [0, None]:
+        c = Comic("test.cbz", memory_limit=memory_limit)
+        c.edit()
+
+        names.append(c.namelist())
+        c.discard()
+
+    assert names[0] == [
+        "dir_1/", "dir_1/a.jpg", "dir_1/test_1.jpg", "test_2.jpg"
     ]
+    assert names[1] == names[0]
+
+
+def test_read_write(make_zip):
+    make_zip("test.cbz", ["test_1.jpg"])
+
+    c = Comic("test.cbz")
+
+    assert c.read("test_1.jpg") == b"test_1.jpg"
+
+    c.write("ComicInfo.xml", b"<ComicInfo/>")
+
+    assert c.read("ComicInfo.xml") == b"<ComicInfo/>"
+    assert c.workspace.path is None
+
+    c.save()
+
+    with ZipFile("test.cbz") as archive:
+        assert archive.namelist() == ["test_1.jpg", "ComicInfo.xml"]
+        assert archive.read("ComicInfo.xml") == b"<ComicInfo/>"
+
+
+def test_spill(make_zip):
+    make_zip("test.cbz", ["dir_1/test_1.jpg", "test_2.jpg"])
+
+    c = Comic("test.cbz")
+
+    c.flatten()
+    c.write("test.xml", b"info")
+
+    assert c.workspace.path is None
+
+    temp_dir = c.temp_dir
+
+    assert sorted(os.listdir(temp_dir)) == [
+        "test.xml", "test_1.jpg", "test_2.jpg"
+    ]
+
+    c.save()
+
+    with ZipFile("test.cbz") as archive:
+        assert sorted(archive.namelist()) == [
+            "test.xml", "test_1.jpg", "test_2.jpg"
+        ]
+
+
+def test_spill_memory_limit(make_zip):
+    make_zip("test.cbz", ["test_1.jpg"])
+
+    c = Comic("test.cbz", memory_limit=8)
+
+    c.write("test_2.jpg", b"1234")
+
+    assert c.workspace.path is None
+
+    c.write("test_3.jpg", b"12345")
+
+    assert c.workspace.path is not None
+    assert c.read("test_3.jpg") == b"12345"
+
+
+def test_save_policy(make_zip):
+    make_zip("test.cbz", ["test_1.jpg"])
+
+    c = Comic("test.cbz")
+
+    c.write("test.xml", b"info " * 100)
+    c.save(policy=policies["fast"])
+
+    with ZipFile("test.cbz") as archive:
+        assert archive.getinfo("test_1.jpg").compress_type == ZIP_DEFLATED
+        assert archive.getinfo("test.xml").compress_type == ZIP_DEFLATED
+
+    c.write("test_2.jpg", b"\xff\xd8\xff\xe0" + bytes(100))
+    c.save(policy=policies["store"])
+
+    with ZipFile("test.cbz") as archive:
+        for info in archive.infolist():
+            assert info.compress_type == ZIP_STORED
+
+
+def test_format_pages_collision():
+    c = Comic("test.cbr", memory_limit=0)
+
+    items = ["Page 0.jpg", "Page 1.jpg"]
 
     c.archive.uncompress = mock_uncompress(items)
-    c.format_pages(page_name="Page ", page_regex=r"\d+", remove=True)
+    c.format_pages(page_name="Page ", page_regex=r"\d+")
 
-    with patch("shutil.rmtree"):
+    assert c.namelist() == ["Page 1.jpg", "Page 2.jpg"]
+
+
+def test_save_unmodified(make_zip):
+    make_zip("test.cbz", ["test_1.jpg", "test_2.jpg"])
+
+    c = Comic("test.cbz")
+    c.format_pages(page_name="test_", page_regex=r"\d+")
+
+    assert not c.modified
+
+    with patch("comics.tree.Tree.save") as save:
         c.save()
+        save.assert_not_called()
+
+    assert c._Comic__edit_mode is False
+
+
+def test_save_unmodified_zip(make_zip):
+    make_zip("test.zip", ["test_1.jpg"])
+
+    c = Comic("test.zip")
+    c.flatten()
+    c.save()
+
+    assert c.archive.path == "test.cbz"
+    assert not os.path.exists("test.zip")
+
+    with ZipFile("test.cbz") as archive:
+        assert archive.namelist() == ["test_1.jpg"]
+
+
+def test_save_modified(make_zip):
+    make_zip("test.cbz", ["test_1.jpg", "test_2.jpg"])
+
+    c = Comic("test.cbz")
+    c.format_pages(page_name="Page ", page_regex=r"\d+")
+
+    assert c.modified
+
+    c.save()
+
+    assert not c.modified
+
+    with ZipFile("test.cbz") as archive:
+        assert archive.namelist() == ["Page 1.jpg", "Page 2.jpg"]
+
+
+def test_temp_dir_modified():
+    c = Comic("test.cbr", memory_limit=0)
+
+    c.archive.uncompress = mock_uncompress(["test_1.jpg"])
+    c.edit()
+
+    assert not c.modified
+    assert c.namelist() == ["test_1.jpg"]
+    assert not c.modified
+
+    c.temp_dir
+
+    assert c.modified
+
+
+def test_save_reuse(make_zip):
+    make_zip("test.cbz", ["test_1.xml", "test_2.xml"])
+
+    c = Comic("test.cbz", memory_limit=0)
+    c.format_pages(page_name="Page ", page_regex=r"\d+")
+    c.write("Page 2.xml", b"page 2")
+    c.save()
+
+    with ZipFile("test.cbz") as archive:
+        assert archive.namelist() == ["Page 1.xml", "Page 2.xml"]
+        assert archive.read("Page 1.xml") == b"test_1.xml"
+
+        assert archive.getinfo("Page 1.xml").compress_type == ZIP_DEFLATED
+        assert archive.getinfo("Page 2.xml").compress_type == ZIP_STORED
+
+
+def test_read_metadata():
+    with ZipFile("test.cbz", "w") as archive:
+        archive.writestr("test_1.jpg", b"page 1")
+        archive.writestr("ComicInfo.xml", b"<ComicInfo><Title>Title</Title>"
+                                          b"</ComicInfo>")
+
+    assert Comic("test.cbz").read_metadata() == {"Title": "Title"}
+
+    with ZipFile("empty.cbz", "w") as archive:
+        archive.writestr("test_1.jpg", b"page 1")
+
+    assert Comic("empty.cbz").read_metadata() == {}
+
+
+def test_update_metadata():
+    with ZipFile("test.cbz", "w") as archive:
+        archive.writestr("test_1.jpg", b"page 1")
+
+    c = Comic("test.cbz")
+
+    with patch.object(c.archive, "compact") as compact:
+        c.update_metadata({"Title": "Title"})
+        c.update_metadata({"Series": "Series"})
+
+    compact.assert_not_called()
+
+    assert c.read_metadata() == {"Title": "Title", "Series": "Series"}
+
+    with ZipFile("test.cbz") as archive:
+        assert archive.namelist() == ["test_1.jpg", "ComicInfo.xml"]
+
+    mtime = os.path.getmtime("test.cbz")
+    c.update_metadata({"Title": "Title"})
+
+    assert os.path.getmtime("test.cbz") == mtime
+
+
+def test_update_metadata_compact():
+    with ZipFile("test.cbz", "w") as archive:
+        archive.writestr("ComicInfo.xml", b"<ComicInfo><Title>Title</Title>"
+                                          b"</ComicInfo>")
+        archive.writestr("test_1.jpg", b"page 1")
+
+    c = Comic("test.cbz")
+    c.update_metadata({"Title": "New Title"}, threshold=0.1)
+
+    assert c.archive.wasted() == 0
+    assert c.read_metadata() == {"Title": "New Title"}
+
+
+def test_update_metadata_edit():
+    with ZipFile("test.cbz", "w") as archive:
+        archive.writestr("test_1.jpg", b"page 1")
+
+    with Comic("test.cbz") as c:
+        c.format_pages("Page ", r"\d+")
+        c.update_metadata({"Title": "Title"})
 
-    assert not os.path.exists("_temp/test.xml")
-    assert not os.path.exists("_temp/credits.jpg")
+        assert c.read_metadata() == {"Title": "Title"}
 
-    assert os.path.exists("_temp/Page 1.jpg")
-    assert os.path.exists("_temp/Page 2.jpg")
-    assert os.path.exists("_temp/Page 3.jpg")
+    with ZipFile("test.cbz") as archive:
+        assert sorted(archive.namelist()) == ["ComicInfo.xml", "Page 1.jpg"]
@@ -0,0 +1,51 @@
+from zipfile import ZIP_DEFLATED, ZIP_STORED
+
+from comics import compression
+from comics.compression import Policy
+
+
+def test_is_compressed():
+    headers = [
+        b"\xff\xd8\xff\xe0\x00\x10JFIF",
+        b"\x89PNG\r\n\x1a\n\x00\x00",
+        b"RIFF\x00\x00\x00\x00WEBPVP8 ",
+        b"GIF89a\x01\x00",
+        b"\x00\x00\x00\x1cftypavif"
+    ]
+
+    for header in headers:
+        assert compression.is_compressed(header)
+
+    assert not compression.is_compressed(b"<?xml version=")
+    assert not compression.is_compressed(b"")
+
+
+def test_select():
+    p = Policy(level=3)
+
+    assert p.select(b"\xff\xd8\xff\xe0") == (ZIP_STORED, None)
+    assert p.select(b"<?xml version=") == (ZIP_DEFLATED, 3)
+
+
+def test_select_store():
+    p = Policy(level=0)
+
+    assert p.select(b"<?xml version=") == (ZIP_STORED, None)
+
+
+def test_select_no_detect():
+    p = Policy(level=9, detect=False)
+
+    assert p.select(b"\xff\xd8\xff\xe0") == (ZIP_DEFLATED, 9)
+
+
+def test_get_policy():
+    assert compression.get_policy() is None
+    assert compression.get_policy("fast") is compression.policies["fast"]
+
+    p = compression.get_policy("max", 5)
+
+    assert p.level == 5
+    assert p.detect is False
+
+    assert compression.get_policy(level=2).level == 2
@@ -0,0 +1,186 @@
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+import pytest
+
+from unittest.mock import patch
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from pyfakefs.fake_filesystem_unittest import Pause
+
+from comics import backends
+
+
+def rar_header(htype: int, flags: int, body: bytes) -> bytes:
+    data = struct.pack("<BHH", htype, flags, 7 + len(body)) + body
+    return struct.pack("<H", zlib.crc32(data) & 0xffff) + data
+
+
+def encode_unicode_name(name: str) -> bytes:
+    std = name.encode("ascii", "replace")
+    enc = b"\x00"
+
+    for idx in range(0, len(name), 4):
+        chars = name[idx:idx + 4]
+        enc += bytes([0xaa])
+
+        for char in chars:
+            enc += struct.pack("<H", ord(char))
+
+    return std + b"\x00" + enc
+
+
+def create_rar(
+    path: str,
+    items: dict,
+    main_flags: int = 0,
+    file_flags: int = 0
+):
+    data = b"Rar!\x1a\x07\x00" + rar_header(0x73, main_flags, bytes(6))
+
+    for name, content in items.items():
+        flags, attr = 0x8000 | file_flags, 0x20
+        raw = name if isinstance(name, bytes) else None
+
+        if raw is not None:
+            name = name.decode("latin-1")
+
+        if name.endswith("/"):
+            flags, attr = flags | 0xe0, 0x10
+
+        name = name.rstrip("/").replace("/", "\\")
+
+        if raw is not None:
+            name = name.encode("latin-1")
+        elif name.isascii():
+            name = name.encode()
+        else:
+            flags, name = flags | 0x200, encode_unicode_name(name)
+
+        body = struct.pack(
+            "<IIBIIBBHI",
+            len(content),
+            len(content),
+            2,
+            zlib.crc32(content),
+            0x50210000,
+            20,
+            0x30,
+            len(name),
+            attr
+        )
+
+        data += rar_header(0x74, flags, body + name) + content
+
+    data += rar_header(0x7b, 0x4000, b"")
+
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def vint(value: int) -> bytes:
+    data = b""
+
+    while value > 0x7f:
+        data += bytes([value & 0x7f | 0x80])
+        value >>= 7
+
+    return data + bytes([value])
+
+
+def rar5_header(
+    htype: int,
+    body: bytes,
+    extra: bytes = b"",
+    data_size: int = None
+) -> bytes:
+    flags = (0x01 if extra else 0) | (0x02 if data_size is not None else 0)
+    fields = vint(htype) + vint(flags)
+
+    if extra:
+        fields += vint(len(extra))
+
+    if data_size is not None:
+        fields += vint(data_size)
+
+    data = vint(len(fields + body + extra)) + fields + body + extra
+    return struct.pack("<I", zlib.crc32(data)) + data
+
+
+def create_rar5(path: str, items: dict, solid: bool = False):
+    data = b"Rar!\x1a\x07\x01\x00"
+    data += rar5_header(1, vint(0x04 if solid else 0))
+
+    for name, content in items.items():
+        name = name.rstrip("/").encode()
+
+        if content is None:
+            body = vint(0x01) + vint(0) + vint(0o40755)
+            body += vint(0) + vint(1) + vint(len(name)) + name
+            data += rar5_header(2, body)
+            continue
+
+        body = vint(0x04) + vint(len(content)) + vint(0o100644)
+        body += struct.pack("<I", zlib.crc32(content))
+        body += vint(0) + vint(1) + vint(len(name)) + name
+
+        data += rar5_header(2, body, data_size=len(content)) + content
+
+    data += rar5_header(5, vint(0))
+
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def create_zip(path: str, items):
+    if not isinstance(items, dict):
+        items = {name: name for name in items}
+
+    with ZipFile(path, "w", compression=ZIP_DEFLATED) as archive:
+        for name, data in items.items():
+            archive.writestr(name, data)
+
+
+@pytest.fixture(autouse=True)
+def builtin_backends():
+    external = {"unrar": False, "bsdtar": False, "7z": False}
+
+    with patch.dict(backends.probes, external):
+        yield
+
+
+@pytest.fixture
+def make_zip():
+    return create_zip
+
+
+@pytest.fixture
+def make_rar():
+    return create_rar
+
+
+@pytest.fixture
+def make_rar5():
+    return create_rar5
+
+
+@pytest.fixture
+def real_rar(fs):
+    with Pause(fs):
+        tmp = tempfile.mkdtemp()
+
+    def create(filename: str, items: dict) -> str:
+        path = os.path.join(tmp, filename)
+
+        with Pause(fs):
+            create_rar(path, items)
+
+        fs.add_real_file(path, read_only=False)
+        return path
+
+    yield create
+
+    with Pause(fs):
+        shutil.rmtree(tmp)
@@ -0,0 +1,79 @@
+from comics import dupes
+from comics.archive import Member
+
+
+def book(*pages: int, prefix: str = "Page ") -> dict:
+    members = [Member("pages/", 0, 0)]
+
+    for idx, page in enumerate(pages):
+        members.append(Member(f'{prefix}{idx}.jpg', 100 + page, page))
+
+    return dupes.signatures(members)
+
+
+def test_signatures():
+    members = [
+        Member("pages/", 0, 0),
+        Member("pages/Page 1.jpg", 100, 1),
+        Member("pages/Copy 1.jpg", 100, 1),
+        Member("pages/blank.jpg", 0, 0)
+    ]
+
+    assert dupes.signatures(members) == {
+        (1, 100): ["pages/Page 1.jpg", "pages/Copy 1.jpg"]
+    }
+
+
+def test_exact():
+    listings = {
+        "test_1.cbz": book(1, 2, 3),
+        "test_2.cbr": book(3, 2, 1, prefix="Other "),
+        "test_3.cbz": book(1, 2, 4),
+        "empty.cbz": dupes.signatures([Member("pages/", 0, 0)]),
+        "empty.cbr": dupes.signatures([Member("info.xml", 0, 0)])
+    }
+
+    assert dupes.exact(listings) == [["test_1.cbz", "test_2.cbr"]]
+
+
+def test_exact_repeated_pages():
+    listings = {
+        "test_1.cbz": book(1, 1, 2),
+        "test_2.cbz": book(1, 2, 2)
+    }
+
+    assert dupes.exact(listings) == []
+
+
+def test_similar():
+    listings = {
+        "test_1.cbz": book(*range(10)),
+        "test_2.cbz": book(*range(10)),
+        "test_3.cbz": book(*range(1, 10)),
+        "test_4.cbz": book(*range(5, 15)),
+        "test_5.cbz": book(*range(20, 30))
+    }
+
+    assert dupes.similar(listings) == [("test_1.cbz", "test_3.cbz", 1.0)]
+    assert dupes.similar(listings, threshold=0.5) == [
+        ("test_1.cbz", "test_3.cbz", 1.0),
+        ("test_1.cbz", "test_4.cbz", 0.5),
+        ("test_3.cbz", "test_4.cbz", 5 / 9)
+    ]
+
+
+def test_similar_common():
+    listings = {
+        f'test_{idx}.cbz': book(0, idx * 10, idx * 10 + 1)
+        for idx in range(1, 5)
+    }
+
+    assert len(dupes.similar(listings, threshold=0.3)) == 6
+    assert dupes.similar(listings, threshold=0.3, common=3) == []
+
+
+def test_duplicate_pages():
+    assert dupes.duplicate_pages(book(1, 2, 1, 3, 2)) == [
+        ["Page 0.jpg", "Page 2.jpg"],
+        ["Page 1.jpg", "Page 4.jpg"]
+    ]
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import pytest
+
+from cli.entry import commands, entry
+
+
+SCRIPT = '''
+import sys
+from cli.entry import entry
+
+try:
+    entry(sys.argv[1:])
+except SystemExit:
+    pass
+
+sys.stderr.write("\\n".join(sys.modules))
+'''
+
+
+def imported_modules(*args: str) -> set[str]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+    process = subprocess.run(
+        [sys.executable, "-c", SCRIPT, *args],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True
+    )
+
+    return set(process.stderr.splitlines())
+
+
+def test_help_imports():
+    modules = imported_modules("--help")
+
+    assert not {name for name in modules if name.startswith("cli.commands")}
+    assert not {name for name in modules if name.startswith("comics.")}
+    assert "unrar" not in modules
+    assert "zipfile" not in modules
+    assert "sqlite3" not in modules
+
+
+def test_command_imports():
+    modules = imported_modules("search", "--help")
+
+    assert "cli.commands.search" in modules
+    assert "cli.commands.cbz" not in modules
+    assert "unrar" not in modules
+    assert "concurrent.futures" not in modules
+    assert "multiprocessing" not in modules
+
+
+@pytest.mark.parametrize("name", list(commands))
+def test_short_help(name):
+    command = entry.get_command(None, name)
+
+    assert command.get_short_help_str() == commands[name][1]
@@ -0,0 +1,50 @@
+import os
+import zlib
+
+from comics.archive import Member
+from comics.fingerprint import Fingerprints
+
+
+MEMBERS = [
+    Member("dir_1/", 0, 0),
+    Member("dir_1/test_1.jpg", 6, zlib.crc32(b"page 1")),
+    Member("test_2.jpg", 6, zlib.crc32(b"page 2"))
+]
+
+
+def test_match(fs):
+    fs.create_file("comic/dir_1/test_1.jpg", contents="page 1")
+    fs.create_file("comic/test_2.jpg", contents="page 2")
+
+    f = Fingerprints()
+    f.record("comic", {"dir_1/test_1.jpg": "dir_1/test_1.jpg"})
+
+    os.rename("comic/dir_1/test_1.jpg", "comic/Page 1.jpg")
+
+    assert f.match("comic", MEMBERS) == {
+        "Page 1.jpg": "dir_1/test_1.jpg",
+        "test_2.jpg": "test_2.jpg"
+    }
+
+
+def test_match_modified(fs):
+    fs.create_file("comic/test_2.jpg", contents="page 2")
+
+    f = Fingerprints()
+    f.record("comic", {"test_2.jpg": "test_2.jpg"})
+
+    with open("comic/test_2.jpg", "w") as page:
+        page.write("page 3")
+
+    assert f.match("comic", MEMBERS) == {}
+
+
+def test_forget(fs):
+    fs.create_file("comic/test_1.jpg", contents="page 1")
+
+    f = Fingerprints()
+    f.record("comic", {"test_1.jpg": "dir_1/test_1.jpg"})
+    f.forget("comic/test_1.jpg")
+
+    assert f.files == {}
+    assert f.match("comic", MEMBERS) == {"test_1.jpg": "dir_1/test_1.jpg"}
@@ -1,6 +1,9 @@
 import pytest
 
+from unittest.mock import MagicMock, patch
+
 from comics import handler
+from comics.backends import Backend
 
 
 def test_file_not_found():
@@ -17,3 +20,41 @@ def test_unsupported_extension():
 
     with pytest.raises(AttributeError):
         handler.unsupported_extension(".jpg", supported)
+
+
+def test_unsupported_operation():
+    registry = {("zip", "write"): [Backend("mock", MagicMock())]}
+
+    with patch.dict("comics.backends.registry", registry, clear=True):
+        handler.unsupported_operation(".cbz", "write")
+
+        with pytest.raises(AttributeError):
+            handler.unsupported_operation(".cbr", "write")
+
+
+def test_duplicate_names():
+    handler.duplicate_names(["test_1.jpg", "test_2.jpg", None, None])
+
+    with pytest.raises(FileExistsError):
+        handler.duplicate_names(["test_1.jpg", "test_1.jpg"])
+
+
+def test_page_not_found():
+    handler.page_not_found("Page 1.jpg", "test.cbz")
+
+    with pytest.raises(FileNotFoundError):
+        handler.page_not_found(None, "test.cbz")
+
+
+def test_corrupt_member():
+    handler.corrupt_member(None)
+
+    with pytest.raises(ValueError):
+        handler.corrupt_member("Page 1.jpg")
+
+
+def test_members_not_found():
+    handler.members_not_found(set(), "test.cbz")
+
+    with pytest.raises(FileNotFoundError):
+        handler.members_not_found({"Page 1.jpg"}, "test.cbz")
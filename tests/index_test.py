@@ -0,0 +1,88 @@
+import os
+import zlib
+import pytest
+
+from unittest.mock import patch
+
+from comics import Archive
+from comics.archive import Member
+from comics.index import Index
+
+
+@pytest.fixture
+def index(fs, make_zip):
+    make_zip("test_1.cbz", {"Page 1.jpg": b"page 1", "info.xml": b""})
+    make_zip("test_2.cbz", {"Page 1.jpg": b"page 1"})
+
+    with Index(":memory:") as index:
+        yield index
+
+
+def test_stale(index):
+    paths = ["test_1.cbz", "test_2.cbz"]
+
+    assert index.stale(paths) == paths
+
+    index.refresh(paths)
+    assert index.stale(paths) == []
+
+    os.utime("test_2.cbz", ns=(0, 0))
+    assert index.stale(paths) == ["test_2.cbz"]
+
+    assert index.stale(["missing.cbz"]) == ["missing.cbz"]
+
+
+def test_members(index):
+    assert index.members("test_1.cbz") == [
+        Member("Page 1.jpg", 6, zlib.crc32(b"page 1")),
+        Member("info.xml", 0, 0)
+    ]
+
+
+def test_listings(index):
+    listings = index.listings(["test_2.cbz", "test_1.cbz"])
+
+    assert list(listings) == ["test_2.cbz", "test_1.cbz"]
+    assert listings["test_1.cbz"] == index.members("test_1.cbz")
+    assert listings["test_2.cbz"] == [
+        Member("Page 1.jpg", 6, zlib.crc32(b"page 1"))
+    ]
+
+
+def test_search(index):
+    results = index.search(["test_2.cbz", "test_1.cbz"], "Page")
+
+    assert list(results) == ["test_2.cbz", "test_1.cbz"]
+    assert results["test_1.cbz"] == ["Page 1.jpg"]
+
+    assert index.search(["test_1.cbz"], "missing") == {}
+    assert index.search(["test_1.cbz"], "") == {}
+
+
+def test_search_cached(index):
+    index.refresh(["test_1.cbz"])
+
+    with patch.object(Archive, "members") as members:
+        assert index.search(["test_1.cbz"], "info") == {
+            "test_1.cbz": ["info.xml"]
+        }
+        members.assert_not_called()
+
+
+def test_search_modified(index, make_zip):
+    index.refresh(["test_1.cbz"])
+
+    make_zip("test_1.cbz", {"cover.jpg": b"cover"})
+    os.utime("test_1.cbz", ns=(0, 0))
+
+    assert index.search(["test_1.cbz"], "Page") == {}
+    assert index.search(["test_1.cbz"], "cover") == {
+        "test_1.cbz": ["cover.jpg"]
+    }
+
+
+def test_archive_search(index):
+    a = Archive("test_1.cbz")
+
+    assert a.search("info", index) == ["info.xml"]
+    assert a.search("missing", index) == []
@@ -0,0 +1,144 @@
+import os
+import socket
+import subprocess
+import sys
+import pytest
+
+from comics.journal import Journal, is_alive
+
+
+@pytest.fixture
+def abandoned(monkeypatch):
+    monkeypatch.setattr("comics.journal.is_alive", lambda host, pid: False)
+
+
+@pytest.fixture
+def journal(fs):
+    fs.create_file("test.cbr", contents="rar")
+    fs.create_file("test.cbz", contents="zip")
+
+    with Journal(":memory:", run="test") as journal:
+        yield journal
+
+
+def test_completed(journal):
+    assert not journal.completed("test.cbz")
+
+    journal.start("test.cbz")
+    assert not journal.completed("test.cbz")
+
+    with open("test.cbz", "w") as f:
+        f.write("new zip")
+
+    journal.finish("test.cbz")
+    assert journal.completed("test.cbz")
+
+    os.utime("test.cbz", ns=(0, 0))
+    assert not journal.completed("test.cbz")
+
+
+def test_completed_run(journal):
+    journal.start("test.cbz")
+    journal.finish("test.cbz")
+
+    journal.run = "other"
+    assert not journal.completed("test.cbz")
+
+
+def test_finish_target(journal):
+    os.remove("test.cbz")
+
+    journal.start("test.cbr", "test.cbz")
+    os.rename("test.cbr", "test.cbz")
+    journal.finish("test.cbr")
+
+    assert journal.completed("test.cbz")
+
+
+def test_finish_error(journal):
+    journal.start("test.cbz")
+    journal.finish("test.cbz", "error")
+
+    assert not journal.completed("test.cbz")
+
+
+def test_reset(journal):
+    journal.start("test.cbz")
+    journal.finish("test.cbz")
+    journal.reset()
+
+    assert not journal.completed("test.cbz")
+
+
+def test_recover_staged(fs, journal, abandoned):
+    fs.create_file(".test.abcd1234.cbz")
+    fs.create_file(".test.backup.cbz")
+
+    journal.start("test.cbz")
+
+    assert journal.recover() == []
+    assert not os.path.exists(".test.abcd1234.cbz")
+    assert os.path.exists(".test.backup.cbz")
+    assert os.path.exists("test.cbz")
+
+    assert journal.recover() == []
+
+
+def test_recover_replaced(journal, abandoned):
+    os.remove("test.cbz")
+
+    journal.start("test.cbr", "test.cbz")
+
+    with open("test.cbz", "w") as f:
+        f.write("new zip")
+
+    assert journal.recover() == [os.path.abspath("test.cbr")]
+    assert not os.path.exists("test.cbr")
+    assert journal.completed("test.cbz")
+
+
+def test_recover_unchanged_target(journal, abandoned):
+    journal.start("test.cbr", "test.cbz")
+
+    assert journal.recover() == []
+    assert os.path.exists("test.cbr")
+    assert not journal.completed("test.cbz")
+
+
+def test_recover_concurrent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    for name in ["test.cbr", "test.cbz", ".test.abcd1234.cbz"]:
+        (tmp_path / name).write_text(name)
+
+    path = str(tmp_path / "journal.db")
+
+    first, second = Journal(path, run="first"), Journal(path, run="second")
+
+    with first, second:
+        first.start("test.cbr", "test.cbz")
+        (tmp_path / "test.cbz").write_text("new zip")
+
+        assert second.recover() == []
+        assert os.path.exists(".test.abcd1234.cbz")
+        assert os.path.exists("test.cbr")
+
+        monkeypatch.setattr("comics.journal.is_alive", lambda host, pid: False)
+
+        assert second.recover() == [os.path.abspath("test.cbr")]
+        assert not os.path.exists(".test.abcd1234.cbz")
+        assert not os.path.exists("test.cbr")
+
+
+def test_is_alive():
+    assert is_alive(socket.gethostname(), os.getpid())
+    assert is_alive("other", 1)
+    assert not is_alive(None, None)
+
+    process = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        stdout=subprocess.PIPE,
+        check=True
+    )
+
+    assert not is_alive(socket.gethostname(), int(process.stdout))
@@ -0,0 +1,54 @@
+from comics import metadata
+
+
+INFO = (
+    b"<?xml version='1.0' encoding='utf-8'?>\n"
+    b"<ComicInfo>"
+    b"<Title>Title</Title>"
+    b"<Year>2001</Year>"
+    b"<Pages><Page Image=\"0\" Type=\"FrontCover\" /></Pages>"
+    b"</ComicInfo>"
+)
+
+
+def test_find():
+    assert metadata.find(["Page 1.jpg", "ComicInfo.xml"]) == "ComicInfo.xml"
+    assert metadata.find(["dir/comicinfo.xml"]) == "dir/comicinfo.xml"
+    assert metadata.find(["dir/ComicInfo.xml", "ComicInfo.xml"]) == (
+        "ComicInfo.xml"
+    )
+    assert metadata.find(["Page 1.jpg", "info.xml"]) is None
+
+
+def test_parse():
+    assert metadata.parse(INFO) == {"Title": "Title", "Year": "2001"}
+
+
+def test_update():
+    data = metadata.update(INFO, {
+        "Title": "New Title",
+        "Series": "Series",
+        "Writer": "Writer",
+        "Year": ""
+    })
+
+    assert metadata.parse(data) == {
+        "Title": "New Title",
+        "Series": "Series",
+        "Writer": "Writer"
+    }
+    assert b"<Page Image=\"0\" Type=\"FrontCover\" />" in data
+    assert data.index(b"<Writer>") < data.index(b"<Pages>")
+
+
+def test_update_new():
+    data = metadata.update(None, {"Number": "1", "Title": "Title"})
+
+    assert data.startswith(b"<?xml")
+    assert list(metadata.parse(data)) == ["Title", "Number"]
+
+
+def test_update_unknown_field():
+    data = metadata.update(INFO, {"Custom": "value"})
+
+    assert data.index(b"<Pages>") < data.index(b"<Custom>")
@@ -0,0 +1,68 @@
+import os
+import pytest
+
+from click.testing import CliRunner
+from zipfile import ZipFile
+
+from cli.commands.pages import format_comic, plan_job
+from cli.entry import entry
+
+
+def plan_unchanged(path: str):
+    assert plan_job(path, None, r"\d+", True, False, None) is None
+
+
+def format_unchanged(path: str):
+    format_comic(path, None, r"\d+", True, False, None, 1)
+
+
+@pytest.mark.parametrize("process", [plan_unchanged, format_unchanged])
+def test_unchanged_zip(fs, process):
+    with ZipFile("test.zip", "w") as archive:
+        archive.writestr("test_1.jpg", b"page 1")
+
+    process("test.zip")
+
+    assert not os.path.exists("test.zip")
+
+    with ZipFile("test.cbz") as archive:
+        assert archive.read("test_1.jpg") == b"page 1"
+
+
+def run_pages(dirname, jobs: int, *args: str) -> dict:
+    result = CliRunner().invoke(
+        entry,
+        ["pages", "--jobs", str(jobs), *args, str(dirname)]
+    )
+
+    assert result.exit_code == 0, result.output
+
+    outputs = {}
+
+    for filename in sorted(os.listdir(dirname)):
+        with ZipFile(dirname / filename) as archive:
+            outputs[filename] = [
+                (info.filename, info.compress_type, info.compress_size)
+                for info in archive.infolist()
+            ]
+
+    return outputs
+
+
+@pytest.mark.parametrize("args", [[], ["--compression", "max"]])
+def test_jobs(tmp_path, make_rar, args):
+    outputs = []
+
+    for jobs in [1, 2]:
+        dirname = tmp_path / str(jobs)
+        dirname.mkdir()
+
+        with ZipFile(dirname / "test_1.zip", "w") as archive:
+            archive.writestr("test_1.jpg", b"page 1" * 1000)
+
+        make_rar(str(dirname / "test_2.cbr"), {"test_1.jpg": b"page 1"})
+
+        outputs.append(run_pages(dirname, jobs, *args))
+
+    assert list(outputs[0]) == ["test_1.cbz", "test_2.cbz"]
+    assert outputs[0] == outputs[1]
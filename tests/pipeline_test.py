@@ -0,0 +1,172 @@
+import os
+import pytest
+import threading
+
+from zipfile import ZipFile
+
+from comics import utils
+from comics.compression import Policy
+from comics.pipeline import Aborted, Buffer, Job, Pipeline
+
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(100)
+
+
+def plan(path: str) -> Job:
+    return Job(path, utils.change_file_extension(path, ".cbz"))
+
+
+def tasks(paths: list[str]):
+    for path in paths:
+        yield path, {}
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_run(fs, threads, make_zip):
+    for idx in range(5):
+        make_zip(f'test_{idx}.zip', {
+            "dir_1/": b"",
+            "dir_1/test_1.jpg": JPEG * idx,
+            "test.xml": b"info " * 100
+        })
+
+    paths = [f'test_{idx}.zip' for idx in range(5)]
+
+    pipeline = Pipeline(Policy(), threads, buffer_size=64)
+    results = list(pipeline.run(plan, tasks(paths)))
+
+    assert [result.path for result in results] == paths
+    assert all(result.error is None for result in results)
+
+    for idx, path in enumerate(paths):
+        assert not os.path.exists(path)
+
+        with ZipFile(f'test_{idx}.cbz') as archive:
+            assert archive.testzip() is None
+            assert archive.namelist() == [
+                "dir_1/", "dir_1/test_1.jpg", "test.xml"
+            ]
+            assert archive.read("dir_1/test_1.jpg") == JPEG * idx
+
+
+def test_run_members(fs, make_zip):
+    make_zip("test.cbz", {"dir_1/test_1.jpg": JPEG, "test.xml": b"info"})
+
+    def rename(path: str) -> Job:
+        return Job(path, path, {"Page 1.jpg": "dir_1/test_1.jpg"})
+
+    results = list(Pipeline().run(rename, tasks(["test.cbz"])))
+
+    assert results[0].error is None
+
+    with ZipFile("test.cbz") as archive:
+        assert archive.namelist() == ["Page 1.jpg"]
+        assert archive.read("Page 1.jpg") == JPEG
+
+
+def test_run_rar(real_rar):
+    path = real_rar("test.cbr", {
+        "dir_1/test_1.jpg": b"page 1",
+        "test_2.jpg": b"page 2"
+    })
+
+    results = list(Pipeline(buffer_size=1).run(plan, tasks([path])))
+
+    assert results[0].error is None
+    assert not os.path.exists(path)
+
+    with ZipFile(utils.change_file_extension(path, ".cbz")) as archive:
+        assert archive.namelist() == ["dir_1/test_1.jpg", "test_2.jpg"]
+        assert archive.read("test_2.jpg") == b"page 2"
+
+
+def test_run_skip(fs, make_zip):
+    make_zip("test.cbz", {"test_1.jpg": JPEG})
+
+    results = list(Pipeline().run(lambda path: None, tasks(["test.cbz"])))
+
+    assert results[0] == ("test.cbz", None, None, None)
+
+
+def test_run_stats(fs, make_zip):
+    make_zip("test.zip", {"test_1.jpg": JPEG, "test.xml": b"info"})
+
+    pipeline = Pipeline(stats=True)
+    result = next(pipeline.run(plan, tasks(["test.zip"])))
+
+    assert result.error is None
+    assert result.stats["stream"]["calls"] == 1
+    assert result.stats["stream"]["read"] > 0
+    assert result.stats["write"]["files"] == 2
+    assert result.stats["write"]["written"] == os.path.getsize("test.cbz")
+
+
+def test_run_error(fs, make_zip):
+    fs.create_file("broken.zip", contents="not an archive")
+    make_zip("test.zip", {"test_1.jpg": JPEG})
+
+    results = list(Pipeline().run(plan, tasks(["broken.zip", "test.zip"])))
+
+    assert results[0].error is not None
+    assert results[1].error is None
+
+    assert os.path.exists("broken.zip")
+    assert not os.path.exists("broken.cbz")
+    assert not [name for name in os.listdir(".") if name.startswith(".")]
+
+
+def test_run_plan_error(fs):
+    def fail(path: str) -> Job:
+        raise ValueError("unsupported")
+
+    results = list(Pipeline().run(fail, tasks(["test.zip"])))
+
+    assert results[0].path == "test.zip"
+    assert str(results[0].error) == "unsupported"
+
+
+def test_run_close(fs, make_zip):
+    for idx in range(3):
+        make_zip(f'test_{idx}.zip', {"test_1.jpg": JPEG})
+
+    paths = [f'test_{idx}.zip' for idx in range(3)]
+    results = Pipeline(buffer_size=1).run(plan, tasks(paths))
+
+    assert next(results).error is None
+
+    results.close()
+
+    assert not os.path.exists("test_0.zip")
+    assert os.path.exists("test_2.zip")
+    assert not [name for name in os.listdir(".") if name.startswith(".")]
+
+
+def test_buffer_backpressure():
+    buffer = Buffer(10)
+    buffer.put("first", 8)
+
+    done = threading.Event()
+
+    def put():
+        buffer.put("second", 8)
+        done.set()
+
+    thread = threading.Thread(target=put)
+    thread.start()
+
+    assert not done.wait(0.1)
+    assert buffer.get() == "first"
+    assert done.wait(1)
+
+    thread.join()
+
+    assert buffer.get() == "second"
+
+
+def test_buffer_cancel():
+    buffer = Buffer(10)
+    buffer.put("first", 20)
+    buffer.cancel()
+
+    with pytest.raises(Aborted):
+        buffer.put("second", 1)
@@ -0,0 +1,142 @@
+import pytest
+
+from comics import planner
+
+
+def test_group_by_directory():
+    names = ["dir_1/", "dir_1/test_1.jpg", "test_2.jpg"]
+
+    assert planner.group_by_directory(names) == {
+        "": ["dir_1/", "test_2.jpg"],
+        "dir_1": ["dir_1/test_1.jpg"]
+    }
+
+
+def test_count_children():
+    names = ["dir_1/test_1.jpg", "dir_2/dir_3/test_2.jpg", "test_3.jpg"]
+
+    assert planner.count_children(names) == {
+        "": 3,
+        "dir_1": 1,
+        "dir_2": 1,
+        "dir_2/dir_3": 1
+    }
+
+
+def test_flatten():
+    names = ["dir_1/", "dir_1/test_1.jpg", "test_2.jpg"]
+
+    assert planner.flatten(names) == {
+        "dir_1/": None,
+        "dir_1/test_1.jpg": "test_1.jpg",
+        "test_2.jpg": "test_2.jpg"
+    }
+
+
+def test_flatten_duplicate():
+    with pytest.raises(FileExistsError):
+        planner.flatten(["dir_1/test.jpg", "dir_2/test.jpg"])
+
+
+def test_format_pages():
+    names = ["test_3.jpg", "test_1.jpg", "test_2.png", "test.xml"]
+
+    assert planner.format_pages(names, "Page ", r"\d+") == {
+        "test.xml": "test.xml",
+        "test_1.jpg": "Page 1.jpg",
+        "test_2.png": "Page 2.png",
+        "test_3.jpg": "Page 3.jpg"
+    }
+
+
+def test_format_pages_padding():
+    names = [f'test_{idx}.jpg' for idx in range(10)]
+    mapping = planner.format_pages(names, "Page ", r"\d+")
+
+    assert mapping["test_0.jpg"] == "Page 01.jpg"
+    assert mapping["test_9.jpg"] == "Page 10.jpg"
+
+
+def test_format_pages_recursive():
+    names = ["dir_1/", "dir_1/test_2.jpg", "dir_1/test_4.jpg", "test_6.jpg"]
+
+    assert planner.format_pages(names, "Page ", r"\d+") == {
+        "dir_1/": "dir_1/",
+        "dir_1/test_2.jpg": "dir_1/Page 1.jpg",
+        "dir_1/test_4.jpg": "dir_1/Page 2.jpg",
+        "test_6.jpg": "Page 1.jpg"
+    }
+
+
+def test_format_pages_remove():
+    names = ["test.xml", "test_1.jpg", "credits.jpg"]
+
+    assert planner.format_pages(names, "Page ", r"\d+", remove=True) == {
+        "credits.jpg": None,
+        "test.xml": None,
+        "test_1.jpg": "Page 1.jpg"
+    }
+
+
+def test_first_page():
+    names = [
+        "info.xml",
+        "Chapter 2/",
+        "Chapter 2/Page 1.jpg",
+        "Chapter 1/",
+        "Chapter 1/Page 2.png",
+        "Chapter 1/Page 1.png",
+        "Chapter 1/Notes 1.txt"
+    ]
+
+    assert planner.first_page(names) == "Chapter 1/Page 1.png"
+    assert planner.first_page(names + ["Cover 0.jpg"]) == "Cover 0.jpg"
+    assert planner.first_page(names, r"^Page 2") == "Chapter 1/Page 2.png"
+    assert planner.first_page(["info.xml"]) is None
+
+
+def test_compose():
+    first = {"dir_1/": None, "dir_1/test_1.jpg": "test_1.jpg", "a.xml": None}
+    second = {"test_1.jpg": "Page 1.jpg"}
+
+    assert planner.compose(first, second) == {
+        "dir_1/": None,
+        "dir_1/test_1.jpg": "Page 1.jpg",
+        "a.xml": None
+    }
+
+
+def test_changes():
+    mapping = {"a.jpg": "a.jpg", "b.jpg": "Page 1.jpg", "c.xml": None}
+
+    assert planner.changes(mapping) == {"b.jpg": "Page 1.jpg", "c.xml": None}
+
+
+def test_scan(fs):
+    fs.create_file("comic/test_1.jpg")
+    fs.create_file("comic/dir_1/test_2.jpg")
+    fs.create_dir("comic/dir_2")
+
+    assert planner.scan("comic") == [
+        "dir_1/", "dir_1/test_2.jpg", "dir_2/", "test_1.jpg"
+    ]
+
+
+def test_apply(fs):
+    fs.create_file("comic/a.jpg", contents="a")
+    fs.create_file("comic/b.jpg", contents="b")
+    fs.create_file("comic/dir_1/c.jpg", contents="c")
+    fs.create_file("comic/dir_1/d.xml")
+
+    planner.apply("comic", {
+        "a.jpg": "b.jpg",
+        "b.jpg": "a.jpg",
+        "dir_1/": None,
+        "dir_1/c.jpg": "c.jpg",
+        "dir_1/d.xml": None
+    })
+
+    assert planner.scan("comic") == ["a.jpg", "b.jpg", "c.jpg"]
+
+    with open("comic/a.jpg") as f:
+        assert f.read() == "b"
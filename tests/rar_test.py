@@ -0,0 +1,81 @@
+import zlib
+import pytest
+
+from comics import Archive, rar
+from comics.rar import RarEntry
+
+
+CRC = zlib.crc32(b"page 1")
+
+
+def test_read_rar4(fs, make_rar):
+    make_rar("test.cbr", {"dir/": b"", "dir/test_1.jpg": b"page 1"})
+
+    assert rar.read_entries("test.cbr") == [
+        RarEntry("dir/", 0, 0, True, False, False),
+        RarEntry("dir/test_1.jpg", 6, CRC, False, False, False)
+    ]
+
+
+def test_read_rar4_flags(fs, make_rar):
+    make_rar("solid.cbr", {"test_1.jpg": b"page 1"}, main_flags=0x08)
+    make_rar("locked.cbr", {"test_1.jpg": b"page 1"}, file_flags=0x04)
+
+    assert rar.read_entries("solid.cbr")[0].solid
+    assert rar.read_entries("locked.cbr")[0].encrypted
+
+
+def test_read_rar4_encrypted_headers(fs, make_rar):
+    make_rar("test.cbr", {"test_1.jpg": b"page 1"}, main_flags=0x80)
+
+    with pytest.raises(PermissionError):
+        rar.read_entries("test.cbr")
+
+
+def test_read_rar4_unicode(fs, make_rar):
+    make_rar("test.cbr", {"été/漫画 1.jpg": b"page 1"})
+
+    assert rar.read_entries("test.cbr")[0].name == "été/漫画 1.jpg"
+
+
+def test_decode_unicode_name():
+    enc = bytes([0x6f, 0xc9, 0x00, 0xe9, 0x2b, 0x6f, 0x22])
+
+    assert rar.decode_unicode_name(b"abcdef", enc) == "abé漫漢"
+    assert rar.decode_unicode_name(b"abc", b"") == "abc"
+
+
+def test_decode_name():
+    assert rar.decode_name("été.jpg".encode()) == "été.jpg"
+    assert rar.decode_name(b"p\x82ge\xe9.jpg") == "p\ufffe\ue082ge\ue0e9.jpg"
+
+
+def test_read_rar5(fs, make_rar5):
+    make_rar5("test.cbr", {"dir/": None, "dir/test_1.jpg": b"page 1"})
+
+    assert rar.read_entries("test.cbr") == [
+        RarEntry("dir/", 0, 0, True, False, False),
+        RarEntry("dir/test_1.jpg", 6, CRC, False, False, False)
+    ]
+
+
+def test_read_rar5_solid(fs, make_rar5):
+    make_rar5("test.cbr", {"test_1.jpg": b"page 1"}, solid=True)
+
+    assert rar.read_entries("test.cbr")[0].solid
+
+
+def test_not_rar(fs):
+    fs.create_file("test.cbr", contents="PK\x03\x04")
+
+    with pytest.raises(ValueError):
+        rar.read_entries("test.cbr")
+
+
+def test_archive_members(fs, make_rar5):
+    make_rar5("test.cbr", {"test_1.jpg": b"page 1", "test_2.jpg": b"page 2"})
+
+    a = Archive("test.cbr")
+
+    assert a.namelist() == ["test_1.jpg", "test_2.jpg"]
+    assert a.search("_2") == ["test_2.jpg"]
@@ -0,0 +1,94 @@
+import pytest
+
+from zipfile import ZipFile
+
+from comics.scheduler import Footprint, Scheduler, estimate
+
+
+@pytest.fixture
+def scheduler():
+    return Scheduler(memory=100, disk=1000)
+
+
+def test_estimate(fs):
+    with ZipFile("test.cbz", "w") as archive:
+        archive.writestr("test_1.jpg", b"page 1" * 10)
+        archive.writestr("test_2.jpg", b"page 2" * 20)
+
+    assert estimate("test.cbz", limit=100) == Footprint(120, 0, 180)
+    assert estimate("test.cbz", threads=2) == Footprint(480, 0, 180)
+    assert estimate("test.cbz", limit=0) == Footprint(120, 180, 180)
+
+
+def test_estimate_rar(fs, make_rar):
+    make_rar("test.cbr", {"dir/": b"", "dir/test_1.jpg": b"page 1"})
+
+    assert estimate("test.cbr", limit=1000) == Footprint(6, 0, 6)
+
+
+def test_estimate_corrupt(fs):
+    fs.create_file("test.cbz", contents="not an archive")
+
+    assert estimate("test.cbz") == Footprint()
+
+
+def test_order(scheduler):
+    scheduler.add("small", Footprint(10, 0, 100))
+    scheduler.add("large", Footprint(10, 500, 500))
+    scheduler.add("medium", Footprint(40, 0, 200))
+    scheduler.add("tiny", Footprint(10, 0, 100))
+
+    taken = []
+
+    while scheduler.pending:
+        item, footprint = scheduler.take()
+        scheduler.release(footprint)
+        taken.append(item)
+
+    assert taken == ["large", "medium", "small", "tiny"]
+
+
+def test_budget(scheduler):
+    scheduler.add("large", Footprint(60, 900))
+    scheduler.add("medium", Footprint(60, 0))
+    scheduler.add("small", Footprint(30, 0))
+
+    assert scheduler.take() == ("large", Footprint(60, 900))
+    assert scheduler.take() == ("small", Footprint(30, 0))
+    assert scheduler.take() is None
+
+    scheduler.release(Footprint(60, 900))
+
+    assert scheduler.take() == ("medium", Footprint(60, 0))
+    assert scheduler.used == Footprint(90, 0)
+
+
+def test_budget_oversized(scheduler):
+    scheduler.add("huge", Footprint(100, 2000))
+    scheduler.add("small", Footprint(10, 0))
+
+    assert scheduler.take() == ("huge", Footprint(100, 2000))
+    assert scheduler.take() is None
+
+    scheduler.release(Footprint(100, 2000))
+
+    assert scheduler.take() == ("small", Footprint(10, 0))
+
+
+def test_budget_unlimited():
+    scheduler = Scheduler(memory=0, disk=0)
+
+    for idx in range(10):
+        scheduler.add(idx, Footprint(2 ** 40, 2 ** 40))
+
+    assert all(scheduler.take() is not None for _ in range(10))
+
+
+def test_budget_env(monkeypatch):
+    monkeypatch.setenv("COMIC_FMT_MEMORY_BUDGET", "100")
+    monkeypatch.setenv("COMIC_FMT_SCRATCH_BUDGET", "1000")
+
+    scheduler = Scheduler()
+
+    assert scheduler.memory == 100
+    assert scheduler.disk == 1000
@@ -0,0 +1,67 @@
+import pytest
+
+from comics import Archive
+from comics.stats import Stats, collect, phase
+
+
+def test_phase():
+    with collect() as stats:
+        with phase("test") as record:
+            record.read = 10
+            record.files = 2
+
+        with phase("test") as record:
+            record.written = 5
+
+    counters = stats.to_dict()["test"]
+
+    assert counters["calls"] == 2
+    assert counters["read"] == 10
+    assert counters["written"] == 5
+    assert counters["files"] == 2
+    assert counters["wall"] >= 0
+
+
+def test_phase_disabled(fs):
+    with phase("test") as record:
+        record.measure(read="missing.cbz")
+
+    assert not record.enabled
+    assert record.read == 0
+
+
+def test_phase_error():
+    with collect() as stats:
+        with pytest.raises(ValueError):
+            with phase("test"):
+                raise ValueError()
+
+    assert stats.to_dict()["test"]["calls"] == 1
+
+
+def test_merge():
+    first = Stats({"test": {"calls": 1, "wall": 1.0, "files": 2}})
+    second = Stats({"test": {"calls": 2, "wall": 0.5, "files": 1}})
+
+    first.merge(second)
+
+    assert first.phases["test"]["calls"] == 3
+    assert first.phases["test"]["wall"] == 1.5
+    assert first.phases["test"]["files"] == 3
+
+
+def test_archive(fs):
+    fs.create_file("pages/test_1.jpg", contents=b"page 1")
+    fs.create_file("pages/test_2.jpg", contents=b"page 2")
+
+    with collect() as stats:
+        Archive.compress("pages", "test.cbz", True)
+        Archive("test.cbz").uncompress("output")
+
+    phases = stats.to_dict()
+
+    assert phases["traverse"]["files"] == 2
+    assert phases["compress"]["files"] == 2
+    assert phases["compress"]["written"] > 0
+    assert phases["uncompress"]["files"] == 2
+    assert phases["uncompress"]["written"] == 12
@@ -0,0 +1,48 @@
+import os
+import pytest
+
+from comics import tools
+from comics.backends import BackendError
+
+
+pytestmark = pytest.mark.skipif(
+    not tools.has_bsdtar(), reason="bsdtar is not installed"
+)
+
+
+@pytest.fixture
+def archive(tmp_path, make_rar):
+    path = str(tmp_path / "test.cbr")
+
+    make_rar(path, {
+        "dir/": b"",
+        "dir/test_1.jpg": b"page 1",
+        "test_2.jpg": b"page 2"
+    })
+
+    return path
+
+
+def test_bsdtar_extract(tmp_path, archive):
+    output = tmp_path / "output"
+
+    tools.bsdtar_extract(archive, str(output))
+
+    assert (output / "dir" / "test_1.jpg").read_bytes() == b"page 1"
+    assert (output / "test_2.jpg").read_bytes() == b"page 2"
+
+
+def test_bsdtar_extract_members(tmp_path, archive):
+    output = tmp_path / "output"
+
+    tools.bsdtar_extract(archive, str(output), ["dir/", "dir/test_1.jpg"])
+
+    assert os.listdir(output) == ["dir"]
+    assert (output / "dir" / "test_1.jpg").read_bytes() == b"page 1"
+
+
+def test_bsdtar_read(archive):
+    assert tools.bsdtar_read(archive, "dir/test_1.jpg") == b"page 1"
+
+    with pytest.raises(BackendError):
+        tools.bsdtar_read(archive + ".missing", "dir/test_1.jpg")
@@ -0,0 +1,87 @@
+import os
+import pytest
+
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from comics import Archive
+from comics.tree import Tree
+
+
+@pytest.fixture(autouse=True)
+def setup_file_system(fs):
+    with ZipFile("test.cbz", "w", compression=ZIP_DEFLATED) as archive:
+        archive.writestr("dir_1/", b"")
+        archive.writestr("dir_1/test_1.jpg", b"page 1")
+        archive.writestr("test_2.jpg", b"page 2")
+
+
+def test_names():
+    t = Tree(Archive("test.cbz"))
+
+    assert t.names() == ["dir_1/", "dir_1/test_1.jpg", "test_2.jpg"]
+    assert t.size == 0
+
+
+def test_rename():
+    t = Tree(Archive("test.cbz"))
+
+    t.rename({"dir_1/": None, "dir_1/test_1.jpg": "test_1.jpg"})
+
+    assert t.names() == ["test_1.jpg", "test_2.jpg"]
+    assert t.read("test_1.jpg") == b"page 1"
+
+
+def test_write():
+    t = Tree(Archive("test.cbz"))
+
+    t.write("test.xml", b"info")
+    assert t.size == 4
+
+    t.write("test.xml", b"xml")
+    assert t.size == 3
+
+    t.write("test_2.jpg", b"new")
+    assert t.size == 6
+    assert t.read("test_2.jpg") == b"new"
+
+    t.rename({"test.xml": None})
+    assert t.size == 3
+
+
+def test_search():
+    t = Tree(Archive("test.cbz"))
+
+    assert t.search("test") == ["dir_1/test_1.jpg", "test_2.jpg"]
+    assert t.search("") == []
+
+
+def test_save():
+    t = Tree(Archive("test.cbz"))
+
+    t.rename({"dir_1/": None, "dir_1/test_1.jpg": "Page 1.jpg"})
+    t.write("test.xml", b"info")
+    t.save("new.cbz")
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.namelist() == ["Page 1.jpg", "test_2.jpg", "test.xml"]
+        assert archive.read("Page 1.jpg") == b"page 1"
+        assert archive.read("test.xml") == b"info"
+
+
+def test_extract():
+    t = Tree(Archive("test.cbz"))
+
+    t.rename({"dir_1/test_1.jpg": "dir_2/Page 1.jpg"})
+    t.write("test.xml", b"info")
+
+    os.mkdir("output")
+    t.extract("output")
+
+    assert sorted(os.listdir("output")) == [
+        "dir_1", "dir_2", "test.xml", "test_2.jpg"
+    ]
+
+    with open("output/dir_2/Page 1.jpg", "rb") as f:
+        assert f.read() == b"page 1"
+
+    assert os.listdir("output/dir_1") == []
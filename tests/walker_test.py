@@ -0,0 +1,99 @@
+import pytest
+
+from comics.walker import Walker
+
+
+@pytest.fixture(autouse=True)
+def setup_file_system(fs):
+    fs.create_file("library/b.cbz", contents="b" * 30)
+    fs.create_file("library/a.cbr", contents="a" * 20)
+    fs.create_file("library/notes.txt")
+    fs.create_file("library/series/c.cbz", contents="c" * 10)
+    fs.create_file("library/series/d.zip", contents="d" * 40)
+    fs.create_file("library/.hidden/e.cbz")
+    fs.create_file("library/.f.cbz")
+    fs.create_symlink("library/link", "series")
+    fs.create_symlink("library/g.cbz", "b.cbz")
+
+
+def test_walk():
+    assert list(Walker().walk("library")) == [
+        "library/a.cbr", "library/b.cbz"
+    ]
+
+
+def test_walk_file():
+    assert list(Walker().walk("library/notes.txt")) == ["library/notes.txt"]
+    assert list(Walker().walk("missing")) == ["missing"]
+
+
+def test_walk_recursive():
+    assert list(Walker(recursive=True).walk("library")) == [
+        "library/a.cbr",
+        "library/b.cbz",
+        "library/series/c.cbz",
+        "library/series/d.zip"
+    ]
+
+
+def test_walk_lazy():
+    paths = Walker(recursive=True).walk("library")
+
+    assert next(paths) == "library/a.cbr"
+
+
+def test_walk_extensions():
+    walker = Walker(recursive=True, extensions=[".zip"])
+
+    assert list(walker.walk("library")) == ["library/series/d.zip"]
+
+
+def test_walk_patterns():
+    walker = Walker(recursive=True, include=["series/*"], exclude=["d.*"])
+
+    assert list(walker.walk("library")) == ["library/series/c.cbz"]
+
+
+def test_walk_hidden():
+    assert list(Walker(recursive=True, hidden=True).walk("library")) == [
+        "library/.f.cbz",
+        "library/.hidden/e.cbz",
+        "library/a.cbr",
+        "library/b.cbz",
+        "library/series/c.cbz",
+        "library/series/d.zip"
+    ]
+
+
+def test_walk_symlinks():
+    walker = Walker(follow_symlinks=True)
+
+    assert list(walker.walk("library")) == [
+        "library/a.cbr", "library/b.cbz", "library/g.cbz"
+    ]
+
+    walker = Walker(recursive=True, follow_symlinks=True)
+
+    assert list(walker.walk("library"))[3:] == [
+        "library/link/c.cbz", "library/link/d.zip"
+    ]
+
+
+def test_walk_sort():
+    walker = Walker(recursive=True, sort="size")
+
+    assert list(walker.walk("library")) == [
+        "library/series/c.cbz",
+        "library/a.cbr",
+        "library/b.cbz",
+        "library/series/d.zip"
+    ]
+
+    walker = Walker(recursive=True, sort="size-desc")
+
+    assert list(walker.walk("library"))[0] == "library/series/d.zip"
+
+
+def test_unsupported_sort():
+    with pytest.raises(ValueError):
+        Walker(sort="date")
@@ -0,0 +1,54 @@
+import os
+import pytest
+
+from comics.watcher import Watcher
+
+
+@pytest.fixture
+def watcher(fs):
+    fs.create_dir("inbox")
+    fs.create_file("inbox/test_1.cbz", contents="test 1")
+
+    with Watcher("inbox", settle=5, state=":memory:") as watcher:
+        yield watcher
+
+
+def test_poll_settle(watcher):
+    assert watcher.poll(now=0) == []
+    assert watcher.waiting
+
+    assert watcher.poll(now=5) == ["inbox/test_1.cbz"]
+
+
+def test_poll_changed(watcher):
+    watcher.poll(now=0)
+
+    with open("inbox/test_1.cbz", "a") as f:
+        f.write("more data")
+
+    assert watcher.poll(now=5) == []
+    assert watcher.poll(now=10) == ["inbox/test_1.cbz"]
+
+
+def test_poll_removed(watcher):
+    watcher.poll(now=0)
+    os.remove("inbox/test_1.cbz")
+
+    assert watcher.poll(now=5) == []
+    assert not watcher.waiting
+
+
+def test_mark(watcher):
+    watcher.poll(now=0)
+    watcher.poll(now=5)
+
+    os.rename("inbox/test_1.cbz", "inbox/test_2.cbz")
+    watcher.mark("inbox/test_1.cbz", "inbox/test_2.cbz")
+
+    assert watcher.poll(now=10) == []
+    assert not watcher.waiting
+
+    os.utime("inbox/test_2.cbz", ns=(0, 0))
+
+    assert watcher.poll(now=15) == []
+    assert watcher.poll(now=20) == ["inbox/test_2.cbz"]
@@ -0,0 +1,100 @@
+import os
+import pytest
+
+from comics.workspace import Workspace, staged, staged_files
+
+
+def test_create(fs):
+    w = Workspace()
+
+    assert w.path is None
+
+    path = w.create()
+
+    assert os.path.isdir(path)
+    assert w.create() == path
+
+    w.remove()
+
+    assert w.path is None
+    assert not os.path.exists(path)
+
+
+def test_create_unique(fs):
+    w1, w2 = Workspace(), Workspace()
+
+    assert w1.create() != w2.create()
+
+
+def test_root(fs):
+    w = Workspace("scratch/comics")
+
+    assert os.path.dirname(w.create()) == "scratch/comics"
+
+
+def test_root_environment(fs, monkeypatch):
+    monkeypatch.setenv("COMIC_FMT_WORKSPACE", "scratch")
+
+    w = Workspace()
+
+    assert os.path.dirname(w.create()) == "scratch"
+
+
+def test_staged(fs):
+    fs.create_file("test_dir/test.cbz", contents="old")
+
+    with staged("test_dir/test.cbz") as path:
+        assert os.path.dirname(path) == os.path.abspath("test_dir")
+        assert path.endswith(".cbz")
+
+        with open(path, "w") as f:
+            f.write("new")
+
+    assert os.listdir("test_dir") == ["test.cbz"]
+
+    with open("test_dir/test.cbz") as f:
+        assert f.read() == "new"
+
+
+def test_staged_error(fs):
+    fs.create_file("test.cbz", contents="old")
+
+    with pytest.raises(RuntimeError):
+        with staged("test.cbz") as path:
+            with open(path, "w") as f:
+                f.write("new")
+
+            raise RuntimeError()
+
+    assert sorted(os.listdir(".")) == ["test.cbz", "tmp"]
+
+    with open("test.cbz") as f:
+        assert f.read() == "old"
+
+
+def test_staged_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr("comics.workspace.UMASK", 0o022)
+
+    old, new = tmp_path / "old.cbz", tmp_path / "new.cbz"
+    old.write_text("old")
+    old.chmod(0o640)
+
+    for target in [old, new]:
+        with staged(str(target)) as path:
+            with open(path, "w") as f:
+                f.write("new")
+
+    assert old.stat().st_mode & 0o777 == 0o640
+    assert new.stat().st_mode & 0o777 == 0o644
+
+
+def test_staged_files(fs):
+    fs.create_file("test_dir/test.cbz")
+    fs.create_file("test_dir/.test.abcd1234.cbz")
+    fs.create_file("test_dir/.test.v2.abcd1234.cbz")
+    fs.create_file("test_dir/.test.abcd1234.zip")
+
+    assert staged_files("test_dir/test.cbz") == [
+        "test_dir/.test.abcd1234.cbz"
+    ]
+    assert staged_files("missing/test.cbz") == []
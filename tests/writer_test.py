@@ -0,0 +1,97 @@
+import pytest
+
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
+
+from comics.compression import Policy
+from comics.writer import Writer
+
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(100)
+
+
+def write_pages(path: str, threads: int):
+    with ZipFile(path, mode="w") as output:
+        with Writer(output, Policy(), threads) as writer:
+            writer.mkdir("pages/")
+
+            for idx in range(20):
+                writer.write(ZipInfo(f'pages/{idx}.jpg'), JPEG)
+                writer.write(ZipInfo(f'pages/{idx}.xml'), b"info " * idx)
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_write(fs, threads):
+    write_pages("new.cbz", threads)
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.testzip() is None
+        assert archive.namelist()[:3] == [
+            "pages/", "pages/0.jpg", "pages/0.xml"
+        ]
+
+        assert archive.getinfo("pages/").is_dir()
+        assert archive.getinfo("pages/1.jpg").compress_type == ZIP_STORED
+        assert archive.getinfo("pages/1.xml").compress_type == ZIP_DEFLATED
+        assert archive.read("pages/19.xml") == b"info " * 19
+
+
+def test_write_deterministic(fs):
+    write_pages("single.cbz", 1)
+    write_pages("multi.cbz", 4)
+
+    with ZipFile("single.cbz") as single, ZipFile("multi.cbz") as multi:
+        assert single.namelist() == multi.namelist()
+
+        for old, new in zip(single.infolist()[1:], multi.infolist()[1:]):
+            assert old.CRC == new.CRC
+            assert old.external_attr == new.external_attr == 0o600 << 16
+            assert old.compress_size == new.compress_size
+
+
+def test_stream(fs):
+    with ZipFile("new.cbz", mode="w") as output:
+        with Writer(output, Policy(), threads=4) as writer:
+            with writer.open(ZipInfo("test.xml")) as entry:
+                entry.write(b"info ")
+                entry.write(b"info")
+
+            with writer.open(ZipInfo("empty.xml")):
+                pass
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.namelist() == ["test.xml", "empty.xml"]
+        assert archive.read("test.xml") == b"info info"
+        assert archive.read("empty.xml") == b""
+
+
+def test_copy(fs):
+    with ZipFile("test.zip", mode="w", compression=ZIP_DEFLATED) as source:
+        source.writestr("test.xml", b"info " * 100)
+
+    with ZipFile("test.zip") as source:
+        info = source.getinfo("test.xml")
+
+        with open("test.zip", "rb") as f:
+            f.seek(info.header_offset + 30 + len(info.filename))
+            data = f.read(info.compress_size)
+
+    with ZipFile("new.cbz", mode="w") as output:
+        with Writer(output, threads=4) as writer:
+            writer.write(ZipInfo("test_1.jpg"), JPEG)
+            writer.copy(info, data)
+            writer.write(ZipInfo("test_2.jpg"), JPEG)
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.namelist() == ["test_1.jpg", "test.xml", "test_2.jpg"]
+        assert archive.read("test.xml") == b"info " * 100
+
+
+def test_discard(fs):
+    with pytest.raises(ValueError):
+        with ZipFile("new.cbz", mode="w") as output:
+            with Writer(output, threads=4) as writer:
+                writer.write(ZipInfo("test_1.jpg"), JPEG)
+                raise ValueError
+
+    with ZipFile("new.cbz") as archive:
+        assert archive.namelist() == []